@@ -1,7 +1,7 @@
 """API v1 router."""
 
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, documents, query, graph, audit
+from app.api.v1.endpoints import auth, documents, query, graph, audit, profiles, usage
 
 
 api_router = APIRouter()
@@ -10,3 +10,5 @@ api_router.include_router(documents.router, prefix="/documents", tags=["document
 api_router.include_router(query.router, prefix="/query", tags=["query"])
 api_router.include_router(graph.router, prefix="/graph", tags=["graph"])
 api_router.include_router(audit.router, prefix="/audit", tags=["audit"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
+api_router.include_router(usage.router, prefix="/usage", tags=["usage"])
@@ -2,7 +2,7 @@
 
 import logging
 from typing import List, Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Response
 from fastapi.responses import FileResponse, RedirectResponse
 from starlette.requests import Request
 from pathlib import Path
@@ -21,7 +21,10 @@ from app.core.auth import get_current_user, is_owner
 from app.core.config import settings
 from app.core.limiter import limiter
 from app.core.retry import retry_async, retry_sync
+from app.core.circuit_breaker import NEO4J, PINECONE, STORAGE
+from app.core import profiling, usage
 from app.models.audit_log import AuditLog
+from app.models.llm_usage import LLMUsage
 from app.services.page_counter import count_pages
 
 
@@ -74,6 +77,7 @@ async def list_documents(request: Request, current_user: dict = Depends(get_curr
 @limiter.limit(settings.RATE_LIMIT_DOCUMENT_UPLOAD)
 async def upload_document(
     request: Request,
+    response: Response,
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user)
 ):
@@ -128,12 +132,20 @@ async def upload_document(
         logger.info(f"File saved to disk, starting processing: {file.filename}")
 
         processor = MultimodalProcessor()
-        result = await processor.process_document(
-            str(temp_path),
-            file.filename,
-            file_type=file_type,
-            user_id=user_id
-        )
+        profile = profiling.start("upload") if profiling.requested(request, current_user) else None
+        usage.start()
+        try:
+            result = await processor.process_document(
+                str(temp_path),
+                file.filename,
+                file_type=file_type,
+                user_id=user_id
+            )
+        finally:
+            LLMUsage.record(user_id, "upload", usage.finish())
+            profile_id = profiling.finish(profile)
+            if profile_id:
+                response.headers["X-Profile-Id"] = profile_id
 
         logger.info(f"Processing complete: {file.filename} - {result.get('pages', 0)} pages, {result.get('upserted_vectors', 0)} vectors")
 
@@ -142,7 +154,8 @@ async def upload_document(
             doc_id=result["doc_id"],
             user_id=user_id,
             filename=file.filename,
-            pages=result.get("pages", 0)
+            pages=result.get("pages", 0),
+            summary=result.get("summary", "")
         )
 
         logger.info(f"Upload finished: {file.filename}")
@@ -198,6 +211,7 @@ async def delete_document(
             max_attempts=3,
             base_delay=1.0,
             operation_name=f"Pinecone delete (doc={doc_id})",
+            circuit=PINECONE,
         )
         logger.info("Pinecone delete succeeded for doc %s", doc_id)
     except Exception as e:
@@ -214,6 +228,7 @@ async def delete_document(
             max_attempts=3,
             base_delay=1.0,
             operation_name=f"Neo4j delete (doc={doc_id})",
+            circuit=NEO4J,
         )
         logger.info("Neo4j delete succeeded for doc %s", doc_id)
     except Exception as e:
@@ -232,6 +247,7 @@ async def delete_document(
             max_attempts=3,
             base_delay=1.0,
             operation_name=f"Storage delete (doc={doc_id})",
+            dependency=STORAGE,
         )
         logger.info("Storage delete succeeded for doc %s", doc_id)
     except Exception as e:
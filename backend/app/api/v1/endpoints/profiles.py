@@ -0,0 +1,33 @@
+"""Endpoints for stored request profiles (admin only)."""
+
+from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.core.auth import get_current_admin
+from app.core import loop_monitor, profiling
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def list_profiles(current_user: dict = Depends(get_current_admin)):
+    """List stored request profiles, newest first (admin only)."""
+    return profiling.list_profiles()
+
+
+@router.get("/event-loop", response_model=Dict[str, Any])
+async def event_loop_offenders(current_user: dict = Depends(get_current_admin)):
+    """Event-loop lag and blocking call sites with their stacks (admin only)."""
+    report = loop_monitor.report(limit=50, stacks=True)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Event loop monitor is disabled")
+    return report
+
+
+@router.get("/{profile_id}")
+async def download_profile(profile_id: str, current_user: dict = Depends(get_current_admin)):
+    """Download a profile in pstats format (admin only)."""
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
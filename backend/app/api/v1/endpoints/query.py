@@ -2,25 +2,88 @@
 
 import json
 import logging
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Response
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from starlette.requests import Request
-from app.schemas.query import QueryRequest, QueryResponse
+from app.schemas.query import QueryRequest, QueryResponse, ReflectionStatus, SessionResponse
 from app.services.advanced_rag import AdvancedRAGService
+from app.services.session_memory import SessionMemory
 from app.core.auth import get_current_user, is_owner
 from app.core.config import settings
+from app.core import admission, deadline, profiling, tracing, usage
 from app.core.limiter import limiter
 from app.models.audit_log import AuditLog
+from app.models.chat_session import ChatSession
+from app.models.llm_usage import LLMUsage
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def _resolve_history(payload: QueryRequest, user_id: str, memory: SessionMemory):
+    """Return (session, chat_history); history comes from the session when one is given."""
+    if not payload.session_id:
+        return None, payload.chat_history
+    session = ChatSession.get(payload.session_id, user_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return session, memory.load_history(session)
+
+
+def _check_daily_limits(current_user: dict) -> None:
+    """Enforce the daily query limit and token budget before any pipeline work (owner exempt)."""
+    if is_owner(current_user):
+        return
+    user_id = current_user["user_id"]
+    today_count = AuditLog.count_today(
+        user_id, ["QUERY_EXECUTED", "QUERY_STREAM_EXECUTED"]
+    )
+    if today_count >= settings.MAX_QUERIES_PER_DAY:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Daily query limit reached ({settings.MAX_QUERIES_PER_DAY}).",
+        )
+    if settings.MAX_TOKENS_PER_DAY and LLMUsage.tokens_today(user_id) >= settings.MAX_TOKENS_PER_DAY:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Daily token budget reached ({settings.MAX_TOKENS_PER_DAY}).",
+        )
+
+
+def _check_debug(payload: QueryRequest, current_user: dict) -> bool:
+    """Whether to trace this request; debug mode is limited to the owner and admins."""
+    if not payload.debug:
+        return False
+    if not (is_owner(current_user) or current_user.get("is_admin")):
+        raise HTTPException(status_code=403, detail="Debug mode requires admin access")
+    return True
+
+
+async def _admit(payload: QueryRequest, current_user: dict, chat_history) -> Optional[admission.Slot]:
+    """Take an admission slot; exact cache hits bypass the queue and get None."""
+    user_id = current_user["user_id"]
+    if AdvancedRAGService.has_cached_response(payload.query, user_id, chat_history, payload.doc_ids or None):
+        return None
+    priority = admission.PRIORITY_OWNER if is_owner(current_user) else admission.PRIORITY_USER
+    try:
+        return await admission.get_controller().acquire(priority)
+    except admission.AdmissionRejected as exc:
+        logger.warning(f"Query shed for user {user_id}: {exc.reason}")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please retry shortly.",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+
 @router.post("/", response_model=QueryResponse)
 @limiter.limit(settings.RATE_LIMIT_QUERY)
 async def query_documents(
     request: Request,
+    response: Response,
     payload: QueryRequest,
     current_user: dict = Depends(get_current_user)
 ):
@@ -30,22 +93,30 @@ async def query_documents(
 
     user_id = current_user["user_id"]
 
-    # --- Daily query limit (owner exempt) ---
-    if not is_owner(current_user):
-        today_count = AuditLog.count_today(
-            user_id, ["QUERY_EXECUTED", "QUERY_STREAM_EXECUTED"]
-        )
-        if today_count >= settings.MAX_QUERIES_PER_DAY:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Daily query limit reached ({settings.MAX_QUERIES_PER_DAY}).",
-            )
+    _check_daily_limits(current_user)
 
     logger.info(f"Query received from user {user_id}: {payload.query[:100]}")
+    debug = _check_debug(payload, current_user)
+    memory = SessionMemory()
+    session, chat_history = _resolve_history(payload, user_id, memory)
+    slot = await _admit(payload, current_user, chat_history)
+    profile = profiling.start("query") if profiling.requested(request, current_user) else None
 
     try:
+        deadline.start(deadline.parse_timeout(request.headers.get(settings.REQUEST_DEADLINE_HEADER)))
+        if debug:
+            tracing.start()
+        usage.start()
         service = AdvancedRAGService()
-        result = await service.answer(payload.query, user_id=user_id, chat_history=payload.chat_history, doc_ids=payload.doc_ids or None)
+        result = await service.answer(payload.query, user_id=user_id, chat_history=chat_history, doc_ids=payload.doc_ids or None)
+        if session:
+            message_id = memory.record_turn(session, payload.query, result.get("answer", ""))
+            if message_id and result.get("reflection_id"):
+                AdvancedRAGService.link_session_message(result["reflection_id"], session["session_id"], message_id)
+            result["session_id"] = session["session_id"]
+        result["degraded"] = deadline.degraded_stages()
+        if debug:
+            result["timings"] = tracing.finish()
         logger.info(f"Query answered: {len(result.get('contexts', []))} contexts, {len(result.get('entities', []))} entities")
         AuditLog.log(
             action="QUERY_EXECUTED",
@@ -60,6 +131,15 @@ async def query_documents(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    finally:
+        spent = usage.finish()
+        if spent:
+            LLMUsage.record(user_id, "query", spent)
+        if slot:
+            slot.release()
+        profile_id = profiling.finish(profile)
+        if profile_id:
+            response.headers["X-Profile-Id"] = profile_id
 
 
 @router.post("/stream")
@@ -75,18 +155,13 @@ async def query_documents_stream(
 
     user_id = current_user["user_id"]
 
-    # --- Daily query limit (owner exempt) ---
-    if not is_owner(current_user):
-        today_count = AuditLog.count_today(
-            user_id, ["QUERY_EXECUTED", "QUERY_STREAM_EXECUTED"]
-        )
-        if today_count >= settings.MAX_QUERIES_PER_DAY:
-            raise HTTPException(
-                status_code=429,
-                detail=f"Daily query limit reached ({settings.MAX_QUERIES_PER_DAY}).",
-            )
+    _check_daily_limits(current_user)
 
     logger.info(f"Stream query from user {user_id}: {payload.query[:100]}")
+    debug = _check_debug(payload, current_user)
+    memory = SessionMemory()
+    session, chat_history = _resolve_history(payload, user_id, memory)
+    slot = await _admit(payload, current_user, chat_history)
     AuditLog.log(
         action="QUERY_STREAM_EXECUTED",
         resource_type="query",
@@ -95,19 +170,61 @@ async def query_documents_stream(
         ip_address=request.client.host if request.client else None,
     )
 
+    timeout = deadline.parse_timeout(request.headers.get(settings.REQUEST_DEADLINE_HEADER))
+    profile_requested = profiling.requested(request, current_user)
+
     async def event_generator():
+        answer = ""
+        reflection_id = None
+        finished = False
+        profile = None
         try:
+            deadline.start(timeout)
+            if profile_requested:
+                profile = profiling.start("query_stream")
+            if debug:
+                tracing.start()
+            usage.start()
             service = AdvancedRAGService()
             async for event_type, data in service.answer_stream(
                 payload.query,
                 user_id=user_id,
-                chat_history=payload.chat_history,
+                chat_history=chat_history,
                 doc_ids=payload.doc_ids or None
             ):
+                if event_type == "token":
+                    answer = "" if data.get("replace") else answer
+                    answer += data.get("content", "")
+                elif event_type == "done":
+                    finished = True
+                    reflection_id = data.get("reflection_id")
+                    if slot:
+                        slot.release()  # the pipeline is finished; only background judging is left
+                    if deadline.degraded_stages():
+                        data = {**data, "degraded": deadline.degraded_stages()}
                 yield f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+            if debug:
+                yield f"event: timings\ndata: {json.dumps(tracing.finish())}\n\n"
+            profile_id = profiling.finish(profile)
+            profile = None
+            if profile_id:
+                yield f"event: profile\ndata: {json.dumps({'profile_id': profile_id})}\n\n"
         except Exception as exc:
             logger.error(f"Streaming query failed: {exc}")
             yield f"event: error\ndata: {json.dumps({'detail': str(exc)})}\n\n"
+        finally:
+            # Recorded once the stream ends so a revision sent after "done" replaces the answer;
+            # one still pending (or missed by a disconnected client) is applied when judging ends
+            if session and finished:
+                message_id = memory.record_turn(session, payload.query, answer)
+                if message_id and reflection_id:
+                    AdvancedRAGService.link_session_message(reflection_id, session["session_id"], message_id)
+            spent = usage.finish()
+            if spent:
+                LLMUsage.record(user_id, "query_stream", spent)
+            if slot:
+                slot.release()
+            profiling.finish(profile)
 
     return StreamingResponse(
         event_generator(),
@@ -116,5 +233,33 @@ async def query_documents_stream(
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
             "X-Accel-Buffering": "no",
-        }
+        },
+        # Also released here in case the generator never runs (client gone)
+        background=BackgroundTask(slot.release) if slot else None,
     )
+
+
+@router.get("/reflection/{reflection_id}", response_model=ReflectionStatus)
+async def get_reflection(
+    reflection_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """Poll the background judge verdict for an answer (requires authentication)."""
+    record = AdvancedRAGService.get_reflection(reflection_id, current_user["user_id"])
+    if record is None:
+        raise HTTPException(status_code=404, detail="Reflection not found")
+    return ReflectionStatus(**record)
+
+
+@router.post("/sessions", response_model=SessionResponse, status_code=201)
+async def create_session(current_user: dict = Depends(get_current_user)):
+    """Start a server-side chat session (requires authentication)."""
+    session = ChatSession.create(current_user["user_id"])
+    return SessionResponse(session_id=session["session_id"])
+
+
+@router.delete("/sessions/{session_id}", status_code=204)
+async def delete_session(session_id: str, current_user: dict = Depends(get_current_user)):
+    """Delete a chat session and its messages (requires authentication)."""
+    if not ChatSession.delete(session_id, current_user["user_id"]):
+        raise HTTPException(status_code=404, detail="Session not found")
@@ -0,0 +1,49 @@
+"""LLM usage ledger endpoints."""
+
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, Query
+from starlette.requests import Request
+from app.core.auth import get_current_user, get_current_admin
+from app.core.limiter import limiter
+from app.models.llm_usage import LLMUsage
+
+router = APIRouter()
+
+
+@router.get("/me", response_model=List[Dict[str, Any]])
+@limiter.limit("30/minute")
+async def get_my_usage(
+    request: Request,
+    days: int = Query(default=30, ge=1, le=365),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get daily LLM usage for the current user."""
+    return LLMUsage.get_daily(current_user["user_id"], days=days)
+
+
+@router.get("/", response_model=List[Dict[str, Any]])
+@limiter.limit("30/minute")
+async def get_usage_totals(
+    request: Request,
+    days: int = Query(default=30, ge=1, le=365),
+    current_user: dict = Depends(get_current_admin),
+):
+    """Get per-user LLM usage totals, heaviest users first (admin only)."""
+    return LLMUsage.get_totals(days=days)
+
+
+@router.get("/{user_id}", response_model=Dict[str, Any])
+@limiter.limit("30/minute")
+async def get_user_usage(
+    request: Request,
+    user_id: str,
+    days: int = Query(default=30, ge=1, le=365),
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    current_user: dict = Depends(get_current_admin),
+):
+    """Get a user's daily totals and per-request usage (admin only)."""
+    return {
+        "daily": LLMUsage.get_daily(user_id, days=days),
+        "requests": LLMUsage.get_requests(user_id, limit=limit, offset=offset),
+    }
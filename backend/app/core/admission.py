@@ -0,0 +1,151 @@
+"""Per-worker admission control with priority queueing for query pipelines."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core import metrics
+from app.core.hedging import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+# Priority classes; lower is served first
+PRIORITY_OWNER = 0
+PRIORITY_USER = 1
+_PRIORITY_NAMES = {PRIORITY_OWNER: "owner", PRIORITY_USER: "user"}
+
+# Recent queue waits kept for the wait-time percentiles
+_WAIT_WINDOW_SIZE = 500
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed because the queue is full or the wait timed out."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Request shed: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Slot:
+    """An admitted pipeline; release() is idempotent."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release()
+
+
+class AdmissionController:
+    """Bounded in-flight pipelines with a priority wait queue.
+
+    Up to ``max_in_flight`` pipelines run at once. Further requests wait in
+    priority order (then FIFO) for up to ``queue_timeout`` seconds; when the
+    queue already holds ``max_queue`` waiters, or the wait times out, the
+    request is rejected with a Retry-After hint. Freed slots are handed
+    directly to the next waiter so newcomers cannot jump the queue.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.wait_times = LatencyTracker(_WAIT_WINDOW_SIZE)
+        self.admitted: Dict[str, int] = {name: 0 for name in _PRIORITY_NAMES.values()}
+        self.rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = PRIORITY_USER) -> Slot:
+        """Wait for a slot; raises AdmissionRejected when shedding load."""
+        start = time.monotonic()
+        if not settings.ADMISSION_ENABLED or (self.in_flight < self.max_in_flight and not self.queue_depth):
+            self.in_flight += 1
+            return self._admitted(priority, start)
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected["queue_full"] += 1
+            metrics.ADMISSION_REJECTED.inc(reason="queue_full")
+            raise AdmissionRejected("queue_full", self.retry_after)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # Handed a slot just as the wait expired; give it back
+                self._release()
+            else:
+                future.cancel()
+            self.rejected["timeout"] += 1
+            metrics.ADMISSION_REJECTED.inc(reason="timeout")
+            raise AdmissionRejected("timeout", self.retry_after)
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+            raise
+        return self._admitted(priority, start)
+
+    def _admitted(self, priority: int, start: float) -> Slot:
+        waited = time.monotonic() - start
+        name = _PRIORITY_NAMES.get(priority, "user")
+        self.wait_times.observe(waited)
+        self.admitted[name] += 1
+        metrics.ADMISSION_WAIT_SECONDS.observe(waited, priority=name)
+        return Slot(self)
+
+    def _release(self) -> None:
+        # Hand the slot to the best live waiter, otherwise free it
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "wait_seconds": self.wait_times.snapshot(),
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_controller() -> AdmissionController:
+    """Return this worker's admission controller, creating it from settings."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        )
+    return _controller
+
+
+def reset() -> None:
+    global _controller
+    _controller = None
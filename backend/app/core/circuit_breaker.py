@@ -0,0 +1,243 @@
+"""Process-wide circuit breakers for external dependencies (Pinecone, Neo4j, OpenAI)."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Tuple, TypeVar
+from app.core.config import settings
+from app.core import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Dependency names shared by callers. OpenAI chat completions and embeddings
+# fail independently, so each has its own breaker.
+PINECONE = "pinecone"
+NEO4J = "neo4j"
+OPENAI_CHAT = "openai_chat"
+OPENAI_EMBEDDINGS = "openai_embeddings"
+STORAGE = "storage"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a rolling window of recent calls.
+
+    The circuit opens when, over the last ``window_size`` calls (and at least
+    ``min_calls``), the failure rate or the slow-call rate reaches its
+    threshold. After ``open_seconds`` a limited number of trial calls are let
+    through (half-open); one success closes the circuit, one failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls are being rejected (half-open trial slots count as not open)."""
+        return self.state == OPEN
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+            logger.info(f"Circuit '{self.name}' half-open, allowing trial calls")
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._window.clear()
+        logger.warning(f"Circuit '{self.name}' opened")
+
+    def allow_request(self) -> bool:
+        """Reserve permission for one call; False when the circuit rejects it."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return True
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                return False
+            if self._state == HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    return False
+                self._half_open_calls += 1
+            return True
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Record the outcome of a call that allow_request permitted."""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open()
+                else:
+                    self._state = CLOSED
+                    self._window.clear()
+                    logger.info(f"Circuit '{self.name}' closed")
+                return
+
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if self._state != CLOSED or calls < self.min_calls:
+                return
+            failure_rate = sum(1 for f, _ in self._window if f) / calls
+            slow_rate = sum(1 for _, s in self._window if s) / calls
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._open()
+
+    def release(self) -> None:
+        """Give back a permission that allow_request granted, recording no outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def _cancelled(self, operation: str, duration: float) -> None:
+        self.release()
+        metrics.EXTERNAL_CALLS.inc(dependency=self.name, operation=operation, outcome="cancelled")
+        metrics.EXTERNAL_CALL_SECONDS.observe(duration, dependency=self.name, operation=operation)
+
+    def _finish(self, operation: str, failed: bool, duration: float) -> None:
+        self.record(failed, duration)
+        metrics.EXTERNAL_CALLS.inc(dependency=self.name, operation=operation, outcome="error" if failed else "ok")
+        metrics.EXTERNAL_CALL_SECONDS.observe(duration, dependency=self.name, operation=operation)
+        tracing.record_external_call(self.name, operation)
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call a sync function through the breaker."""
+        operation = getattr(func, "__name__", "call")
+        if not self.allow_request():
+            metrics.EXTERNAL_CALLS.inc(dependency=self.name, operation=operation, outcome="rejected")
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Our own deadline or a losing hedge, not a dependency failure
+            self._cancelled(operation, time.monotonic() - start)
+            raise
+        except BaseException:
+            self._finish(operation, True, time.monotonic() - start)
+            raise
+        self._finish(operation, False, time.monotonic() - start)
+        return result
+
+    async def call_async(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Await an async function through the breaker."""
+        operation = getattr(func, "__name__", "call")
+        if not self.allow_request():
+            metrics.EXTERNAL_CALLS.inc(dependency=self.name, operation=operation, outcome="rejected")
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Our own deadline or a losing hedge, not a dependency failure
+            self._cancelled(operation, time.monotonic() - start)
+            raise
+        except BaseException:
+            self._finish(operation, True, time.monotonic() - start)
+            raise
+        self._finish(operation, False, time.monotonic() - start)
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._window.clear()
+            self._half_open_calls = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._window)
+            return {
+                "state": self._state,
+                "recent_calls": calls,
+                "failure_rate": round(sum(1 for f, _ in self._window if f) / calls, 3) if calls else 0.0,
+                "slow_rate": round(sum(1 for _, s in self._window if s) / calls, 3) if calls else 0.0,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the shared breaker for a dependency, creating it from settings."""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_rate_threshold=settings.CIRCUIT_FAILURE_RATE_THRESHOLD,
+                slow_call_seconds=settings.CIRCUIT_SLOW_CALL_SECONDS,
+                slow_call_rate_threshold=settings.CIRCUIT_SLOW_CALL_RATE_THRESHOLD,
+                window_size=settings.CIRCUIT_WINDOW_SIZE,
+                min_calls=settings.CIRCUIT_MIN_CALLS,
+                open_seconds=settings.CIRCUIT_OPEN_SECONDS,
+                half_open_max_calls=settings.CIRCUIT_HALF_OPEN_MAX_CALLS,
+            )
+            _breakers[name] = breaker
+        return breaker
+
+
+def snapshot_all() -> Dict[str, Dict[str, Any]]:
+    """State of every breaker used so far, for the health endpoint."""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+def dependency_of(name: str) -> str:
+    """Health-check dependency a breaker belongs to (e.g. openai_chat -> openai)."""
+    return name.split("_", 1)[0]
+
+
+def reset_all() -> None:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.reset()
@@ -54,6 +54,7 @@ class Settings(BaseSettings):
     MAX_DOCUMENTS_PER_USER: int = 3
     MAX_PAGES_PER_DOCUMENT: int = 20
     MAX_QUERIES_PER_DAY: int = 15
+    MAX_TOKENS_PER_DAY: int = 0  # LLM + embedding tokens from the usage ledger; 0 disables
 
     # Rate Limiting (values use limits library syntax, e.g. "5/minute", "100/hour")
     RATE_LIMIT_ENABLED: bool = True
@@ -88,6 +89,10 @@ class Settings(BaseSettings):
     ENABLE_SEMANTIC_QUERY_CACHE: bool = True
     SEMANTIC_CACHE_SIMILARITY_THRESHOLD: float = 0.92
     SEMANTIC_CACHE_REQUIRE_EMPTY_HISTORY: bool = True
+    # Retrieval + rerank output, keyed without chat history so follow-ups reuse it
+    ENABLE_RETRIEVAL_CACHE: bool = True
+    RETRIEVAL_CACHE_TTL_SECONDS: int = 60 * 15
+    RETRIEVAL_CACHE_MAX_SIZE: int = 2000
 
     # Chunking Settings
     PARENT_CHUNK_SIZE: int = 1500
@@ -103,6 +108,29 @@ class Settings(BaseSettings):
     HYBRID_MIN_PER_DOC: int = 3
     CONTEXT_SNIPPET_LENGTH: int = 200
 
+    # Context packing (token budget for the assembled prompt context; 0 = unlimited)
+    CONTEXT_TOKEN_BUDGET: int = 6000
+    CONTEXT_TOKENIZER_ENCODING: str = "cl100k_base"
+    CONTEXT_MMR_LAMBDA: float = 0.7
+    CONTEXT_TRIM_WINDOW_SENTENCES: int = 2
+
+    # Context compression (keep only query-relevant sentences of long parents)
+    CONTEXT_COMPRESSION_ENABLED: bool = False
+    CONTEXT_COMPRESSION_MIN_CHARS: int = 600
+    CONTEXT_COMPRESSION_TOP_SENTENCES: int = 4
+    CONTEXT_COMPRESSION_NEIGHBORS: int = 1
+    CONTEXT_COMPRESSION_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    CONTEXT_COMPRESSION_CACHE_MAX_SIZE: int = 50000
+
+    # Adaptive Query Expansion (skip expansion when the first pass is confident)
+    ADAPTIVE_EXPANSION_ENABLED: bool = True
+    ADAPTIVE_EXPANSION_MIN_TOP_SCORE: float = 0.5
+    ADAPTIVE_EXPANSION_MIN_MARGIN: float = 0.05
+    ADAPTIVE_EXPANSION_MARGIN_RANK: int = 5
+    EXPANSION_DEDUP_SIMILARITY: float = 0.95
+    QUERY_EXPANSION_CACHE_TTL_SECONDS: int = 60 * 60
+    QUERY_EXPANSION_CACHE_MAX_SIZE: int = 5000
+
     # Reranking
     RERANKER_RELEVANCE_THRESHOLD: float = 0.75
     RERANKER_DOC_GAP_THRESHOLD: float = 0.05
@@ -110,6 +138,52 @@ class Settings(BaseSettings):
     # Query Router
     QUERY_ROUTER_MODEL: str = "gpt-4o-mini"
     QUERY_ROUTER_TEMPERATURE: float = 0.0
+    QUERY_ROUTER_FAST_PATH_ENABLED: bool = True
+    QUERY_ROUTER_CACHE_TTL_SECONDS: int = 60 * 60
+    QUERY_ROUTER_CACHE_MAX_SIZE: int = 5000
+
+    # Query Planner (one LLM call for intent, expansions and query entities;
+    # the separate router / expander / entity extractor remain the fallback)
+    QUERY_PLANNER_ENABLED: bool = False
+    QUERY_PLANNER_MODEL: str = "gpt-4o-mini"
+    QUERY_PLANNER_MAX_EXPANSIONS: int = 3
+    QUERY_PLANNER_CACHE_TTL_SECONDS: int = 60 * 60
+    QUERY_PLANNER_CACHE_MAX_SIZE: int = 5000
+
+    # Query Condenser (rewrites follow-ups into standalone retrieval queries)
+    ENABLE_QUERY_CONDENSATION: bool = True
+    QUERY_CONDENSER_MODEL: str = "gpt-4o-mini"
+    QUERY_CONDENSER_MAX_TURNS: int = 6
+    QUERY_CONDENSER_CACHE_TTL_SECONDS: int = 60 * 15
+    QUERY_CONDENSER_CACHE_MAX_SIZE: int = 2000
+
+    # Server-side chat sessions (rolling summary of older turns + last N turns)
+    SESSION_RECENT_TURNS: int = 3
+    SESSION_SUMMARY_BATCH_TURNS: int = 2
+    SESSION_SUMMARY_MODEL: str = "gpt-4o-mini"
+    SESSION_SUMMARY_MAX_CHARS: int = 2000
+
+    # Entity extraction for the query-time graph view: "local" matches the
+    # user's known graph entities with an Aho-Corasick automaton, "llm" calls
+    # the LLM-backed EntityExtractor
+    ENTITY_EXTRACTION_MODE: str = "local"
+    LOCAL_ENTITY_MIN_NAME_LENGTH: int = 3
+    LOCAL_ENTITY_MAX_NAMES: int = 50000
+    LOCAL_ENTITY_AUTOMATON_TTL_SECONDS: int = 60 * 60
+    LOCAL_ENTITY_AUTOMATON_MAX_USERS: int = 1000
+
+    # Document Summaries (map-reduce over parent chunks at ingest; summary
+    # queries use the stored summaries instead of retrieval)
+    ENABLE_DOCUMENT_SUMMARIES: bool = True
+    DOCUMENT_SUMMARY_MODEL: str = "gpt-4o-mini"
+    DOCUMENT_SUMMARY_SECTION_MAX_CHARS: int = 6000
+    DOCUMENT_SUMMARY_MAX_SECTIONS: int = 12
+    DOCUMENT_SUMMARY_CONCURRENCY: int = 4
+
+    # Multi-document summaries: per-document map calls run concurrently,
+    # followed by a short connections (reduce) pass
+    SUMMARY_MAP_REDUCE_ENABLED: bool = True
+    SUMMARY_MAP_CONCURRENCY: int = 4
 
     # Graph Builder
     GRAPH_BUILDER_MAX_BATCH_CHARS: int = 3000
@@ -124,6 +198,105 @@ class Settings(BaseSettings):
     JUDGE_THRESHOLD: float = 0.6
     JUDGE_MAX_RETRIES: int = 1
     JUDGE_SCORE_WEIGHTS: str = "0.30,0.25,0.20,0.15,0.10"
+    # "llm" judges every answer; "tiered" scores locally first, passes clearly
+    # grounded answers without the LLM, and calls the LLM judge to confirm
+    # likely failures, in the uncertain band, or on a sampled fraction of traffic
+    JUDGE_MODE: str = "tiered"
+    JUDGE_HEURISTIC_PASS_ABOVE: float = 0.75
+    JUDGE_HEURISTIC_FAIL_BELOW: float = 0.35
+    JUDGE_UNCERTAIN_SAMPLE_RATE: float = 1.0
+    JUDGE_LLM_SAMPLE_RATE: float = 0.05
+    # Top vector score, and its lead over the median score, that count as full
+    # retrieval confidence
+    JUDGE_RETRIEVAL_SCORE_TARGET: float = 0.6
+    JUDGE_RETRIEVAL_SPREAD_TARGET: float = 0.1
+    # Post-hoc judging: return the answer immediately and deliver the verdict
+    # as a follow-up SSE event or via GET /query/reflection/{id}
+    JUDGE_ASYNC: bool = False
+    JUDGE_ASYNC_REGENERATE: bool = False
+    JUDGE_ASYNC_STREAM_WAIT_SECONDS: float = 30.0
+    JUDGE_ASYNC_RESULT_TTL_SECONDS: int = 60 * 15
+    JUDGE_ASYNC_RESULT_MAX_SIZE: int = 5000
+
+    # Circuit breakers per external dependency (pinecone, neo4j, openai),
+    # evaluated over a rolling window of recent calls
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_FAILURE_RATE_THRESHOLD: float = 0.5
+    CIRCUIT_SLOW_CALL_SECONDS: float = 10.0
+    CIRCUIT_SLOW_CALL_RATE_THRESHOLD: float = 0.8
+    CIRCUIT_WINDOW_SIZE: int = 20
+    CIRCUIT_MIN_CALLS: int = 5
+    CIRCUIT_OPEN_SECONDS: float = 30.0
+    CIRCUIT_HALF_OPEN_MAX_CALLS: int = 1
+
+    # On-demand cProfile of one request (admins: header or ?profile=1)
+    PROFILING_ENABLED: bool = True
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_DIR: str = "./data/profiles"
+    PROFILE_MAX_FILES: int = 20
+
+    # Event-loop monitor: heartbeat lag gauge plus stack capture of any call
+    # holding the loop longer than LOOP_SLOW_CALLBACK_MS (report in /health)
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.05
+    LOOP_SLOW_CALLBACK_MS: int = 100
+    LOOP_MONITOR_MAX_SITES: int = 50
+    LOOP_MONITOR_STACK_DEPTH: int = 12
+
+    # Dependency health: probed in the background every HEALTH_PROBE_INTERVAL_SECONDS
+    # and served from cache by /health and /readyz (/livez never touches
+    # dependencies). /readyz fails when a required dependency is down or the
+    # last probe round is older than HEALTH_STALE_AFTER_SECONDS.
+    HEALTH_PROBE_ENABLED: bool = True
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 30.0
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 5.0
+    HEALTH_STALE_AFTER_SECONDS: float = 120.0
+    HEALTH_REQUIRED_DEPENDENCIES: list = ["pinecone", "openai"]
+
+    # Prometheus metrics at /metrics (stage latencies, cache hits, external calls)
+    METRICS_ENABLED: bool = True
+
+    # Admission control for /query and /query/stream (per worker). Owner
+    # requests are queued ahead of other users; exact cache hits bypass the
+    # queue. Requests are shed with 503 + Retry-After when the queue is full
+    # or the wait times out.
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 8
+    ADMISSION_MAX_QUEUE: int = 32
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+
+    # Retry budgets per dependency: each success earns RETRY_BUDGET_RATIO of a
+    # retry, plus a small time-based floor; retries are denied once spent
+    RETRY_BUDGET_ENABLED: bool = True
+    RETRY_BUDGET_RATIO: float = 0.1
+    RETRY_BUDGET_MIN_PER_SECOND: float = 0.5
+    RETRY_BUDGET_MAX_TOKENS: float = 10.0
+
+    # Hedged reads (embed_query, Pinecone query): start one duplicate when the
+    # first call is slower than the observed percentile for that operation.
+    # Hedges are capped at HEDGE_BUDGET_RATIO of requests (token bucket).
+    HEDGING_ENABLED: bool = False
+    HEDGE_PERCENTILE: float = 0.95
+    HEDGE_MIN_SAMPLES: int = 20
+    HEDGE_WINDOW_SIZE: int = 500
+    HEDGE_MIN_DELAY_SECONDS: float = 0.02
+    HEDGE_BUDGET_RATIO: float = 0.05
+    HEDGE_BUDGET_BURST: float = 10.0
+
+    # Request deadline (seconds; 0 disables). Clients may ask for less via the
+    # header. Optional stages get their budget, capped by the time left after
+    # the generation reserve, and are skipped or cut short when time runs low.
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    REQUEST_DEADLINE_MAX_SECONDS: float = 120.0
+    REQUEST_DEADLINE_HEADER: str = "X-Request-Timeout"
+    DEADLINE_GENERATION_RESERVE_SECONDS: float = 8.0
+    DEADLINE_ROUTING_SECONDS: float = 3.0
+    DEADLINE_EXPANSION_SECONDS: float = 3.0
+    DEADLINE_GRAPH_SECONDS: float = 3.0
+    DEADLINE_RERANK_SECONDS: float = 4.0
+    DEADLINE_JUDGE_SECONDS: float = 10.0
+    DEADLINE_ENTITY_SECONDS: float = 3.0
 
     class Config:
         env_file = [".env", str(Path(__file__).resolve().parents[3] / ".env")]
@@ -0,0 +1,110 @@
+"""Per-request deadlines propagated to every pipeline stage via contextvars."""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable, List, Optional, TypeVar
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Below this many seconds a stage is skipped rather than started
+MIN_STAGE_SECONDS = 0.05
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+_degraded: ContextVar[Optional[List[str]]] = ContextVar("degraded_stages", default=None)
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """Parse a client-supplied timeout header (seconds); None if absent or invalid."""
+    try:
+        seconds = float(value) if value else None
+    except ValueError:
+        return None
+    return seconds if seconds and seconds > 0 else None
+
+
+def start(seconds: Optional[float] = None) -> None:
+    """Start the deadline for the current request.
+
+    Uses REQUEST_DEADLINE_SECONDS when seconds is None; client-supplied values
+    are capped at REQUEST_DEADLINE_MAX_SECONDS. A non-positive config value
+    disables the deadline.
+    """
+    if seconds is None:
+        seconds = settings.REQUEST_DEADLINE_SECONDS
+    seconds = min(seconds, settings.REQUEST_DEADLINE_MAX_SECONDS)
+    _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+    _degraded.set([])
+
+
+def clear() -> None:
+    """Drop the deadline, e.g. for background work spawned from a request."""
+    _deadline.set(None)
+    _degraded.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None when no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def stage_timeout(budget: float, reserve: float = 0.0) -> Optional[float]:
+    """Time a stage may use: its budget, capped by what is left after the reserve."""
+    left = remaining()
+    if left is None:
+        return None
+    return max(0.0, min(budget, left - reserve))
+
+
+def can_afford(budget: float, reserve: float = 0.0) -> bool:
+    """True when the full budget still fits before the deadline (minus the reserve)."""
+    left = remaining()
+    return left is None or left - reserve >= budget
+
+
+def mark_degraded(stage: str) -> None:
+    """Record that a stage was skipped or cut short for this request."""
+    logger.warning(f"Deadline: degraded stage '{stage}' ({remaining() or 0:.2f}s left)")
+    stages = _degraded.get()
+    if stages is not None and stage not in stages:
+        stages.append(stage)
+
+
+def degraded_stages() -> List[str]:
+    """Stages degraded so far in the current request."""
+    return list(_degraded.get() or [])
+
+
+async def run_stage(
+    stage: str,
+    make_call: Callable[[], Awaitable[T]],
+    budget: float,
+    fallback: T,
+    reserve: float = 0.0,
+) -> T:
+    """Run an optional stage within its budget, returning fallback if time runs out.
+
+    make_call is only invoked when there is time to start the stage.
+    Without a request deadline the stage runs unbounded, as before.
+    The stage's duration is recorded under its name.
+    """
+    timeout = stage_timeout(budget, reserve)
+    if timeout is not None and timeout < MIN_STAGE_SECONDS:
+        mark_degraded(stage)
+        return fallback
+    with metrics.time_stage(stage):
+        if timeout is None:
+            return await make_call()
+        try:
+            return await asyncio.wait_for(make_call(), timeout)
+        except asyncio.TimeoutError:
+            mark_degraded(stage)
+            return fallback
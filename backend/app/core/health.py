@@ -0,0 +1,202 @@
+"""Background dependency probes served from cache by /health and /readyz."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Optional[Dict[str, Any]]]
+
+# Long-lived clients shared by successive probes; dropped after a failure so
+# the next probe reconnects
+_clients: Dict[str, Any] = {}
+
+
+def _client(name: str, factory: Callable[[], Any]) -> Any:
+    client = _clients.get(name)
+    if client is None:
+        client = factory()
+        _clients[name] = client
+    return client
+
+
+def _discard_client(name: str) -> None:
+    client = _clients.pop(name, None)
+    close = getattr(client, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception:
+            pass
+
+
+def _probe_pinecone() -> Dict[str, Any]:
+    from app.models.pinecone_store import PineconeStore
+    store = _client("pinecone", PineconeStore)
+    stats = store.index.describe_index_stats()
+    return {"total_vectors": stats.total_vector_count}
+
+
+def _probe_neo4j() -> None:
+    from neo4j import GraphDatabase
+    driver = _client("neo4j", lambda: GraphDatabase.driver(
+        settings.NEO4J_URI,
+        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+    ))
+    driver.verify_connectivity()
+
+
+def _probe_openai() -> None:
+    from openai import OpenAI
+    client = _client("openai", lambda: OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+        max_retries=0,
+    ))
+    client.models.list(limit=1)
+
+
+PROBES: Dict[str, Probe] = {
+    "pinecone": _probe_pinecone,
+    "neo4j": _probe_neo4j,
+    "openai": _probe_openai,
+}
+
+
+class HealthProber:
+    """Probes dependencies every ``interval`` seconds and caches the results.
+
+    Each probe runs in a worker thread with a ``timeout``; a probe that is
+    still hanging from the previous round is awaited again rather than
+    started twice. Without the background task (``start`` not called),
+    ``snapshot`` refreshes on demand once the cache is older than
+    ``interval``, so probes never run more often than that either way.
+    """
+
+    def __init__(self, probes: Dict[str, Probe], interval: float, timeout: float):
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._checked_at: Optional[float] = None  # monotonic
+        self._checked_at_wall: Optional[str] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Probe in the background on the running loop, starting now."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health probe round failed")
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            results = await asyncio.gather(*(self._probe(name, probe) for name, probe in self.probes.items()))
+            self._results = dict(results)
+            self._checked_at = time.monotonic()
+            self._checked_at_wall = datetime.now(timezone.utc).isoformat()
+
+    async def _probe(self, name: str, probe: Probe) -> Tuple[str, Dict[str, Any]]:
+        pending = self._pending.get(name)
+        if pending is None or pending.done():
+            pending = asyncio.ensure_future(asyncio.to_thread(probe))
+            self._pending[name] = pending
+        start = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(asyncio.shield(pending), self.timeout)
+            result = {"status": "ok", **(details or {})}
+        except asyncio.TimeoutError:
+            result = {"status": "error", "detail": f"probe timed out after {self.timeout}s"}
+        except Exception as exc:
+            _discard_client(name)
+            result = {"status": "error", "detail": str(exc)}
+        elapsed = time.perf_counter() - start
+        metrics.HEALTH_PROBE_SECONDS.observe(elapsed, dependency=name)
+        if result["status"] != "ok":
+            metrics.HEALTH_PROBE_FAILURES.inc(dependency=name)
+            logger.warning(f"Health probe for {name} failed: {result['detail']}")
+        result["latency_ms"] = round(elapsed * 1000, 1)
+        return name, result
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last completed probe round (None before the first)."""
+        return None if self._checked_at is None else time.monotonic() - self._checked_at
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Cached dependency status; refreshed inline only without the background task."""
+        if self._task is None and (self.age is None or self.age >= self.interval):
+            await self.refresh()
+        return {
+            "dependencies": {name: dict(result) for name, result in self._results.items()},
+            "checked_at": self._checked_at_wall,
+        }
+
+    def readiness(self, required: List[str], stale_after: float) -> Tuple[bool, List[str]]:
+        """Whether required dependencies were healthy in a recent probe round, and why not."""
+        if self.age is None:
+            return False, ["dependencies not probed yet"]
+        if self.age > stale_after:
+            return False, [f"health probes are stale ({self.age:.0f}s old)"]
+        reasons = [
+            f"{name}: {self._results.get(name, {}).get('detail', 'not probed')}"
+            for name in required
+            if self._results.get(name, {}).get("status") != "ok"
+        ]
+        return not reasons, reasons
+
+    def up(self) -> Dict[str, bool]:
+        return {name: result["status"] == "ok" for name, result in self._results.items()}
+
+
+_prober: Optional[HealthProber] = None
+
+
+def get_prober() -> HealthProber:
+    global _prober
+    if _prober is None:
+        _prober = HealthProber(
+            PROBES,
+            interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+            timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+        )
+    return _prober
+
+
+def start() -> None:
+    """Start background probing (no-op when disabled: /health then probes on demand)."""
+    if settings.HEALTH_PROBE_ENABLED:
+        get_prober().start()
+
+
+async def stop() -> None:
+    if _prober is not None:
+        await _prober.stop()
+    for name in list(_clients):
+        _discard_client(name)
+
+
+def reset() -> None:
+    global _prober
+    _prober = None
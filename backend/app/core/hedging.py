@@ -0,0 +1,163 @@
+"""Hedged requests for idempotent reads, with per-operation latency histograms."""
+
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds in seconds (the last bucket is +Inf)
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class LatencyTracker:
+    """Latency histogram plus a rolling sample window for percentile estimates."""
+
+    def __init__(self, window_size: int):
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self._samples: Deque[float] = deque(maxlen=window_size)
+        self._lock = Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.count += 1
+            self.total_seconds += seconds
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentile over the recent window; None until HEDGE_MIN_SAMPLES are seen."""
+        with self._lock:
+            if len(self._samples) < settings.HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum_seconds": round(self.total_seconds, 4),
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.buckets)),
+            }
+
+
+class HedgeBudget:
+    """Token bucket that caps hedges at a fraction of primary requests."""
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+_trackers: Dict[str, LatencyTracker] = {}
+_trackers_lock = Lock()
+_budget: Optional[HedgeBudget] = None
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def get_tracker(operation: str) -> LatencyTracker:
+    with _trackers_lock:
+        tracker = _trackers.get(operation)
+        if tracker is None:
+            tracker = LatencyTracker(settings.HEDGE_WINDOW_SIZE)
+            _trackers[operation] = tracker
+            _stats[operation] = {"hedged": 0, "hedge_wins": 0}
+        return tracker
+
+
+def _get_budget() -> HedgeBudget:
+    global _budget
+    if _budget is None:
+        _budget = HedgeBudget(settings.HEDGE_BUDGET_RATIO, settings.HEDGE_BUDGET_BURST)
+    return _budget
+
+
+def snapshot_all() -> Dict[str, Dict[str, Any]]:
+    """Latency histograms and hedge counts per operation."""
+    with _trackers_lock:
+        items = list(_trackers.items())
+    return {name: {**tracker.snapshot(), **_stats.get(name, {})} for name, tracker in items}
+
+
+def reset_all() -> None:
+    global _budget
+    with _trackers_lock:
+        _trackers.clear()
+        _stats.clear()
+    _budget = None
+
+
+async def _timed(make_call: Callable[[], Awaitable[T]], tracker: LatencyTracker) -> T:
+    start = time.monotonic()
+    result = await make_call()
+    tracker.observe(time.monotonic() - start)
+    return result
+
+
+async def hedged(operation: str, make_call: Callable[[], Awaitable[T]]) -> T:
+    """Await make_call(), starting one duplicate if it is slower than the observed p95.
+
+    Only for idempotent reads. The first successful result wins and the other
+    call is cancelled (a call already running in a worker thread finishes in
+    the background and its result is discarded). Hedges draw on a global
+    budget so they add at most HEDGE_BUDGET_RATIO extra load.
+    """
+    tracker = get_tracker(operation)
+    if not settings.HEDGING_ENABLED:
+        return await _timed(make_call, tracker)
+
+    budget = _get_budget()
+    budget.deposit()
+    delay = tracker.percentile(settings.HEDGE_PERCENTILE)
+
+    primary = asyncio.ensure_future(_timed(make_call, tracker))
+    if delay is None:
+        return await primary
+
+    done, _ = await asyncio.wait({primary}, timeout=max(delay, settings.HEDGE_MIN_DELAY_SECONDS))
+    if done or not budget.try_spend():
+        return await primary
+
+    _stats[operation]["hedged"] += 1
+    logger.debug(f"Hedging '{operation}' after {delay:.3f}s")
+    hedge = asyncio.ensure_future(_timed(make_call, tracker))
+    pending = {primary, hedge}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _stats[operation]["hedge_wins"] += 1
+                    metrics.HEDGED_REQUESTS.inc(operation=operation, winner="hedge" if task is hedge else "primary")
+                    return task.result()
+                error = error or task.exception()
+        raise error  # both attempts failed
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,191 @@
+"""Event-loop lag gauge and blocking-call detector, cheap enough to run in production."""
+
+import asyncio
+import logging
+import sys
+import sysconfig
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = str(Path(__file__).resolve().parent.parent)
+_LIBRARY_DIRS = tuple(
+    {sysconfig.get_paths()[key] for key in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+def _call_site(frame: FrameType) -> Tuple[str, List[str]]:
+    """Name the code responsible for a stall and format the stack.
+
+    Picks the innermost frame inside the app package, else the innermost
+    frame outside the stdlib/site-packages, else the innermost frame.
+    """
+    frames = [f for f, _ in traceback.walk_stack(frame)]  # innermost first
+    chosen = (
+        next((f for f in frames if f.f_code.co_filename.startswith(_APP_DIR)), None)
+        or next((f for f in frames if not f.f_code.co_filename.startswith(_LIBRARY_DIRS)), None)
+        or frames[0]
+    )
+    filename = chosen.f_code.co_filename
+    if filename.startswith(_APP_DIR):
+        filename = "app" + filename[len(_APP_DIR):]
+    site = f"{filename}:{chosen.f_lineno} in {chosen.f_code.co_name}"
+    stack = traceback.format_stack(frame, limit=settings.LOOP_MONITOR_STACK_DEPTH)
+    return site, [line.rstrip() for line in stack]
+
+
+class LoopMonitor:
+    """Measures event-loop lag and captures the stack of calls that block it.
+
+    A probe task sleeps ``interval`` seconds in a loop and records how late it
+    wakes (the lag) as a heartbeat. A watchdog thread checks the heartbeat;
+    when it is older than ``threshold`` the loop is blocked, so the loop
+    thread's current stack is captured and the stall is attributed to the
+    innermost app frame. Offenders are aggregated by call site.
+    """
+
+    def __init__(self, interval: float, threshold: float, max_sites: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_sites = max_sites
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self._offenders: Dict[str, Dict[str, Any]] = {}
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._probe: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._probe = asyncio.get_running_loop().create_task(self._run_probe())
+        self._watchdog = threading.Thread(target=self._run_watchdog, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._probe:
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=1.0)
+
+    async def _run_probe(self) -> None:
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.lag = max(0.0, now - start - self.interval)
+            self.max_lag = max(self.max_lag, self.lag)
+            self._heartbeat = now
+            metrics.LOOP_LAG.set(self.lag)
+
+    def _run_watchdog(self) -> None:
+        stall_start: Optional[float] = None
+        stall_site: Optional[str] = None
+        while not self._stopped.wait(self.interval):
+            heartbeat = self._heartbeat
+            if stall_start is not None and heartbeat != stall_start:
+                # Loop is running again: the stall lasted until this heartbeat
+                self._record(stall_site, max(0.0, heartbeat - stall_start - self.interval))
+                stall_start = stall_site = None
+            if stall_start is None and time.monotonic() - heartbeat >= self.threshold + self.interval:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is None:
+                    continue
+                stall_start = heartbeat
+                stall_site = self._capture(frame)
+
+    def _capture(self, frame: FrameType) -> str:
+        site, stack = _call_site(frame)
+        with self._lock:
+            entry = self._offenders.get(site)
+            if entry is None:
+                if len(self._offenders) >= self.max_sites:
+                    # Evict the least costly site to stay bounded
+                    cheapest = min(self._offenders, key=lambda s: self._offenders[s]["total_seconds"])
+                    del self._offenders[cheapest]
+                entry = {"site": site, "count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "stack": stack}
+                self._offenders[site] = entry
+                logger.warning("Event loop blocked at %s\n%s", site, "\n".join(stack))
+            entry["count"] += 1
+        self.stalls += 1
+        metrics.LOOP_STALLS.inc()
+        return site
+
+    def _record(self, site: Optional[str], seconds: float) -> None:
+        metrics.LOOP_STALL_SECONDS.observe(seconds)
+        with self._lock:
+            entry = self._offenders.get(site) if site else None
+            if entry is not None:
+                entry["total_seconds"] += seconds
+                entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def report(self, limit: int = 10, stacks: bool = False) -> Dict[str, Any]:
+        """Current lag plus the worst offending call sites by total blocked time.
+
+        Stacks expose source paths and code, so they are only included when
+        asked for (the admin endpoint), never in the public /health report.
+        """
+        with self._lock:
+            offenders = sorted(self._offenders.values(), key=lambda e: e["total_seconds"], reverse=True)[:limit]
+            offenders = [
+                {
+                    "site": entry["site"],
+                    "count": entry["count"],
+                    "total_seconds": round(entry["total_seconds"], 4),
+                    "max_seconds": round(entry["max_seconds"], 4),
+                    **({"stack": list(entry["stack"])} if stacks else {}),
+                }
+                for entry in offenders
+            ]
+        return {
+            "lag_seconds": round(self.lag, 4),
+            "max_lag_seconds": round(self.max_lag, 4),
+            "stalls": self.stalls,
+            "offenders": offenders,
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def start() -> Optional[LoopMonitor]:
+    """Start the process-wide monitor on the running loop (no-op when disabled)."""
+    global _monitor
+    if not settings.LOOP_MONITOR_ENABLED or _monitor is not None:
+        return _monitor
+    _monitor = LoopMonitor(
+        interval=settings.LOOP_MONITOR_INTERVAL_SECONDS,
+        threshold=settings.LOOP_SLOW_CALLBACK_MS / 1000,
+        max_sites=settings.LOOP_MONITOR_MAX_SITES,
+    )
+    _monitor.start()
+    return _monitor
+
+
+async def stop() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
+
+
+def report(limit: int = 10, stacks: bool = False) -> Optional[Dict[str, Any]]:
+    return _monitor.report(limit, stacks) if _monitor else None
@@ -0,0 +1,323 @@
+"""In-process metrics (counters, gauges, histograms) rendered in Prometheus text format."""
+
+import bisect
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from app.core import tracing
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """Point-in-time value, either set directly or read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> Iterator[str]:
+        if self._collect is not None:
+            items = list(self._collect().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, str]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+
+
+class _StageTimer(_Timer):
+    """Timer that also opens a span when the request is being traced."""
+    __slots__ = ("_span",)
+
+    def __enter__(self) -> "_StageTimer":
+        self._span = tracing.open_span(self._labels["stage"])
+        return super().__enter__()
+
+    def __exit__(self, *exc_info) -> None:
+        super().__exit__(*exc_info)
+        tracing.close_span(self._span)
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels: str) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return entry[2] if entry else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = [(key, list(counts), total, count) for key, (counts, total, count) in self._values.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Clear recorded values (registered metrics stay registered)."""
+    for metric in REGISTRY:
+        with metric._lock:
+            metric._values.clear()
+
+
+# --- Pipeline metrics -------------------------------------------------------
+
+STAGE_SECONDS = Histogram(
+    "docchat_stage_duration_seconds",
+    "Duration of pipeline stages (routing, expansion, embedding, vector_search, graph, rerank, assembly, generation, judge, ...).",
+    ["stage"],
+)
+CACHE_REQUESTS = Counter(
+    "docchat_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+EXTERNAL_CALLS = Counter(
+    "docchat_external_calls_total",
+    "Calls to external dependencies by outcome (ok, error, cancelled, rejected by an open circuit).",
+    ["dependency", "operation", "outcome"],
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "docchat_external_call_duration_seconds",
+    "Duration of calls to external dependencies.",
+    ["dependency", "operation"],
+)
+HEDGED_REQUESTS = Counter(
+    "docchat_hedged_requests_total",
+    "Hedged reads by operation and which call won (primary or hedge).",
+    ["operation", "winner"],
+)
+RETRY_DECISIONS = Counter(
+    "docchat_retries_total",
+    "Retries allowed or denied by the per-dependency retry budget.",
+    ["dependency", "outcome"],
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "docchat_admission_wait_seconds",
+    "Time query requests spent waiting for an admission slot.",
+    ["priority"],
+)
+ADMISSION_REJECTED = Counter(
+    "docchat_admission_rejected_total",
+    "Query requests shed by admission control.",
+    ["reason"],
+)
+DOCUMENTS_PROCESSED = Counter(
+    "docchat_documents_processed_total",
+    "Documents run through ingestion by file type and outcome.",
+    ["file_type", "outcome"],
+)
+LLM_CALLS = Counter(
+    "docchat_llm_calls_total",
+    "Chat completion and embedding calls by operation.",
+    ["operation"],
+)
+LLM_TOKENS = Counter(
+    "docchat_llm_tokens_total",
+    "Tokens sent to or generated by OpenAI by operation and kind (prompt, completion, embedding).",
+    ["operation", "kind"],
+)
+HEALTH_PROBE_SECONDS = Histogram(
+    "docchat_health_probe_duration_seconds",
+    "Duration of background dependency health probes.",
+    ["dependency"],
+)
+HEALTH_PROBE_FAILURES = Counter(
+    "docchat_health_probe_failures_total",
+    "Dependency health probes that failed or timed out.",
+    ["dependency"],
+)
+LOOP_LAG = Gauge(
+    "docchat_event_loop_lag_seconds",
+    "How late the event loop ran its last heartbeat.",
+)
+LOOP_STALLS = Counter(
+    "docchat_event_loop_stalls_total",
+    "Times a call held the event loop longer than LOOP_SLOW_CALLBACK_MS.",
+)
+LOOP_STALL_SECONDS = Histogram(
+    "docchat_event_loop_stall_seconds",
+    "How long detected blocking calls held the event loop.",
+)
+
+
+def time_stage(stage: str) -> _Timer:
+    """Time a pipeline stage: ``with metrics.time_stage("rerank"): ...``.
+
+    Also records a span when the request is being traced.
+    """
+    return _StageTimer(STAGE_SECONDS, {"stage": stage})
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+    tracing.record_cache(cache, hit)
+
+
+# --- Runtime state, read at scrape time -------------------------------------
+
+def _admission_state() -> Dict[LabelValues, float]:
+    from app.core import admission
+    snapshot = admission.get_controller().snapshot()
+    return {("in_flight",): snapshot["in_flight"], ("queue_depth",): snapshot["queue_depth"]}
+
+
+def _circuit_state() -> Dict[LabelValues, float]:
+    from app.core import circuit_breaker
+    levels = {circuit_breaker.CLOSED: 0, circuit_breaker.HALF_OPEN: 1, circuit_breaker.OPEN: 2}
+    return {(name,): levels[state["state"]] for name, state in circuit_breaker.snapshot_all().items()}
+
+
+def _retry_budget_tokens() -> Dict[LabelValues, float]:
+    from app.core import retry_budget
+    return {(name,): state["tokens"] for name, state in retry_budget.snapshot_all().items()}
+
+
+def _dependency_up() -> Dict[LabelValues, float]:
+    from app.core import health
+    return {(name,): 1.0 if up else 0.0 for name, up in health.get_prober().up().items()}
+
+
+Gauge("docchat_dependency_up", "Whether the last health probe of a dependency succeeded.", ["dependency"], collect=_dependency_up)
+Gauge("docchat_admission", "Admission controller in-flight pipelines and queue depth.", ["state"], collect=_admission_state)
+Gauge("docchat_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open).", ["dependency"], collect=_circuit_state)
+Gauge("docchat_retry_budget_tokens", "Retry tokens left per dependency.", ["dependency"], collect=_retry_budget_tokens)
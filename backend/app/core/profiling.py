@@ -0,0 +1,157 @@
+"""On-demand cProfile capture of a single live request (admin only)."""
+
+import asyncio
+import cProfile
+import logging
+import pstats
+import re
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from starlette.requests import Request
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_PROFILE_ID = re.compile(r"^[a-z_]+-[0-9a-f]{12}$")
+
+_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+# One profiled request at a time: cProfile on the event loop thread sees every coroutine
+_busy = Lock()
+
+
+class RequestProfile:
+    """cProfile data for one request: the event loop thread plus its to_thread work."""
+
+    def __init__(self, label: str):
+        self.profile_id = f"{label}-{uuid.uuid4().hex[:12]}"
+        self._profilers: List[cProfile.Profile] = []
+        self._lock = Lock()
+        self._loop_profiler = self._enable()
+
+    def _enable(self) -> Optional[cProfile.Profile]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is active on this thread (or process-wide on 3.12+,
+            # where the active one already sees this thread's calls)
+            return None
+        with self._lock:
+            self._profilers.append(profiler)
+        return profiler
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call func in the current (worker) thread under its own profiler."""
+        profiler = self._enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if profiler:
+                profiler.disable()
+
+    def dump(self, path: Path) -> bool:
+        if self._loop_profiler:
+            self._loop_profiler.disable()
+        stats: Optional[pstats.Stats] = None
+        with self._lock:
+            profilers = list(self._profilers)
+        for profiler in profilers:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profiler)
+                else:
+                    stats.add(profiler)
+            except TypeError:
+                continue  # profiler recorded nothing
+        if stats is None:
+            return False
+        stats.dump_stats(str(path))
+        return True
+
+
+def _profile_dir() -> Path:
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def requested(request: Request, current_user: dict) -> bool:
+    """Whether this request asked to be profiled (header or ?profile=1) by an admin."""
+    if not settings.PROFILING_ENABLED or not current_user.get("is_admin"):
+        return False
+    flag = request.headers.get(settings.PROFILE_HEADER) or request.query_params.get("profile")
+    return flag in ("1", "true", "yes")
+
+
+def start(label: str) -> Optional[RequestProfile]:
+    """Profile the rest of the current request; None when another profile is running."""
+    if not _busy.acquire(blocking=False):
+        logger.warning("Profiling skipped: another request is being profiled")
+        return None
+    profile = RequestProfile(label)
+    _profile.set(profile)
+    logger.info(f"Profiling request as {profile.profile_id}")
+    return profile
+
+
+def finish(profile: Optional[RequestProfile]) -> Optional[str]:
+    """Stop profiling and store the profile; returns its id when data was written."""
+    if profile is None:
+        return None
+    _profile.set(None)
+    try:
+        written = profile.dump(_profile_dir() / f"{profile.profile_id}.prof")
+        _prune()
+        return profile.profile_id if written else None
+    except Exception as exc:
+        logger.error(f"Failed to store profile {profile.profile_id}: {exc}")
+        return None
+    finally:
+        _busy.release()
+
+
+def clear() -> None:
+    """Stop profiling work spawned from the request (e.g. background tasks)."""
+    _profile.set(None)
+
+
+def _prune() -> None:
+    """Keep only the newest PROFILE_MAX_FILES profiles."""
+    files = sorted(_profile_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in files[settings.PROFILE_MAX_FILES:]:
+        stale.unlink(missing_ok=True)
+
+
+async def to_thread(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """asyncio.to_thread that profiles the worker-thread call when the request is profiled."""
+    profile = _profile.get()
+    if profile is None:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return await asyncio.to_thread(profile.run, func, *args, **kwargs)
+
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Stored profiles, newest first."""
+    files = sorted(_profile_dir().glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            "profile_id": path.stem,
+            "size_bytes": path.stat().st_size,
+            "created_at": datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).isoformat(),
+        }
+        for path in files
+    ]
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    """Path of a stored profile, or None for unknown or malformed ids."""
+    if not _PROFILE_ID.match(profile_id):
+        return None
+    path = _profile_dir() / f"{profile_id}.prof"
+    return path if path.exists() else None
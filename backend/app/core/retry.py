@@ -4,6 +4,9 @@ import asyncio
 import errno
 import logging
 import time as _time
+from typing import Optional
+from app.core.circuit_breaker import CircuitOpenError, get_breaker
+from app.core.retry_budget import RetryBudget, get_budget
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +15,12 @@ def is_retryable(exc: BaseException) -> bool:
     """Determine whether an exception is transient and worth retrying.
 
     Returns True for network/timeout/server errors.
-    Returns False for auth, permission, or validation errors.
+    Returns False for auth, permission, or validation errors, and for calls
+    rejected by an open circuit breaker.
     """
+    if isinstance(exc, CircuitOpenError):
+        return False
+
     # stdlib network errors — always retryable
     if isinstance(exc, (ConnectionError, TimeoutError)):
         return True
@@ -74,6 +81,12 @@ def is_retryable(exc: BaseException) -> bool:
     return False
 
 
+def _budget_for(dependency: Optional[str]) -> Optional[RetryBudget]:
+    # Budgets are keyed on a fixed dependency name, never on operation_name:
+    # that is a per-call log label and would create a budget per document.
+    return get_budget(dependency) if dependency else None
+
+
 async def retry_async(
     func,
     *args,
@@ -81,6 +94,8 @@ async def retry_async(
     base_delay: float = 1.0,
     max_delay: float = 10.0,
     operation_name: str = "operation",
+    circuit: Optional[str] = None,
+    dependency: Optional[str] = None,
     **kwargs,
 ):
     """Execute an async callable with retry and exponential backoff.
@@ -90,21 +105,33 @@ async def retry_async(
         max_attempts: Maximum number of attempts (including the first).
         base_delay: Initial delay in seconds between retries.
         max_delay: Maximum delay cap in seconds.
-        operation_name: Human-readable name for logging.
+        operation_name: Human-readable name for logging only.
+        circuit: Optional dependency name; each attempt goes through its
+            circuit breaker and an open circuit fails without retrying.
+        dependency: Dependency whose retry budget the retries spend;
+            defaults to ``circuit``. Without either, retries are unbudgeted.
 
     Returns:
         The return value of func.
 
     Raises:
-        The last exception if all attempts fail or the error is not retryable.
+        The last exception if all attempts fail, the error is not retryable,
+        or the dependency's retry budget is exhausted.
     """
     last_exception = None
+    budget = _budget_for(dependency or circuit)
     for attempt in range(1, max_attempts + 1):
         try:
-            return await func(*args, **kwargs)
+            if circuit:
+                result = await get_breaker(circuit).call_async(func, *args, **kwargs)
+            else:
+                result = await func(*args, **kwargs)
+            if budget:
+                budget.record_success()
+            return result
         except Exception as exc:
             last_exception = exc
-            if attempt == max_attempts or not is_retryable(exc):
+            if attempt == max_attempts or not is_retryable(exc) or (budget and not budget.try_retry()):
                 logger.warning(
                     "%s failed (attempt %d/%d, not retrying): %s",
                     operation_name, attempt, max_attempts, exc,
@@ -127,6 +154,8 @@ def retry_sync(
     base_delay: float = 1.0,
     max_delay: float = 10.0,
     operation_name: str = "operation",
+    circuit: Optional[str] = None,
+    dependency: Optional[str] = None,
     **kwargs,
 ):
     """Execute a sync callable with retry and exponential backoff.
@@ -134,12 +163,19 @@ def retry_sync(
     Same semantics as retry_async but for synchronous functions.
     """
     last_exception = None
+    budget = _budget_for(dependency or circuit)
     for attempt in range(1, max_attempts + 1):
         try:
-            return func(*args, **kwargs)
+            if circuit:
+                result = get_breaker(circuit).call(func, *args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+            if budget:
+                budget.record_success()
+            return result
         except Exception as exc:
             last_exception = exc
-            if attempt == max_attempts or not is_retryable(exc):
+            if attempt == max_attempts or not is_retryable(exc) or (budget and not budget.try_retry()):
                 logger.warning(
                     "%s failed (attempt %d/%d, not retrying): %s",
                     operation_name, attempt, max_attempts, exc,
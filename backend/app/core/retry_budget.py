@@ -0,0 +1,94 @@
+"""Process-wide retry budgets, one token bucket per dependency."""
+
+import logging
+import time
+from threading import Lock
+from typing import Any, Dict
+from app.core.config import settings
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class RetryBudget:
+    """Token bucket that allows retries in proportion to successful calls.
+
+    Every success deposits ``ratio`` tokens and each retry spends one, so
+    retries stay near ``ratio`` of the healthy call volume however many
+    requests fail at once. A small time-based refill (``min_per_second``)
+    keeps low-traffic dependencies retryable. The bucket holds at most
+    ``max_tokens`` and starts full.
+    """
+
+    def __init__(self, name: str, ratio: float, min_per_second: float, max_tokens: float):
+        self.name = name
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._refilled_at = time.monotonic()
+        self.retries = 0
+        self.denied = 0
+        self._lock = Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._refilled_at) * self.min_per_second)
+        self._refilled_at = now
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_retry(self) -> bool:
+        """Spend one token for a retry; False (and counted) when the budget is exhausted."""
+        if not settings.RETRY_BUDGET_ENABLED:
+            return True
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries += 1
+                metrics.RETRY_DECISIONS.inc(dependency=self.name, outcome="allowed")
+                return True
+            self.denied += 1
+        metrics.RETRY_DECISIONS.inc(dependency=self.name, outcome="denied")
+        logger.warning(f"Retry budget '{self.name}' exhausted, retry denied")
+        return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill()
+            return {"tokens": round(self._tokens, 2), "retries": self.retries, "denied": self.denied}
+
+
+_budgets: Dict[str, RetryBudget] = {}
+_registry_lock = Lock()
+
+
+def get_budget(name: str) -> RetryBudget:
+    """Return the shared retry budget for a dependency, creating it from settings."""
+    with _registry_lock:
+        budget = _budgets.get(name)
+        if budget is None:
+            budget = RetryBudget(
+                name,
+                ratio=settings.RETRY_BUDGET_RATIO,
+                min_per_second=settings.RETRY_BUDGET_MIN_PER_SECOND,
+                max_tokens=settings.RETRY_BUDGET_MAX_TOKENS,
+            )
+            _budgets[name] = budget
+        return budget
+
+
+def snapshot_all() -> Dict[str, Dict[str, Any]]:
+    """Tokens and retry/denial counts for every budget used so far."""
+    with _registry_lock:
+        budgets = list(_budgets.values())
+    return {budget.name: budget.snapshot() for budget in budgets}
+
+
+def reset_all() -> None:
+    with _registry_lock:
+        _budgets.clear()
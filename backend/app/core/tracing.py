@@ -0,0 +1,136 @@
+"""Opt-in per-request span trees for debugging slow answers."""
+
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+
+class Span:
+    """A timed pipeline stage with nested child spans."""
+
+    __slots__ = ("name", "start", "end", "attributes", "children", "parent")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None):
+        self.name = name
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = {}
+        self.children: List["Span"] = []
+        self.parent = parent
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.perf_counter()
+        data: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 2),
+            "end_ms": round((end - origin) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+        }
+        if self.attributes:
+            data["attributes"] = dict(self.attributes)
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in sorted(self.children, key=lambda s: s.start)]
+        return data
+
+
+class Trace:
+    """Span tree plus request-wide candidate counts, cache decisions and external calls."""
+
+    def __init__(self):
+        self.root = Span("request")
+        self.counts: Dict[str, int] = {}
+        self.caches: List[Dict[str, str]] = []
+        self.external_calls: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "spans": self.root.to_dict(self.root.start),
+                "counts": dict(self.counts),
+                "caches": list(self.caches),
+                "external_calls": dict(self.external_calls),
+            }
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("request_trace", default=None)
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def start() -> Trace:
+    """Start tracing the current request."""
+    trace = Trace()
+    _trace.set(trace)
+    _current.set(trace.root)
+    return trace
+
+
+def finish() -> Optional[Dict[str, Any]]:
+    """Close the root span and return the trace as a dict (None when not tracing)."""
+    trace = _trace.get()
+    if trace is None:
+        return None
+    trace.root.end = time.perf_counter()
+    _trace.set(None)
+    _current.set(None)
+    return trace.to_dict()
+
+
+def clear() -> None:
+    """Stop tracing, e.g. for background work spawned from a request."""
+    _trace.set(None)
+    _current.set(None)
+
+
+def active() -> bool:
+    return _trace.get() is not None
+
+
+def open_span(name: str) -> Optional[Span]:
+    """Open a child of the current span; None (and no work) when not tracing."""
+    parent = _current.get()
+    if parent is None:
+        return None
+    span = Span(name, parent)
+    parent.children.append(span)
+    _current.set(span)
+    return span
+
+
+def close_span(span: Optional[Span]) -> None:
+    if span is None:
+        return
+    span.end = time.perf_counter()
+    # Set rather than reset a token: async generators may close spans in another context
+    _current.set(span.parent)
+
+
+def annotate(**attributes: Any) -> None:
+    """Attach attributes to the current span."""
+    span = _current.get()
+    if span is not None:
+        span.attributes.update(attributes)
+
+
+def count(step: str, value: int) -> None:
+    """Record the number of candidates left after a pipeline step."""
+    trace = _trace.get()
+    if trace is not None:
+        with trace._lock:
+            trace.counts[step] = value
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        with trace._lock:
+            trace.caches.append({"cache": cache, "result": "hit" if hit else "miss"})
+
+
+def record_external_call(dependency: str, operation: str) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        key = f"{dependency}.{operation}"
+        with trace._lock:
+            trace.external_calls[key] = trace.external_calls.get(key, 0) + 1
@@ -0,0 +1,146 @@
+"""Per-request accounting of LLM calls and prompt, completion and embedding tokens."""
+
+import logging
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import LLMResult
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+_ENCODING_NAME = "cl100k_base"
+_encoding: Any = None
+_encoding_loaded = False
+_encoding_lock = Lock()
+
+
+def _get_encoding() -> Any:
+    """tiktoken encoding, loaded once; None when unavailable (e.g. offline)."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(_ENCODING_NAME)
+                except Exception as exc:
+                    logger.warning(f"tiktoken unavailable, estimating tokens from length: {exc}")
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(texts: Iterable[str]) -> int:
+    """Token count for texts the API did not report usage for."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return sum(max(1, len(text) // 4) for text in texts if text)
+    return sum(len(encoding.encode(text, disallowed_special=())) for text in texts if text)
+
+
+class RequestUsage:
+    """LLM and embedding usage accumulated over one request, overall and per operation."""
+
+    FIELDS = ("llm_calls", "prompt_tokens", "completion_tokens", "embedding_calls", "embedding_tokens")
+
+    def __init__(self):
+        self.totals: Dict[str, int] = dict.fromkeys(self.FIELDS, 0)
+        self.operations: Dict[str, Dict[str, int]] = {}
+        self._lock = Lock()
+
+    def add(self, operation: str, **amounts: int) -> None:
+        with self._lock:
+            per_operation = self.operations.setdefault(operation, dict.fromkeys(self.FIELDS, 0))
+            for field, amount in amounts.items():
+                self.totals[field] += amount
+                per_operation[field] += amount
+
+    @property
+    def total_tokens(self) -> int:
+        return self.totals["prompt_tokens"] + self.totals["completion_tokens"] + self.totals["embedding_tokens"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.totals,
+                "total_tokens": self.total_tokens,
+                "operations": {name: dict(values) for name, values in self.operations.items()},
+            }
+
+
+_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+
+def start() -> RequestUsage:
+    """Start accounting usage for the current request."""
+    usage = RequestUsage()
+    _usage.set(usage)
+    return usage
+
+
+def finish() -> Optional[RequestUsage]:
+    """Stop accounting and return the request's usage (None when not started)."""
+    usage = _usage.get()
+    _usage.set(None)
+    return usage
+
+
+def clear() -> None:
+    """Stop accounting, e.g. for background work spawned from a request."""
+    _usage.set(None)
+
+
+def record_llm(operation: str, prompt_tokens: int, completion_tokens: int) -> None:
+    metrics.LLM_CALLS.inc(operation=operation)
+    metrics.LLM_TOKENS.inc(prompt_tokens, operation=operation, kind="prompt")
+    metrics.LLM_TOKENS.inc(completion_tokens, operation=operation, kind="completion")
+    usage = _usage.get()
+    if usage is not None:
+        usage.add(operation, llm_calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def record_embedding(operation: str, tokens: int) -> None:
+    metrics.LLM_CALLS.inc(operation=operation)
+    metrics.LLM_TOKENS.inc(tokens, operation=operation, kind="embedding")
+    usage = _usage.get()
+    if usage is not None:
+        usage.add(operation, embedding_calls=1, embedding_tokens=tokens)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Records every chat completion made by a model under the given operation name.
+
+    Uses the token usage reported by the API and counts tokens only when it is
+    missing (streamed completions).
+    """
+
+    # Run in the caller's thread and context so the request's usage is visible
+    run_inline = True
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._messages: Dict[UUID, List[List[BaseMessage]]] = {}
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._messages[run_id] = messages
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        messages = self._messages.pop(run_id, [])
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        prompt_tokens = token_usage.get("prompt_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(
+                message.content for batch in messages for message in batch if isinstance(message.content, str)
+            )
+        completion_tokens = token_usage.get("completion_tokens")
+        if completion_tokens is None:
+            completion_tokens = count_tokens(gen.text for gens in response.generations for gen in gens)
+        record_llm(self.operation, prompt_tokens, completion_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._messages.pop(run_id, None)
@@ -32,11 +32,12 @@ logger = logging.getLogger(__name__)
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from app.core.config import settings
 from app.core.limiter import limiter
+from app.core import admission, circuit_breaker, health, hedging, loop_monitor, metrics, retry_budget
 from app.api.v1.api import api_router
 from app.models.database import init_db
 from app.models.refresh_token import RefreshToken
@@ -67,11 +68,15 @@ async def lifespan(app: FastAPI):
                 logger.exception("Periodic refresh token cleanup failed")
 
     cleanup_task = asyncio.create_task(_periodic_token_cleanup())
+    loop_monitor.start()
+    health.start()
 
     yield
 
     # Shutdown
     cleanup_task.cancel()
+    await loop_monitor.stop()
+    await health.stop()
 
 # Create FastAPI application
 app = FastAPI(
@@ -110,54 +115,63 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint with dependency connectivity verification."""
-    dependencies = {}
-
-    # Check Pinecone
-    try:
-        from app.models.pinecone_store import PineconeStore
-        store = PineconeStore()
-        stats = store.get_stats()
-        dependencies["pinecone"] = {
-            "status": "ok",
-            "total_vectors": stats.get("total_vectors", 0),
-        }
-    except Exception as e:
-        dependencies["pinecone"] = {"status": "error", "detail": str(e)}
-
-    # Check Neo4j
-    try:
-        from neo4j import GraphDatabase
-        driver = GraphDatabase.driver(
-            settings.NEO4J_URI,
-            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
-        )
-        driver.verify_connectivity()
-        driver.close()
-        dependencies["neo4j"] = {"status": "ok"}
-    except Exception as e:
-        dependencies["neo4j"] = {"status": "error", "detail": str(e)}
-
-    # Check OpenAI
-    try:
-        from openai import OpenAI
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        client.models.list(limit=1)
-        dependencies["openai"] = {"status": "ok"}
-    except Exception as e:
-        dependencies["openai"] = {"status": "error", "detail": str(e)}
-
-    all_ok = all(dep["status"] == "ok" for dep in dependencies.values())
+    """Health check with cached dependency status (probed in the background)."""
+    probed = await health.get_prober().snapshot()
+    dependencies = probed["dependencies"]
+
+    circuits = circuit_breaker.snapshot_all()
+    severity = {circuit_breaker.CLOSED: 0, circuit_breaker.HALF_OPEN: 1, circuit_breaker.OPEN: 2}
+    for name, circuit in circuits.items():
+        dependency = dependencies.get(circuit_breaker.dependency_of(name))
+        if dependency is not None:
+            # Worst state among the dependency's breakers
+            current = dependency.get("circuit", circuit_breaker.CLOSED)
+            dependency["circuit"] = max(current, circuit["state"], key=severity.get)
+
+    all_ok = all(dep["status"] == "ok" for dep in dependencies.values()) and all(
+        circuit["state"] == "closed" for circuit in circuits.values()
+    )
 
     return {
         "status": "ok" if all_ok else "degraded",
         "app": settings.APP_NAME,
         "version": settings.APP_VERSION,
         "session_id": SERVER_SESSION_ID,
+        "checked_at": probed["checked_at"],
         "dependencies": dependencies,
+        "circuits": circuits,
+        "latency": hedging.snapshot_all(),
+        "retry_budgets": retry_budget.snapshot_all(),
+        "admission": admission.get_controller().snapshot(),
+        "event_loop": loop_monitor.report(),
     }
 
 
+@app.get("/livez", include_in_schema=False)
+async def liveness():
+    """Liveness probe: the process is serving requests. Never touches dependencies."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz", include_in_schema=False)
+async def readiness():
+    """Readiness probe from the cached dependency status; 503 when not ready."""
+    prober = health.get_prober()
+    await prober.snapshot()
+    ready, reasons = prober.readiness(settings.HEALTH_REQUIRED_DEPENDENCIES, settings.HEALTH_STALE_AFTER_SECONDS)
+    if not ready:
+        return JSONResponse(status_code=503, content={"status": "not_ready", "reasons": reasons})
+    return {"status": "ready"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Pipeline metrics in Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
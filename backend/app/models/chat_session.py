@@ -0,0 +1,127 @@
+"""Chat session model for server-side conversation history."""
+
+import uuid
+from typing import List, Optional
+from .database import get_db
+
+
+class ChatSession:
+    """Chat session model for database operations.
+
+    Messages are stored in full; ``summary`` folds every message with an id
+    up to ``summarized_until`` into a rolling summary so prompts only need
+    the summary plus the most recent turns.
+    """
+
+    @staticmethod
+    def create(user_id: str) -> dict:
+        """Create a new, empty session for a user."""
+        session_id = str(uuid.uuid4())
+        conn = get_db()
+        try:
+            conn.execute(
+                "INSERT INTO chat_sessions (session_id, user_id) VALUES (?, ?)",
+                (session_id, user_id)
+            )
+            conn.commit()
+            return {"session_id": session_id, "user_id": user_id, "summary": "", "summarized_until": 0}
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get(session_id: str, user_id: str) -> Optional[dict]:
+        """Get a session by ID for a specific user."""
+        conn = get_db()
+        try:
+            row = conn.execute(
+                "SELECT session_id, user_id, summary, summarized_until FROM chat_sessions "
+                "WHERE session_id = ? AND user_id = ?",
+                (session_id, user_id)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def add_messages(session_id: str, messages: List[dict]) -> List[int]:
+        """Append {"role", "content"} messages to a session and return their ids."""
+        conn = get_db()
+        try:
+            message_ids = [
+                conn.execute(
+                    "INSERT INTO chat_messages (session_id, role, content) VALUES (?, ?, ?)",
+                    (session_id, m["role"], m["content"])
+                ).lastrowid
+                for m in messages
+            ]
+            conn.execute(
+                "UPDATE chat_sessions SET updated_at = CURRENT_TIMESTAMP WHERE session_id = ?",
+                (session_id,)
+            )
+            conn.commit()
+            return message_ids
+        finally:
+            conn.close()
+
+    @staticmethod
+    def update_message(session_id: str, message_id: int, content: str) -> None:
+        """Replace the content of a stored message."""
+        conn = get_db()
+        try:
+            conn.execute(
+                "UPDATE chat_messages SET content = ? WHERE session_id = ? AND message_id = ?",
+                (content, session_id, message_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_messages(session_id: str, after_id: int = 0) -> List[dict]:
+        """Get messages with an id greater than after_id, oldest first."""
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                "SELECT message_id, role, content FROM chat_messages "
+                "WHERE session_id = ? AND message_id > ? ORDER BY message_id",
+                (session_id, after_id)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def update_summary(session_id: str, summary: str, summarized_until: int, expected_until: int) -> bool:
+        """Store the rolling summary and the last message id it covers.
+
+        Compare-and-set on ``summarized_until``: returns False (and changes
+        nothing) when another summarization has already moved it on from
+        ``expected_until``.
+        """
+        conn = get_db()
+        try:
+            cursor = conn.execute(
+                "UPDATE chat_sessions SET summary = ?, summarized_until = ? "
+                "WHERE session_id = ? AND summarized_until = ?",
+                (summary, summarized_until, session_id, expected_until)
+            )
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def delete(session_id: str, user_id: str) -> bool:
+        """Delete a session and its messages. Returns True if deleted."""
+        conn = get_db()
+        try:
+            cursor = conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id = ? AND user_id = ?",
+                (session_id, user_id)
+            )
+            if cursor.rowcount:
+                conn.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            conn.close()
@@ -83,11 +83,76 @@ def init_db():
         ON refresh_tokens(family_id)
     """)
 
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            summary TEXT DEFAULT '',
+            summarized_until INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            message_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (session_id) REFERENCES chat_sessions(session_id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id
+        ON chat_messages(session_id, message_id)
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_usage (
+            usage_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            llm_calls INTEGER DEFAULT 0,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            embedding_calls INTEGER DEFAULT 0,
+            embedding_tokens INTEGER DEFAULT 0,
+            details TEXT,
+            recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_llm_usage_user_id
+        ON llm_usage(user_id, recorded_at)
+    """)
+    # Per-user daily totals, incremented with each llm_usage row
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_usage_daily (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            requests INTEGER DEFAULT 0,
+            llm_calls INTEGER DEFAULT 0,
+            prompt_tokens INTEGER DEFAULT 0,
+            completion_tokens INTEGER DEFAULT 0,
+            embedding_calls INTEGER DEFAULT 0,
+            embedding_tokens INTEGER DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        )
+    """)
+
     # Safe migration: add is_admin column to existing users table
     cursor = conn.execute("PRAGMA table_info(users)")
     columns = [row[1] for row in cursor.fetchall()]
     if "is_admin" not in columns:
         conn.execute("ALTER TABLE users ADD COLUMN is_admin BOOLEAN DEFAULT 0")
 
+    # Safe migration: add summary column (precomputed at ingest) to documents
+    cursor = conn.execute("PRAGMA table_info(documents)")
+    columns = [row[1] for row in cursor.fetchall()]
+    if "summary" not in columns:
+        conn.execute("ALTER TABLE documents ADD COLUMN summary TEXT DEFAULT ''")
+
     conn.commit()
     conn.close()
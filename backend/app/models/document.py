@@ -1,5 +1,6 @@
 """Document model for tracking uploaded documents."""
 
+import hashlib
 from typing import List, Optional
 from .database import get_db
 
@@ -8,13 +9,13 @@ class Document:
     """Document model for database operations."""
 
     @staticmethod
-    def create(doc_id: str, user_id: str, filename: str, pages: int = 0) -> dict:
+    def create(doc_id: str, user_id: str, filename: str, pages: int = 0, summary: str = "") -> dict:
         """Create a new document record."""
         conn = get_db()
         try:
             conn.execute(
-                "INSERT INTO documents (doc_id, user_id, filename, pages) VALUES (?, ?, ?, ?)",
-                (doc_id, user_id, filename, pages)
+                "INSERT INTO documents (doc_id, user_id, filename, pages, summary) VALUES (?, ?, ?, ?, ?)",
+                (doc_id, user_id, filename, pages, summary or "")
             )
             conn.commit()
             return {
@@ -67,6 +68,46 @@ class Document:
         finally:
             conn.close()
 
+    @staticmethod
+    def get_summaries(user_id: str, doc_ids: Optional[List[str]] = None) -> List[dict]:
+        """Get precomputed summaries for a user's documents (all when doc_ids is empty)."""
+        conn = get_db()
+        try:
+            query = "SELECT doc_id, filename, summary FROM documents WHERE user_id = ?"
+            params: list = [user_id]
+            if doc_ids:
+                query += f" AND doc_id IN ({','.join('?' for _ in doc_ids)})"
+                params.extend(doc_ids)
+            rows = conn.execute(query + " ORDER BY uploaded_at", params).fetchall()
+            return [
+                {
+                    "doc_id": row["doc_id"],
+                    "filename": row["filename"],
+                    "summary": row["summary"] or ""
+                }
+                for row in rows
+            ]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_corpus_version(user_id: str) -> str:
+        """Return a digest of the user's document set.
+
+        Changes whenever a document is added or removed, so it can be used to
+        invalidate caches derived from the user's indexed content.
+        """
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                "SELECT doc_id, uploaded_at FROM documents WHERE user_id = ? ORDER BY doc_id",
+                (user_id,)
+            ).fetchall()
+            payload = "|".join(f"{row['doc_id']}@{row['uploaded_at']}" for row in rows)
+            return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+        finally:
+            conn.close()
+
     @staticmethod
     def delete(doc_id: str, user_id: str) -> bool:
         """Delete a document record."""
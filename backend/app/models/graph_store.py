@@ -4,6 +4,8 @@ import logging
 from typing import List, Dict, Any, Optional
 from neo4j import GraphDatabase
 from app.core.config import settings
+from app.core.circuit_breaker import NEO4J, CircuitOpenError, get_breaker
+from app.core import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -129,6 +131,26 @@ class GraphStore:
                     DELETE r
                 """, doc_id=doc_id)
 
+    def get_entity_names(self, user_id: Optional[str] = None, limit: int = 50000) -> List[str]:
+        """Return the names of all entities in the user's graph.
+
+        Args:
+            user_id: User ID for multi-tenant isolation
+            limit: Maximum number of names to return
+        """
+        with self.driver.session() as session:
+            if user_id:
+                result = session.run(
+                    "MATCH (e:Entity {user_id: $user_id}) RETURN DISTINCT e.name AS name LIMIT $limit",
+                    user_id=user_id, limit=limit,
+                )
+            else:
+                result = session.run(
+                    "MATCH (e:Entity) RETURN DISTINCT e.name AS name LIMIT $limit",
+                    limit=limit,
+                )
+            return [record["name"] for record in result if record["name"]]
+
     def query_related_entities(
         self,
         seed_entities: List[str],
@@ -159,58 +181,53 @@ class GraphStore:
             doc_filter_seed = " AND ANY(d IN seed.doc_ids WHERE d IN $doc_ids)"
             doc_filter_related = " AND ANY(d IN related.doc_ids WHERE d IN $doc_ids)"
 
+        if user_id:
+            query = (
+                "MATCH (seed:Entity) "
+                "WHERE toUpper(seed.name) IN $seeds AND seed.user_id = $user_id" + doc_filter_seed + " "
+                "OPTIONAL MATCH (seed)-[*1.." + str(max_depth) + "]-(related:Entity) "
+                "WHERE related.user_id = $user_id" + doc_filter_related + " "
+                "WITH COLLECT(DISTINCT seed) + COLLECT(DISTINCT related) AS allNodes "
+                "UNWIND allNodes AS n "
+                "WITH n WHERE n IS NOT NULL "
+                "RETURN DISTINCT id(n) AS id, n.name AS name, labels(n)[0] AS type "
+                "LIMIT $limit"
+            )
+            params = {"seeds": normalized_seeds, "limit": limit, "user_id": user_id}
+        else:
+            query = (
+                "MATCH (seed:Entity) WHERE toUpper(seed.name) IN $seeds" + doc_filter_seed + " "
+                "OPTIONAL MATCH (seed)-[*1.." + str(max_depth) + "]-(related:Entity) "
+                + ("WHERE " + doc_filter_related.lstrip(" AND ") + " " if doc_filter_related else "") +
+                "WITH COLLECT(DISTINCT seed) + COLLECT(DISTINCT related) AS allNodes "
+                "UNWIND allNodes AS n "
+                "WITH n WHERE n IS NOT NULL "
+                "RETURN DISTINCT id(n) AS id, n.name AS name, labels(n)[0] AS type "
+                "LIMIT $limit"
+            )
+            params = {"seeds": normalized_seeds, "limit": limit}
+        if doc_ids:
+            params["doc_ids"] = doc_ids
+
+        def run_query() -> List[Dict[str, Any]]:
+            with self.driver.session() as session:
+                result = session.run(query, **params)
+                return [
+                    {
+                        "id": str(record["id"]),
+                        "label": record["name"],
+                        "type": record["type"] or "entity",
+                        "properties": {}
+                    }
+                    for record in result
+                ]
+
         try:
-            if user_id:
-                query = (
-                    "MATCH (seed:Entity) "
-                    "WHERE toUpper(seed.name) IN $seeds AND seed.user_id = $user_id" + doc_filter_seed + " "
-                    "OPTIONAL MATCH (seed)-[*1.." + str(max_depth) + "]-(related:Entity) "
-                    "WHERE related.user_id = $user_id" + doc_filter_related + " "
-                    "WITH COLLECT(DISTINCT seed) + COLLECT(DISTINCT related) AS allNodes "
-                    "UNWIND allNodes AS n "
-                    "WITH n WHERE n IS NOT NULL "
-                    "RETURN DISTINCT id(n) AS id, n.name AS name, labels(n)[0] AS type "
-                    "LIMIT $limit"
-                )
-                params = {"seeds": normalized_seeds, "limit": limit, "user_id": user_id}
-                if doc_ids:
-                    params["doc_ids"] = doc_ids
-                with self.driver.session() as session:
-                    result = session.run(query, **params)
-                    return [
-                        {
-                            "id": str(record["id"]),
-                            "label": record["name"],
-                            "type": record["type"] or "entity",
-                            "properties": {}
-                        }
-                        for record in result
-                    ]
-            else:
-                query = (
-                    "MATCH (seed:Entity) WHERE toUpper(seed.name) IN $seeds" + doc_filter_seed + " "
-                    "OPTIONAL MATCH (seed)-[*1.." + str(max_depth) + "]-(related:Entity) "
-                    + ("WHERE " + doc_filter_related.lstrip(" AND ") + " " if doc_filter_related else "") +
-                    "WITH COLLECT(DISTINCT seed) + COLLECT(DISTINCT related) AS allNodes "
-                    "UNWIND allNodes AS n "
-                    "WITH n WHERE n IS NOT NULL "
-                    "RETURN DISTINCT id(n) AS id, n.name AS name, labels(n)[0] AS type "
-                    "LIMIT $limit"
-                )
-                params = {"seeds": normalized_seeds, "limit": limit}
-                if doc_ids:
-                    params["doc_ids"] = doc_ids
-                with self.driver.session() as session:
-                    result = session.run(query, **params)
-                    return [
-                        {
-                            "id": str(record["id"]),
-                            "label": record["name"],
-                            "type": record["type"] or "entity",
-                            "properties": {}
-                        }
-                        for record in result
-                    ]
+            with metrics.time_stage("graph_query"):
+                return get_breaker(NEO4J).call(run_query)
+        except CircuitOpenError:
+            logger.info("Neo4j circuit open, skipping graph query")
+            return []
         except Exception as e:
             logger.error("Graph query error: %s", e)
             return []
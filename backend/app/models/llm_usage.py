@@ -0,0 +1,120 @@
+"""LLM usage ledger model."""
+
+import json
+import logging
+from typing import Any, Dict, List
+from app.core.usage import RequestUsage
+from app.models.database import get_db
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = RequestUsage.FIELDS
+_TOKEN_SUM = "prompt_tokens + completion_tokens + embedding_tokens"
+
+
+class LLMUsage:
+    """Record per-request LLM usage and query per-user daily totals."""
+
+    @staticmethod
+    def record(user_id: str, kind: str, usage: RequestUsage):
+        """Insert a request's usage and add it to the user's daily totals.
+
+        Requests that made no LLM or embedding calls (cache hits) are not
+        recorded. Like audit logging, this never raises.
+        """
+        data = usage.to_dict()
+        if not data["llm_calls"] and not data["embedding_calls"]:
+            return
+        values = tuple(data[field] for field in _FIELDS)
+        try:
+            conn = get_db()
+            try:
+                conn.execute(
+                    f"""INSERT INTO llm_usage (user_id, kind, {", ".join(_FIELDS)}, details)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (user_id, kind, *values, json.dumps(data["operations"])),
+                )
+                conn.execute(
+                    f"""INSERT INTO llm_usage_daily (user_id, day, requests, {", ".join(_FIELDS)})
+                        VALUES (?, date('now'), 1, ?, ?, ?, ?, ?)
+                        ON CONFLICT(user_id, day) DO UPDATE SET
+                        requests = requests + 1,
+                        {", ".join(f"{field} = {field} + excluded.{field}" for field in _FIELDS)}""",
+                    (user_id, *values),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except Exception as exc:
+            logger.error("Failed to record LLM usage: %s", exc)
+
+    @staticmethod
+    def tokens_today(user_id: str) -> int:
+        """Total prompt, completion and embedding tokens used by a user today."""
+        conn = get_db()
+        try:
+            row = conn.execute(
+                f"SELECT {_TOKEN_SUM} AS tokens FROM llm_usage_daily "
+                f"WHERE user_id = ? AND day = date('now')",
+                (user_id,),
+            ).fetchone()
+            return row["tokens"] if row else 0
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_daily(user_id: str, days: int = 30) -> List[Dict[str, Any]]:
+        """A user's daily totals for the last ``days`` days, newest first."""
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                f"""SELECT day, requests, {", ".join(_FIELDS)}, {_TOKEN_SUM} AS total_tokens
+                    FROM llm_usage_daily
+                    WHERE user_id = ? AND day > date('now', ?)
+                    ORDER BY day DESC""",
+                (user_id, f"-{days} days"),
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_totals(days: int = 30) -> List[Dict[str, Any]]:
+        """Per-user totals over the last ``days`` days, heaviest users first. For admin use."""
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                f"""SELECT user_id, SUM(requests) AS requests,
+                           {", ".join(f"SUM({field}) AS {field}" for field in _FIELDS)},
+                           SUM({_TOKEN_SUM}) AS total_tokens
+                    FROM llm_usage_daily
+                    WHERE day > date('now', ?)
+                    GROUP BY user_id
+                    ORDER BY total_tokens DESC""",
+                (f"-{days} days",),
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+
+    @staticmethod
+    def get_requests(user_id: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """A user's per-request usage with the per-operation breakdown, newest first."""
+        conn = get_db()
+        try:
+            rows = conn.execute(
+                f"""SELECT usage_id, kind, {", ".join(_FIELDS)}, details, recorded_at
+                    FROM llm_usage
+                    WHERE user_id = ?
+                    ORDER BY usage_id DESC
+                    LIMIT ? OFFSET ?""",
+                (user_id, limit, offset),
+            ).fetchall()
+            result = []
+            for row in rows:
+                entry = dict(row)
+                entry["operations"] = json.loads(entry.pop("details") or "{}")
+                result.append(entry)
+            return result
+        finally:
+            conn.close()
@@ -1,10 +1,14 @@
 """Pinecone vector store wrapper for multimodal embeddings."""
 
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 from pinecone import Pinecone, ServerlessSpec
 from langchain_openai import OpenAIEmbeddings
 from app.core.config import settings
+from app.core.circuit_breaker import OPENAI_EMBEDDINGS, PINECONE, get_breaker
+from app.core.hedging import hedged
+from app.core import metrics, usage
 from app.services.cache_utils import TTLCache
 
 logger = logging.getLogger(__name__)
@@ -71,9 +75,16 @@ class PineconeStore:
             cache = PineconeStore._embedding_cache if settings.ENABLE_EMBEDDING_CACHE else None
             if cache:
                 cached = cache.get(text)
+                metrics.record_cache("embedding", cached is not None)
                 if cached is not None:
                     return cached
-            embedding = self.embeddings.embed_query(text)
+            # Idempotent read: hedged against slow responses when enabled
+            with metrics.time_stage("embedding"):
+                embedding = await hedged(
+                    "openai.embed_query",
+                    lambda: asyncio.to_thread(get_breaker(OPENAI_EMBEDDINGS).call, self.embeddings.embed_query, text),
+                )
+            usage.record_embedding("embed_query", usage.count_tokens([text]))
             if cache:
                 cache.set(text, embedding)
             return embedding
@@ -84,6 +95,8 @@ class PineconeStore:
     async def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
         """Get OpenAI embeddings for multiple texts in a single batch call.
 
+        The blocking embedding calls run in a worker thread, off the event loop.
+
         Args:
             texts: List of texts to embed
 
@@ -96,7 +109,11 @@ class PineconeStore:
 
             cache = PineconeStore._embedding_cache if settings.ENABLE_EMBEDDING_CACHE else None
             if not cache:
-                return self.embeddings.embed_documents(texts)
+                embeddings = await asyncio.to_thread(
+                    get_breaker(OPENAI_EMBEDDINGS).call, self.embeddings.embed_documents, texts
+                )
+                usage.record_embedding("embed_documents", usage.count_tokens(texts))
+                return embeddings
 
             # Preserve order and duplicates while minimizing embed calls
             unique_missing: Dict[str, None] = {}
@@ -106,7 +123,10 @@ class PineconeStore:
 
             if unique_missing:
                 missing_texts = list(unique_missing.keys())
-                missing_embeddings = self.embeddings.embed_documents(missing_texts)
+                missing_embeddings = await asyncio.to_thread(
+                    get_breaker(OPENAI_EMBEDDINGS).call, self.embeddings.embed_documents, missing_texts
+                )
+                usage.record_embedding("embed_documents", usage.count_tokens(missing_texts))
                 for text, embedding in zip(missing_texts, missing_embeddings):
                     cache.set(text, embedding)
 
@@ -114,7 +134,10 @@ class PineconeStore:
             for text in texts:
                 embedding = cache.get(text)
                 if embedding is None:
-                    embedding = self.embeddings.embed_query(text)
+                    embedding = await asyncio.to_thread(
+                        get_breaker(OPENAI_EMBEDDINGS).call, self.embeddings.embed_query, text
+                    )
+                    usage.record_embedding("embed_query", usage.count_tokens([text]))
                     cache.set(text, embedding)
                 results.append(embedding)
 
@@ -171,12 +194,18 @@ class PineconeStore:
             List of matching results with scores and metadata
         """
         try:
-            results = self.index.query(
-                vector=query_vector,
-                top_k=top_k,
-                filter=filter,
-                include_metadata=include_metadata
-            )
+            with metrics.time_stage("vector_search"):
+                results = await hedged(
+                    "pinecone.query",
+                    lambda: asyncio.to_thread(
+                        get_breaker(PINECONE).call,
+                        self.index.query,
+                        vector=query_vector,
+                        top_k=top_k,
+                        filter=filter,
+                        include_metadata=include_metadata
+                    ),
+                )
 
             matches = []
             for match in results.matches:
@@ -197,7 +226,8 @@ class PineconeStore:
         top_k: int = 10,
         filter: Optional[Dict[str, Any]] = None,
         user_id: Optional[str] = None,
-        doc_ids: Optional[List[str]] = None
+        doc_ids: Optional[List[str]] = None,
+        query_vector: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
         """Query Pinecone using text (automatically generates embedding).
 
@@ -207,6 +237,7 @@ class PineconeStore:
             filter: Metadata filter
             user_id: User ID for filtering (required for multi-tenant isolation)
             doc_ids: List of document IDs to filter by (empty/None = all documents)
+            query_vector: Embedding of query_text when the caller already has it
 
         Returns:
             List of matching results
@@ -218,7 +249,8 @@ class PineconeStore:
         if doc_ids:
             query_filter["doc_id"] = {"$in": doc_ids}
 
-        query_vector = await self.get_embedding(query_text)
+        if query_vector is None:
+            query_vector = await self.get_embedding(query_text)
         return await self.query(query_vector, top_k, query_filter if query_filter else None)
 
     async def delete_by_doc_id(self, doc_id: str, user_id: Optional[str] = None):
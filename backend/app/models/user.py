@@ -53,7 +53,7 @@ class User:
         conn = get_db()
         try:
             row = conn.execute(
-                "SELECT user_id, email, username, created_at FROM users WHERE user_id = ?",
+                "SELECT user_id, email, username, created_at, is_admin FROM users WHERE user_id = ?",
                 (user_id,)
             ).fetchone()
             return dict(row) if row else None
@@ -1,13 +1,20 @@
 """Pydantic schemas for querying."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Literal, Optional
 from pydantic import BaseModel
 
 
 class ChatMessage(BaseModel):
     """A single chat message for conversation history."""
 
-    role: str
+    role: Literal["user", "assistant"]
+    content: str
+
+
+class SessionSummaryMessage(BaseModel):
+    """Server-side summary of earlier session turns (never accepted from clients)."""
+
+    role: Literal["system"] = "system"
     content: str
 
 
@@ -17,6 +24,8 @@ class QueryRequest(BaseModel):
     query: str
     chat_history: List[ChatMessage] = []
     doc_ids: List[str] = []  # Empty = search all documents
+    session_id: Optional[str] = None  # When set, history comes from the server and chat_history is ignored
+    debug: bool = False  # Attach a per-stage timing breakdown (owner/admin only)
 
 
 class ReflectionScore(BaseModel):
@@ -42,3 +51,23 @@ class QueryResponse(BaseModel):
     source_map: List[Dict[str, Any]] = []
     entities: List[str] = []
     reflection: Optional[ReflectionScore] = None
+    reflection_id: Optional[str] = None  # Set when judging runs in the background
+    session_id: Optional[str] = None
+    degraded: List[str] = []  # Pipeline stages skipped or cut short by the request deadline
+    timings: Optional[Dict[str, Any]] = None  # Span tree, set for debug requests
+
+
+class SessionResponse(BaseModel):
+    """Server-side chat session handle."""
+
+    session_id: str
+
+
+class ReflectionStatus(BaseModel):
+    """Background judging result for a previously returned answer."""
+
+    reflection_id: str
+    status: str  # pending | complete | failed
+    reflection: Optional[ReflectionScore] = None
+    entities: List[str] = []
+    revised_answer: Optional[str] = None
@@ -7,26 +7,43 @@ import json
 import logging
 import math
 import time
+import uuid
 from collections import OrderedDict
 from threading import Lock
-from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+from typing import Dict, Any, List, Optional, AsyncIterator, Callable, Tuple
 from app.core.config import settings
+from app.core import deadline, metrics, profiling, tracing, usage
 
 logger = logging.getLogger(__name__)
 from app.services.hybrid_retrieval import HybridRetrieval
 from app.services.reranker import Reranker
 from app.services.context_assembler import ContextAssembler
+from app.services.context_compressor import ContextCompressor
 from app.services.response_generator import ResponseGenerator
 from app.services.entity_extractor import EntityExtractor
+from app.services.local_entity_extractor import LocalEntityExtractor
 from app.services.query_router import QueryRouter
-from app.services.answer_judge import AnswerJudge
-from app.services.cache_utils import TTLCache
+from app.services.query_condenser import QueryCondenser
+from app.services.query_planner import QueryPlanner, QueryPlan
+from app.services.answer_judge import AnswerJudge, JudgeVerdict
+from app.services.cache_utils import TTLCache, normalize_cache_text
+from app.models.chat_session import ChatSession
 from app.models.document import Document
+from app.models.llm_usage import LLMUsage
+
+# Generic retrieval query used to pull intro/overview chunks for summaries
+SUMMARY_RETRIEVAL_QUERY = "introduction abstract overview purpose scope objectives table of contents"
 
 
 class AdvancedRAGService:
     """Orchestrate retrieval, reranking, and response generation."""
     _response_cache: Optional[TTLCache[str, Dict[str, Any]]] = None
+    _retrieval_cache: Optional[TTLCache[str, List[Dict[str, Any]]]] = None
+    _reflections: TTLCache[str, Dict[str, Any]] = TTLCache(
+        max_size=settings.JUDGE_ASYNC_RESULT_MAX_SIZE,
+        ttl_seconds=settings.JUDGE_ASYNC_RESULT_TTL_SECONDS,
+    )
+    _reflection_tasks: Dict[str, "asyncio.Task[None]"] = {}
     _semantic_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     _semantic_cache_lock = Lock()
 
@@ -38,19 +55,32 @@ class AdvancedRAGService:
         generator: ResponseGenerator | None = None,
         entity_extractor: EntityExtractor | None = None,
         query_router: QueryRouter | None = None,
+        query_condenser: QueryCondenser | None = None,
+        query_planner: QueryPlanner | None = None,
+        local_entity_extractor: LocalEntityExtractor | None = None,
+        context_compressor: ContextCompressor | None = None,
     ):
         self.retrieval = retrieval or HybridRetrieval()
         self.reranker = reranker or Reranker()
         self.assembler = assembler or ContextAssembler()
+        self.context_compressor = context_compressor or ContextCompressor()
         self.generator = generator or ResponseGenerator()
         self.entity_extractor = entity_extractor or EntityExtractor()
+        self.local_entity_extractor = local_entity_extractor or LocalEntityExtractor()
         self.query_router = query_router or QueryRouter()
+        self.query_condenser = query_condenser or QueryCondenser()
+        self.query_planner = query_planner or (QueryPlanner() if settings.QUERY_PLANNER_ENABLED else None)
         self.answer_judge = AnswerJudge() if settings.JUDGE_ENABLED else None
         if settings.ENABLE_QUERY_RESPONSE_CACHE and AdvancedRAGService._response_cache is None:
             AdvancedRAGService._response_cache = TTLCache(
                 max_size=settings.QUERY_RESPONSE_CACHE_MAX_SIZE,
                 ttl_seconds=settings.QUERY_RESPONSE_CACHE_TTL_SECONDS,
             )
+        if settings.ENABLE_RETRIEVAL_CACHE and AdvancedRAGService._retrieval_cache is None:
+            AdvancedRAGService._retrieval_cache = TTLCache(
+                max_size=settings.RETRIEVAL_CACHE_MAX_SIZE,
+                ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS,
+            )
 
     @staticmethod
     def _normalize_doc_ids(doc_ids: Optional[List[str]]) -> Optional[List[str]]:
@@ -93,13 +123,202 @@ class AdvancedRAGService:
         if not settings.ENABLE_QUERY_RESPONSE_CACHE or not AdvancedRAGService._response_cache:
             return None
         cached = AdvancedRAGService._response_cache.get(cache_key)
+        metrics.record_cache("response", bool(cached))
         return copy.deepcopy(cached) if cached else None
 
+    @classmethod
+    def has_cached_response(
+        cls,
+        query: str,
+        user_id: Optional[str] = None,
+        chat_history: Optional[List] = None,
+        doc_ids: Optional[List[str]] = None,
+    ) -> bool:
+        """Whether an exact response-cache entry exists, without building a service."""
+        if not settings.ENABLE_QUERY_RESPONSE_CACHE or not cls._response_cache:
+            return False
+        cache_key = cls._build_response_cache_key(query, user_id, cls._normalize_doc_ids(doc_ids), chat_history)
+        return cls._response_cache.get(cache_key) is not None
+
     def _set_cached_response(self, cache_key: str, response: Dict[str, Any]) -> None:
         if not settings.ENABLE_QUERY_RESPONSE_CACHE or not AdvancedRAGService._response_cache:
             return
+        if deadline.degraded_stages():
+            return
         AdvancedRAGService._response_cache.set(cache_key, copy.deepcopy(response))
 
+    async def _route(self, query: str) -> Tuple[str, Optional[QueryPlan]]:
+        """Classify the query, using the single-call planner when enabled.
+
+        Falls back to the separate router when the planner is disabled or fails.
+        """
+        async def classify() -> Tuple[str, Optional[QueryPlan]]:
+            if self.query_planner:
+                plan = await profiling.to_thread(self.query_planner.plan, query)
+                if plan:
+                    return plan.intent, plan
+            intent = await profiling.to_thread(self.query_router.classify, query)
+            return intent, None
+
+        # Out of time: treat it as a document query, which is always answerable
+        return await deadline.run_stage(
+            "routing", classify, settings.DEADLINE_ROUTING_SECONDS,
+            fallback=("document_query", None),
+            reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS,
+        )
+
+    async def _condense(self, query: str, chat_history: Optional[List]) -> Optional[str]:
+        return await deadline.run_stage(
+            "condense",
+            lambda: profiling.to_thread(self.query_condenser.condense, query, chat_history),
+            settings.DEADLINE_ROUTING_SECONDS,
+            fallback=None,
+            reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS,
+        )
+
+    async def _rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Out of time: keep retrieval order
+        return await deadline.run_stage(
+            "rerank",
+            lambda: self.reranker.rerank(query, candidates, settings.RERANK_TOP_K),
+            settings.DEADLINE_RERANK_SECONDS,
+            fallback=candidates[:settings.RERANK_TOP_K],
+            reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS,
+        )
+
+    async def _judge_within_deadline(self, *args: Any, **kwargs: Any) -> Optional[JudgeVerdict]:
+        """Judge an answer, or return None when the deadline leaves no time."""
+        return await deadline.run_stage(
+            "judge",
+            lambda: profiling.to_thread(self.answer_judge.evaluate, *args, **kwargs),
+            settings.DEADLINE_JUDGE_SECONDS,
+            fallback=None,
+        )
+
+    async def _entities_within_deadline(self, query: str, answer: str, user_id: Optional[str] = None) -> List[str]:
+        return await deadline.run_stage(
+            "entities",
+            lambda: profiling.to_thread(self._extract_entities, query, answer, user_id),
+            settings.DEADLINE_ENTITY_SECONDS,
+            fallback=[],
+        )
+
+    @staticmethod
+    def _filter_candidates(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop empty/low-content chunks."""
+        filtered = [c for c in candidates if len(c.get("text", "").strip()) > 10]
+        tracing.count("retrieved", len(candidates))
+        tracing.count("filtered", len(filtered))
+        return filtered
+
+    def _assemble(
+        self, ranked: List[Dict[str, Any]], doc_names: Dict[str, str]
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        with metrics.time_stage("assembly"):
+            contexts, source_map = self.assembler.assemble_with_citations(ranked, doc_names=doc_names)
+        tracing.count("reranked", len(ranked))
+        tracing.count("assembled", len(contexts))
+        return contexts, source_map
+
+    @staticmethod
+    def _should_regenerate(verdict: Optional[JudgeVerdict]) -> bool:
+        """Regenerate a failed answer only if a second generation and judge still fit."""
+        if verdict is None or verdict.verdict != "fail" or settings.JUDGE_MAX_RETRIES <= 0:
+            return False
+        if not deadline.can_afford(settings.DEADLINE_JUDGE_SECONDS, reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS):
+            deadline.mark_degraded("regeneration")
+            return False
+        return True
+
+    async def _condense_and_route(
+        self, query: str, chat_history: Optional[List]
+    ) -> Tuple[str, Optional[QueryPlan], bool, Optional[str]]:
+        """Route the query, condensing a follow-up first when the planner is enabled.
+
+        The planner then runs once, on the standalone query, instead of
+        planning the raw follow-up and re-planning after condensation.
+        Queries the rules settle (greetings, chitchat, plain summary
+        requests) are routed without condensing.
+
+        Returns:
+            (intent, plan, condensed, standalone_query); ``condensed`` tells
+            whether condensation already ran.
+        """
+        if not self.query_planner or not chat_history or QueryRouter.classify_fast(query) is not None:
+            intent, plan = await self._route(query)
+            return intent, plan, False, None
+        standalone_query = await self._condense(query, chat_history)
+        intent, plan = await self._route(standalone_query or query)
+        return intent, plan, True, standalone_query
+
+    @staticmethod
+    def _plan_retrieval_kwargs(plan: Optional[QueryPlan]) -> Dict[str, Any]:
+        """Planner outputs for HybridRetrieval.retrieve (empty -> use the expander/extractor)."""
+        if not plan or not plan.expansions:
+            return {}
+        return {"expanded_queries": plan.expansions, "query_entities": plan.entities}
+
+    @staticmethod
+    def _retrieval_scores(docs: List[Dict[str, Any]]) -> List[float]:
+        """Vector-search scores of the reranked docs, for the judge's retrieval signal.
+
+        Graph entities carry a placeholder 0.0 score and are left out.
+        """
+        return [
+            doc["score"]
+            for doc in docs
+            if isinstance(doc.get("score"), (int, float))
+            and doc.get("metadata", {}).get("type") != "graph_entity"
+        ]
+
+    @staticmethod
+    def _corpus_version(user_id: Optional[str]) -> str:
+        """Digest of the user's document set, used to invalidate retrieval results."""
+        if not user_id:
+            return ""
+        try:
+            return Document.get_corpus_version(user_id)
+        except Exception as exc:
+            logger.warning(f"Failed to compute corpus version: {exc}")
+            return ""
+
+    async def _build_retrieval_cache_key(
+        self,
+        kind: str,
+        query: str,
+        user_id: Optional[str],
+        doc_ids: Optional[List[str]],
+    ) -> Optional[str]:
+        """Key for cached retrieval + rerank output, independent of chat history.
+
+        Returns None when the retrieval cache is disabled.
+        """
+        if not settings.ENABLE_RETRIEVAL_CACHE or not AdvancedRAGService._retrieval_cache:
+            return None
+        corpus_version = await profiling.to_thread(self._corpus_version, user_id)
+        payload = {
+            "v": 1,
+            "kind": kind,
+            "query": normalize_cache_text(query),
+            "user_id": user_id or "",
+            "doc_ids": self._normalize_doc_ids(doc_ids) or [],
+            "corpus_version": corpus_version,
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _get_cached_retrieval(self, cache_key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        if not cache_key or not AdvancedRAGService._retrieval_cache:
+            return None
+        cached = AdvancedRAGService._retrieval_cache.get(cache_key)
+        metrics.record_cache("retrieval", cached is not None)
+        return copy.deepcopy(cached) if cached is not None else None
+
+    def _set_cached_retrieval(self, cache_key: Optional[str], ranked: List[Dict[str, Any]]) -> None:
+        if not cache_key or not AdvancedRAGService._retrieval_cache or deadline.degraded_stages():
+            return
+        AdvancedRAGService._retrieval_cache.set(cache_key, copy.deepcopy(ranked))
+
     @staticmethod
     def _semantic_cache_scope(
         user_id: Optional[str],
@@ -122,6 +341,13 @@ class AdvancedRAGService:
 
     @staticmethod
     def _semantic_cache_allowed(chat_history: Optional[List]) -> bool:
+        """Whether the semantic cache may be used for this request.
+
+        Off whenever history is present (SEMANTIC_CACHE_REQUIRE_EMPTY_HISTORY):
+        even a condensed standalone query is answered with the conversation in
+        the prompt, and the cache key does not cover it. Follow-ups still
+        reuse the retrieval cache, which is keyed without history.
+        """
         if not settings.ENABLE_SEMANTIC_QUERY_CACHE:
             return False
         if not settings.SEMANTIC_CACHE_REQUIRE_EMPTY_HISTORY:
@@ -172,6 +398,7 @@ class AdvancedRAGService:
                     best_response = copy.deepcopy(item.get("response"))
                     AdvancedRAGService._semantic_cache.move_to_end(key)
 
+        metrics.record_cache("semantic", best_response is not None)
         if best_response:
             logger.info(f"Semantic response cache hit (intent={intent}, score={best_score:.3f})")
             return best_response, query_embedding
@@ -199,7 +426,7 @@ class AdvancedRAGService:
     ) -> None:
         if not self._semantic_cache_allowed(chat_history):
             return
-        if query_embedding is None:
+        if query_embedding is None or deadline.degraded_stages():
             return
 
         cache_key = hashlib.sha256(
@@ -374,6 +601,20 @@ class AdvancedRAGService:
             selected.append(doc)
         return selected
 
+    @classmethod
+    def _select_summary_candidates(
+        cls,
+        reranked: List[Dict[str, Any]],
+        candidates: List[Dict[str, Any]],
+        doc_ids: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
+        """Balance reranked summary chunks across the selected documents."""
+        top_candidates = cls._diversify_by_doc(reranked, settings.RERANK_TOP_K, doc_ids)
+        top_candidates = cls._ensure_doc_coverage(top_candidates, candidates, doc_ids, settings.RERANK_TOP_K)
+        if doc_ids and len(doc_ids) > 1:
+            top_candidates = cls._limit_chunks_per_doc(top_candidates, max_per_doc=2, top_k=settings.RERANK_TOP_K)
+        return top_candidates
+
     @staticmethod
     def _build_summary_prompt(doc_ids: List[str], doc_names: Dict[str, str]) -> str:
         """Build strict summary prompt with one section per unique document."""
@@ -414,7 +655,7 @@ class AdvancedRAGService:
             return cached_response
 
         # Route query by intent
-        intent = self.query_router.classify(query)
+        intent, plan, condensed, standalone_query = await self._condense_and_route(query, chat_history)
 
         if intent in ("greeting", "chitchat"):
             logger.info(f"Routed to casual response (intent: {intent})")
@@ -440,28 +681,34 @@ class AdvancedRAGService:
             if semantic_cached:
                 self._set_cached_response(cache_key, semantic_cached)
                 return semantic_cached
-            result = await self._generate_summary(
+
+            def store_summary(final: Dict[str, Any]) -> None:
+                self._set_cached_response(cache_key, final)
+                self._set_semantic_cached_response(
+                    query=query,
+                    response=final,
+                    user_id=user_id,
+                    doc_ids=effective_doc_ids,
+                    chat_history=chat_history,
+                    intent="summary",
+                    query_embedding=semantic_embedding,
+                )
+
+            return await self._generate_summary(
                 query,
                 user_id,
                 chat_history=chat_history,
-                doc_ids=effective_doc_ids
-            )
-            self._set_cached_response(cache_key, result)
-            self._set_semantic_cached_response(
-                query=query,
-                response=result,
-                user_id=user_id,
                 doc_ids=effective_doc_ids,
-                chat_history=chat_history,
-                intent="summary",
-                query_embedding=semantic_embedding,
+                store=store_summary,
             )
-            return result
 
         # Document query - full RAG pipeline
         logger.info(f"Routed to RAG pipeline (intent: {intent})")
+        if not condensed:
+            standalone_query = await self._condense(query, chat_history)
+        retrieval_query = standalone_query or query
         semantic_cached, semantic_embedding = await self._get_semantic_cached_response(
-            query=query,
+            query=retrieval_query,
             user_id=user_id,
             doc_ids=normalized_doc_ids,
             chat_history=chat_history,
@@ -471,45 +718,93 @@ class AdvancedRAGService:
             self._set_cached_response(cache_key, semantic_cached)
             return semantic_cached
 
-        logger.info(f"Retrieving candidates for: {query[:80]}")
-        candidates = await self.retrieval.retrieve(query, user_id=user_id, doc_ids=normalized_doc_ids)
-        logger.info(f"Retrieved {len(candidates)} candidates")
+        retrieval_key = await self._build_retrieval_cache_key("query", retrieval_query, user_id, normalized_doc_ids)
+        reranked = self._get_cached_retrieval(retrieval_key)
+        if reranked is not None:
+            logger.info(f"Retrieval cache hit ({len(reranked)} results)")
+        else:
+            logger.info(f"Retrieving candidates for: {retrieval_query[:80]}")
+            candidates = await self.retrieval.retrieve(
+                retrieval_query,
+                user_id=user_id,
+                doc_ids=normalized_doc_ids,
+                **self._plan_retrieval_kwargs(plan),
+            )
+            logger.info(f"Retrieved {len(candidates)} candidates")
 
-        # Filter out empty/low-content chunks
-        candidates = [c for c in candidates if len(c.get("text", "").strip()) > 10]
-        logger.info(f"After filtering low-content: {len(candidates)} candidates")
+            # Filter out empty/low-content chunks
+            candidates = self._filter_candidates(candidates)
+            logger.info(f"After filtering low-content: {len(candidates)} candidates")
 
-        reranked = await self.reranker.rerank(query, candidates, settings.RERANK_TOP_K)
-        reranked = self._diversify_by_doc(reranked, settings.RERANK_TOP_K, normalized_doc_ids)
-        logger.info(f"Reranked to {len(reranked)} results")
+            reranked = await self._rerank(retrieval_query, candidates)
+            reranked = self._diversify_by_doc(reranked, settings.RERANK_TOP_K, normalized_doc_ids)
+            logger.info(f"Reranked to {len(reranked)} results")
+            self._set_cached_retrieval(retrieval_key, reranked)
 
         doc_names = self._build_doc_names(user_id)
-        contexts, source_map = self.assembler.assemble_with_citations(reranked, doc_names=doc_names)
+        compressed = await self.context_compressor.compress(retrieval_query, reranked)
+        contexts, source_map = self._assemble(compressed, doc_names)
+        retrieval_scores = self._retrieval_scores(reranked)
         logger.info(f"Assembled {len(contexts)} contexts")
 
         answer = self.generator.generate(query, contexts, chat_history=chat_history)
         logger.info(f"Generated answer ({len(answer)} chars)")
 
+        def store(final: Dict[str, Any]) -> None:
+            self._set_cached_response(cache_key, final)
+            self._set_semantic_cached_response(
+                query=retrieval_query,
+                response=final,
+                user_id=user_id,
+                doc_ids=normalized_doc_ids,
+                chat_history=chat_history,
+                intent="document_query",
+                query_embedding=semantic_embedding,
+            )
+
+        if self.answer_judge and settings.JUDGE_ASYNC:
+            # Return the answer now; judging and entity extraction run in the background
+            response = {
+                "answer": answer,
+                "contexts": contexts,
+                "sources": [doc.get("metadata", {}) for doc in reranked],
+                "source_map": source_map,
+                "entities": [],
+                "reflection": None,
+            }
+            response["reflection_id"] = self._start_reflection(
+                response,
+                user_id,
+                judge_query=retrieval_query,
+                entity_query=retrieval_query,
+                generation_query=query,
+                chat_history=chat_history,
+                retrieval_scores=retrieval_scores,
+                store=store,
+            )
+            return response
+
         # Judge evaluation + entity extraction (parallel when judge enabled)
         reflection = None
         if self.answer_judge:
             verdict, entities = await asyncio.gather(
-                asyncio.to_thread(self.answer_judge.evaluate, query, contexts, answer),
-                asyncio.to_thread(self._extract_entities, query, answer),
+                self._judge_within_deadline(retrieval_query, contexts, answer, retrieval_scores),
+                self._entities_within_deadline(retrieval_query, answer, user_id),
             )
-            if verdict.verdict == "fail" and settings.JUDGE_MAX_RETRIES > 0:
+            if self._should_regenerate(verdict):
                 logger.info(f"Judge failed answer (overall={verdict.overall:.2f}), regenerating with feedback...")
                 answer = self.generator.generate_with_feedback(
                     query, contexts, verdict.feedback, chat_history=chat_history
                 )
                 logger.info(f"Regenerated answer ({len(answer)} chars)")
-                verdict = self.answer_judge.evaluate(query, contexts, answer)
-                verdict.was_regenerated = True
+                verdict = await self._judge_within_deadline(retrieval_query, contexts, answer, retrieval_scores)
+                if verdict:
+                    verdict.was_regenerated = True
                 # Re-extract entities from the new answer
-                entities = self._extract_entities(query, answer)
-            reflection = verdict.to_dict()
+                entities = await self._entities_within_deadline(retrieval_query, answer, user_id)
+            reflection = verdict.to_dict() if verdict else None
         else:
-            entities = await asyncio.to_thread(self._extract_entities, query, answer)
+            entities = await self._entities_within_deadline(retrieval_query, answer, user_id)
         logger.info(f"Extracted {len(entities)} entities")
 
         response = {
@@ -520,49 +815,65 @@ class AdvancedRAGService:
             "entities": entities,
             "reflection": reflection,
         }
-        self._set_cached_response(cache_key, response)
-        self._set_semantic_cached_response(
-            query=query,
-            response=response,
-            user_id=user_id,
-            doc_ids=normalized_doc_ids,
-            chat_history=chat_history,
-            intent="document_query",
-            query_embedding=semantic_embedding,
-        )
+        store(response)
         return response
 
-    async def _generate_summary(self, query: str, user_id: Optional[str] = None, chat_history: Optional[List] = None, doc_ids: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Generate a document summary using content from early pages."""
+    async def _generate_summary(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        chat_history: Optional[List] = None,
+        doc_ids: Optional[List[str]] = None,
+        store: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Generate a document summary using content from early pages.
+
+        ``store`` receives the final response for caching; with JUDGE_ASYNC it
+        is called once background judging completes.
+        """
+        store = store or (lambda final: None)
+        summaries = None
+        if self._is_whole_document_summary(query):
+            summaries = await profiling.to_thread(self._load_stored_summaries, user_id, doc_ids)
+        if summaries:
+            result = await self._summary_from_stored(query, user_id, summaries, chat_history)
+            store(result)
+            return result
+
         # Retrieve chunks from the beginning of the document (intro, abstract, TOC)
-        summary_query = "introduction abstract overview purpose scope objectives table of contents"
-        logger.info("Summary: retrieving intro/overview chunks...")
-        candidates = await self.retrieval.retrieve(summary_query, user_id=user_id, doc_ids=doc_ids)
-        logger.info(f"Summary: retrieved {len(candidates)} raw candidates")
-
-        # Filter out empty chunks and prefer early pages
-        candidates = [c for c in candidates if len(c.get("text", "").strip()) > 10]
-        candidates.sort(key=lambda c: c.get("metadata", {}).get("page", 999))
-
-        # Use reranker for balanced multi-doc coverage
-        top_candidates = await self.reranker.rerank(summary_query, candidates, settings.RERANK_TOP_K)
-        top_candidates = self._diversify_by_doc(top_candidates, settings.RERANK_TOP_K, doc_ids)
-        top_candidates = self._ensure_doc_coverage(top_candidates, candidates, doc_ids, settings.RERANK_TOP_K)
-        if doc_ids and len(doc_ids) > 1:
-            top_candidates = self._limit_chunks_per_doc(top_candidates, max_per_doc=2, top_k=settings.RERANK_TOP_K)
+        summary_query = SUMMARY_RETRIEVAL_QUERY
+        retrieval_key = await self._build_retrieval_cache_key("summary", summary_query, user_id, doc_ids)
+        top_candidates = self._get_cached_retrieval(retrieval_key)
+        if top_candidates is not None:
+            logger.info(f"Summary: retrieval cache hit ({len(top_candidates)} chunks)")
+        else:
+            logger.info("Summary: retrieving intro/overview chunks...")
+            candidates = await self.retrieval.retrieve(summary_query, user_id=user_id, doc_ids=doc_ids)
+            logger.info(f"Summary: retrieved {len(candidates)} raw candidates")
+
+            # Filter out empty chunks and prefer early pages
+            candidates = self._filter_candidates(candidates)
+            candidates.sort(key=lambda c: c.get("metadata", {}).get("page", 999))
+
+            # Use reranker for balanced multi-doc coverage
+            top_candidates = await self._rerank(summary_query, candidates)
+            top_candidates = self._select_summary_candidates(top_candidates, candidates, doc_ids)
+            self._set_cached_retrieval(retrieval_key, top_candidates)
         logger.info(f"Summary: using {len(top_candidates)} chunks after reranking")
 
         if not top_candidates:
-            return {
+            result = {
                 "answer": "I couldn't find enough content to generate a summary. Try asking a specific question about the document.",
                 "contexts": [],
                 "sources": [],
                 "entities": [],
                 "reflection": None,
             }
+            store(result)
+            return result
 
         doc_names = self._build_doc_names(user_id)
-        contexts, source_map = self.assembler.assemble_with_citations(top_candidates, doc_names=doc_names)
+        contexts, source_map = self._assemble(top_candidates, doc_names)
         logger.info(f"Summary: assembled {len(contexts)} contexts")
 
         covered_doc_ids: List[str] = []
@@ -571,30 +882,58 @@ class AdvancedRAGService:
             if did and did not in covered_doc_ids:
                 covered_doc_ids.append(did)
         summary_prompt = self._build_summary_prompt(covered_doc_ids, doc_names)
-        answer = self.generator.generate(summary_prompt, contexts, chat_history=chat_history)
+        if self._use_map_reduce_summary(covered_doc_ids):
+            answer = "".join([
+                piece async for piece in
+                self._map_reduce_summary(contexts, source_map, covered_doc_ids, doc_names, chat_history)
+            ])
+        else:
+            answer = self.generator.generate(summary_prompt, contexts, chat_history=chat_history)
         logger.info(f"Generated summary ({len(answer)} chars)")
 
+        if self.answer_judge and settings.JUDGE_ASYNC:
+            result = {
+                "answer": answer,
+                "contexts": contexts,
+                "sources": [doc.get("metadata", {}) for doc in top_candidates],
+                "source_map": source_map,
+                "entities": [],
+                "reflection": None,
+            }
+            result["reflection_id"] = self._start_reflection(
+                result,
+                user_id,
+                judge_query=summary_prompt,
+                entity_query=query,
+                generation_query=summary_prompt,
+                chat_history=chat_history,
+                score_relevance=False,
+                store=store,
+            )
+            return result
+
         # Judge evaluation + entity extraction (parallel when judge enabled)
         reflection = None
         if self.answer_judge:
             verdict, entities = await asyncio.gather(
-                asyncio.to_thread(self.answer_judge.evaluate, summary_prompt, contexts, answer),
-                asyncio.to_thread(self._extract_entities, query, answer),
+                self._judge_within_deadline(summary_prompt, contexts, answer, score_relevance=False),
+                self._entities_within_deadline(query, answer, user_id),
             )
-            if verdict.verdict == "fail" and settings.JUDGE_MAX_RETRIES > 0:
+            if self._should_regenerate(verdict):
                 logger.info(f"Judge failed summary (overall={verdict.overall:.2f}), regenerating with feedback...")
                 answer = self.generator.generate_with_feedback(
                     summary_prompt, contexts, verdict.feedback, chat_history=chat_history
                 )
                 logger.info(f"Regenerated summary ({len(answer)} chars)")
-                verdict = self.answer_judge.evaluate(summary_prompt, contexts, answer)
-                verdict.was_regenerated = True
-                entities = self._extract_entities(query, answer)
-            reflection = verdict.to_dict()
+                verdict = await self._judge_within_deadline(summary_prompt, contexts, answer, score_relevance=False)
+                if verdict:
+                    verdict.was_regenerated = True
+                entities = await self._entities_within_deadline(query, answer, user_id)
+            reflection = verdict.to_dict() if verdict else None
         else:
-            entities = await asyncio.to_thread(self._extract_entities, query, answer)
+            entities = await self._entities_within_deadline(query, answer, user_id)
 
-        return {
+        result = {
             "answer": answer,
             "contexts": contexts,
             "sources": [doc.get("metadata", {}) for doc in top_candidates],
@@ -602,6 +941,8 @@ class AdvancedRAGService:
             "entities": entities,
             "reflection": reflection,
         }
+        store(result)
+        return result
 
     async def answer_stream(self, query: str, user_id: Optional[str] = None, chat_history: Optional[List] = None, doc_ids: Optional[List[str]] = None) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
         """Stream an answer as SSE events. Yields (event_type, data) tuples."""
@@ -633,11 +974,11 @@ class AdvancedRAGService:
             yield ("done", {})
             return
 
-        intent = await asyncio.to_thread(self.query_router.classify, query)
+        intent, plan, condensed, standalone_query = await self._condense_and_route(query, chat_history)
 
         if intent in ("greeting", "chitchat"):
             yield ("status", {"stage": "generating"})
-            answer = await asyncio.to_thread(
+            answer = await profiling.to_thread(
                 self.query_router.generate_casual_response, query, chat_history
             )
             yield ("token", {"content": answer})
@@ -651,8 +992,11 @@ class AdvancedRAGService:
             return
 
         # 2. Retrieve
+        if not condensed:
+            standalone_query = await self._condense(query, chat_history)
+        retrieval_query = standalone_query or query
         semantic_cached, semantic_embedding = await self._get_semantic_cached_response(
-            query=query,
+            query=retrieval_query,
             user_id=user_id,
             doc_ids=normalized_doc_ids,
             chat_history=chat_history,
@@ -681,17 +1025,28 @@ class AdvancedRAGService:
 
         yield ("cache", {"cache_hit": False, "cache_type": "none"})
         yield ("status", {"stage": "retrieving"})
-        candidates = await self.retrieval.retrieve(query, user_id=user_id, doc_ids=normalized_doc_ids)
-        candidates = [c for c in candidates if len(c.get("text", "").strip()) > 10]
+        retrieval_key = await self._build_retrieval_cache_key("query", retrieval_query, user_id, normalized_doc_ids)
+        reranked = self._get_cached_retrieval(retrieval_key)
+        if reranked is None:
+            candidates = await self.retrieval.retrieve(
+                retrieval_query,
+                user_id=user_id,
+                doc_ids=normalized_doc_ids,
+                **self._plan_retrieval_kwargs(plan),
+            )
+            candidates = self._filter_candidates(candidates)
 
-        # 3. Rerank
-        yield ("status", {"stage": "reranking"})
-        reranked = await self.reranker.rerank(query, candidates, settings.RERANK_TOP_K)
-        reranked = self._diversify_by_doc(reranked, settings.RERANK_TOP_K, normalized_doc_ids)
+            # 3. Rerank
+            yield ("status", {"stage": "reranking"})
+            reranked = await self._rerank(retrieval_query, candidates)
+            reranked = self._diversify_by_doc(reranked, settings.RERANK_TOP_K, normalized_doc_ids)
+            self._set_cached_retrieval(retrieval_key, reranked)
 
         # 4. Assemble contexts with document labels
-        doc_names = await asyncio.to_thread(self._build_doc_names, user_id)
-        contexts, source_map = self.assembler.assemble_with_citations(reranked, doc_names=doc_names)
+        doc_names = await profiling.to_thread(self._build_doc_names, user_id)
+        compressed = await self.context_compressor.compress(retrieval_query, reranked)
+        contexts, source_map = self._assemble(compressed, doc_names)
+        retrieval_scores = self._retrieval_scores(reranked)
         sources = [doc.get("metadata", {}) for doc in reranked]
 
         # 5. Send sources before generation
@@ -704,16 +1059,52 @@ class AdvancedRAGService:
             full_answer += token
             yield ("token", {"content": token})
 
+        def store(final: Dict[str, Any]) -> None:
+            self._set_cached_response(cache_key, final)
+            self._set_semantic_cached_response(
+                query=retrieval_query,
+                response=final,
+                user_id=user_id,
+                doc_ids=normalized_doc_ids,
+                chat_history=chat_history,
+                intent="document_query",
+                query_embedding=semantic_embedding,
+            )
+
+        if self.answer_judge and settings.JUDGE_ASYNC:
+            # Finish the answer now; the verdict and entities follow after "done"
+            reflection_id = self._start_reflection(
+                {
+                    "answer": full_answer,
+                    "contexts": contexts,
+                    "sources": sources,
+                    "source_map": source_map,
+                    "entities": [],
+                    "reflection": None,
+                },
+                user_id,
+                judge_query=retrieval_query,
+                entity_query=retrieval_query,
+                generation_query=query,
+                chat_history=chat_history,
+                retrieval_scores=retrieval_scores,
+                store=store,
+            )
+            yield ("done", {"reflection_id": reflection_id})
+            async for event in self._deferred_reflection_events(reflection_id):
+                yield event
+            return
+
         # 7. Judge evaluation + entity extraction (parallel)
         reflection_payload = None
         if self.answer_judge:
             yield ("status", {"stage": "evaluating"})
             verdict, entities = await asyncio.gather(
-                asyncio.to_thread(self.answer_judge.evaluate, query, contexts, full_answer),
-                asyncio.to_thread(self._extract_entities, query, full_answer),
+                self._judge_within_deadline(retrieval_query, contexts, full_answer, retrieval_scores),
+                self._entities_within_deadline(retrieval_query, full_answer, user_id),
             )
 
-            if verdict.verdict == "fail" and settings.JUDGE_MAX_RETRIES > 0:
+            if self._should_regenerate(verdict):
                 logger.info(f"Judge failed answer (overall={verdict.overall:.2f}), regenerating...")
                 yield ("status", {"stage": "improving"})
                 yield ("token", {"content": "", "replace": True})
@@ -725,18 +1116,20 @@ class AdvancedRAGService:
                     full_answer += token
                     yield ("token", {"content": token})
 
-                verdict = await asyncio.to_thread(self.answer_judge.evaluate, query, contexts, full_answer)
-                verdict.was_regenerated = True
+                verdict = await self._judge_within_deadline(retrieval_query, contexts, full_answer, retrieval_scores)
+                if verdict:
+                    verdict.was_regenerated = True
                 # Re-extract entities from the new answer
-                entities = await asyncio.to_thread(self._extract_entities, query, full_answer)
+                entities = await self._entities_within_deadline(retrieval_query, full_answer, user_id)
 
-            reflection_payload = verdict.to_dict()
-            yield ("reflection", reflection_payload)
+            if verdict:
+                reflection_payload = verdict.to_dict()
+                yield ("reflection", reflection_payload)
         else:
-            entities = await asyncio.to_thread(self._extract_entities, query, full_answer)
+            entities = await self._entities_within_deadline(retrieval_query, full_answer, user_id)
         yield ("entities", {"entities": entities})
 
-        self._set_cached_response(cache_key, {
+        store({
             "answer": full_answer,
             "contexts": contexts,
             "sources": sources,
@@ -744,22 +1137,6 @@ class AdvancedRAGService:
             "entities": entities,
             "reflection": reflection_payload,
         })
-        self._set_semantic_cached_response(
-            query=query,
-            response={
-                "answer": full_answer,
-                "contexts": contexts,
-                "sources": sources,
-                "source_map": source_map,
-                "entities": entities,
-                "reflection": reflection_payload,
-            },
-            user_id=user_id,
-            doc_ids=normalized_doc_ids,
-            chat_history=chat_history,
-            intent="document_query",
-            query_embedding=semantic_embedding,
-        )
 
         yield ("done", {})
 
@@ -798,28 +1175,50 @@ class AdvancedRAGService:
 
         cache_key = self._build_response_cache_key(query, user_id, doc_ids, chat_history)
         yield ("cache", {"cache_hit": False, "cache_type": "none"})
+
+        def store(final: Dict[str, Any]) -> None:
+            self._set_cached_response(cache_key, final)
+            self._set_semantic_cached_response(
+                query=query,
+                response=final,
+                user_id=user_id,
+                doc_ids=doc_ids,
+                chat_history=chat_history,
+                intent="summary",
+                query_embedding=semantic_embedding,
+            )
+
+        summaries = None
+        if self._is_whole_document_summary(query):
+            summaries = await profiling.to_thread(self._load_stored_summaries, user_id, doc_ids)
+        if summaries:
+            async for event in self._summary_from_stored_stream(query, user_id, summaries, chat_history, store):
+                yield event
+            return
+
         yield ("status", {"stage": "retrieving"})
-        summary_query = "introduction abstract overview purpose scope objectives table of contents"
-        candidates = await self.retrieval.retrieve(summary_query, user_id=user_id, doc_ids=doc_ids)
+        summary_query = SUMMARY_RETRIEVAL_QUERY
+        retrieval_key = await self._build_retrieval_cache_key("summary", summary_query, user_id, doc_ids)
+        top_candidates = self._get_cached_retrieval(retrieval_key)
+        if top_candidates is None:
+            candidates = await self.retrieval.retrieve(summary_query, user_id=user_id, doc_ids=doc_ids)
 
-        candidates = [c for c in candidates if len(c.get("text", "").strip()) > 10]
-        candidates.sort(key=lambda c: c.get("metadata", {}).get("page", 999))
+            candidates = self._filter_candidates(candidates)
+            candidates.sort(key=lambda c: c.get("metadata", {}).get("page", 999))
 
-        # Use reranker for balanced multi-doc coverage
-        yield ("status", {"stage": "reranking"})
-        top_candidates = await self.reranker.rerank(summary_query, candidates, settings.RERANK_TOP_K)
-        top_candidates = self._diversify_by_doc(top_candidates, settings.RERANK_TOP_K, doc_ids)
-        top_candidates = self._ensure_doc_coverage(top_candidates, candidates, doc_ids, settings.RERANK_TOP_K)
-        if doc_ids and len(doc_ids) > 1:
-            top_candidates = self._limit_chunks_per_doc(top_candidates, max_per_doc=2, top_k=settings.RERANK_TOP_K)
+            # Use reranker for balanced multi-doc coverage
+            yield ("status", {"stage": "reranking"})
+            top_candidates = await self._rerank(summary_query, candidates)
+            top_candidates = self._select_summary_candidates(top_candidates, candidates, doc_ids)
+            self._set_cached_retrieval(retrieval_key, top_candidates)
 
         if not top_candidates:
             yield ("token", {"content": "I couldn't find enough content to generate a summary. Try asking a specific question about the document."})
             yield ("done", {})
             return
 
-        doc_names = await asyncio.to_thread(self._build_doc_names, user_id)
-        contexts, source_map = self.assembler.assemble_with_citations(top_candidates, doc_names=doc_names)
+        doc_names = await profiling.to_thread(self._build_doc_names, user_id)
+        contexts, source_map = self._assemble(top_candidates, doc_names)
         sources = [doc.get("metadata", {}) for doc in top_candidates]
         yield ("sources", {"sources": sources, "contexts": contexts, "source_map": source_map})
 
@@ -832,20 +1231,48 @@ class AdvancedRAGService:
 
         yield ("status", {"stage": "generating"})
         full_answer = ""
-        async for token in self.generator.generate_stream(summary_prompt, contexts, chat_history=chat_history):
+        if self._use_map_reduce_summary(covered_doc_ids):
+            # Per-document sections stream in document order as they finish
+            pieces = self._map_reduce_summary(contexts, source_map, covered_doc_ids, doc_names, chat_history)
+        else:
+            pieces = self.generator.generate_stream(summary_prompt, contexts, chat_history=chat_history)
+        async for token in pieces:
             full_answer += token
             yield ("token", {"content": token})
 
+        if self.answer_judge and settings.JUDGE_ASYNC:
+            reflection_id = self._start_reflection(
+                {
+                    "answer": full_answer,
+                    "contexts": contexts,
+                    "sources": sources,
+                    "source_map": source_map,
+                    "entities": [],
+                    "reflection": None,
+                },
+                user_id,
+                judge_query=summary_prompt,
+                entity_query=query,
+                generation_query=summary_prompt,
+                chat_history=chat_history,
+                score_relevance=False,
+                store=store,
+            )
+            yield ("done", {"reflection_id": reflection_id})
+            async for event in self._deferred_reflection_events(reflection_id):
+                yield event
+            return
+
         # Judge evaluation + entity extraction (parallel)
         reflection_payload = None
         if self.answer_judge:
             yield ("status", {"stage": "evaluating"})
             verdict, entities = await asyncio.gather(
-                asyncio.to_thread(self.answer_judge.evaluate, summary_prompt, contexts, full_answer),
-                asyncio.to_thread(self._extract_entities, query, full_answer),
+                self._judge_within_deadline(summary_prompt, contexts, full_answer, score_relevance=False),
+                self._entities_within_deadline(query, full_answer, user_id),
             )
 
-            if verdict.verdict == "fail" and settings.JUDGE_MAX_RETRIES > 0:
+            if self._should_regenerate(verdict):
                 yield ("status", {"stage": "improving"})
                 yield ("token", {"content": "", "replace": True})
 
@@ -856,17 +1283,19 @@ class AdvancedRAGService:
                     full_answer += token
                     yield ("token", {"content": token})
 
-                verdict = await asyncio.to_thread(self.answer_judge.evaluate, summary_prompt, contexts, full_answer)
-                verdict.was_regenerated = True
-                entities = await asyncio.to_thread(self._extract_entities, query, full_answer)
+                verdict = await self._judge_within_deadline(summary_prompt, contexts, full_answer, score_relevance=False)
+                if verdict:
+                    verdict.was_regenerated = True
+                entities = await self._entities_within_deadline(query, full_answer, user_id)
 
-            reflection_payload = verdict.to_dict()
-            yield ("reflection", reflection_payload)
+            if verdict:
+                reflection_payload = verdict.to_dict()
+                yield ("reflection", reflection_payload)
         else:
-            entities = await asyncio.to_thread(self._extract_entities, query, full_answer)
+            entities = await self._entities_within_deadline(query, full_answer, user_id)
         yield ("entities", {"entities": entities})
 
-        self._set_cached_response(cache_key, {
+        store({
             "answer": full_answer,
             "contexts": contexts,
             "sources": sources,
@@ -874,26 +1303,342 @@ class AdvancedRAGService:
             "entities": entities,
             "reflection": reflection_payload,
         })
-        self._set_semantic_cached_response(
-            query=query,
-            response={
-                "answer": full_answer,
-                "contexts": contexts,
-                "sources": sources,
-                "source_map": source_map,
-                "entities": entities,
-                "reflection": reflection_payload,
-            },
-            user_id=user_id,
-            doc_ids=doc_ids,
-            chat_history=chat_history,
-            intent="summary",
-            query_embedding=semantic_embedding,
+
+        yield ("done", {})
+
+    @staticmethod
+    def _use_map_reduce_summary(doc_ids: List[str]) -> bool:
+        return settings.SUMMARY_MAP_REDUCE_ENABLED and len(doc_ids) > 1
+
+    async def _map_reduce_summary(
+        self,
+        contexts: List[str],
+        source_map: List[Dict[str, Any]],
+        doc_ids: List[str],
+        doc_names: Dict[str, str],
+        chat_history: Optional[List] = None,
+    ) -> AsyncIterator[str]:
+        """Summarize each document concurrently, then add a short connections pass.
+
+        Follows the rules of _build_summary_prompt: one "### <filename>" section
+        of 2-4 sentences per document, in ``doc_ids`` order, then a
+        "### Connections" section. Documents are summarized concurrently and
+        each section is yielded as soon as it and the ones before it are
+        ready. Contexts keep their global [n] numbering so citations match
+        source_map.
+        """
+        grouped: "OrderedDict[str, List[str]]" = OrderedDict((doc_id, []) for doc_id in doc_ids)
+        names: Dict[str, str] = {}
+        for context, entry in zip(contexts, source_map):
+            key = entry.get("doc_id") or entry.get("doc_name") or "Document"
+            grouped.setdefault(key, []).append(context)
+            names.setdefault(key, doc_names.get(key) or entry.get("doc_name") or key)
+
+        semaphore = asyncio.Semaphore(settings.SUMMARY_MAP_CONCURRENCY)
+
+        async def summarize_doc(name: str, doc_contexts: List[str]) -> str:
+            prompt = (
+                f'Summarize the document "{name}" in 2-4 concise sentences using only its context below. '
+                "Cover the document as a whole; do not split it by page or excerpt. "
+                "Cite the context numbers. Output only the sentences, no heading."
+            )
+            async with semaphore:
+                text = await profiling.to_thread(self.generator.generate, prompt, doc_contexts, chat_history)
+            return text.strip()
+
+        tasks = [
+            (names[key], asyncio.create_task(summarize_doc(names[key], doc_contexts)))
+            for key, doc_contexts in grouped.items()
+            if doc_contexts
+        ]
+        sections: List[Tuple[str, str]] = []
+        try:
+            for name, task in tasks:
+                try:
+                    text = await task
+                except Exception as exc:
+                    logger.warning(f"Summary map step failed for {name}: {exc}")
+                    yield f"### {name}\n\nNo summary could be generated for this document.\n\n"
+                    continue
+                sections.append((name, text))
+                yield f"### {name}\n\n{text}\n\n"
+        finally:
+            for _, task in tasks:
+                task.cancel()
+
+        if len(sections) < 2:
+            return
+        reduce_prompt = (
+            "Write a `### Connections` section: 2-3 sentences on themes shared across these documents "
+            "and how they relate. Start with the heading. Do not add citations."
         )
+        section_contexts = [f"{name}:\n{text}" for name, text in sections]
+        async for token in self.generator.generate_stream(reduce_prompt, section_contexts, chat_history=chat_history):
+            yield token
 
+    @staticmethod
+    def _is_whole_document_summary(query: str) -> bool:
+        """Whether a summary request asks for the whole document(s) rather than one aspect.
+
+        Only these can be answered from stored summaries; focused requests
+        ("summarize the pricing risks") go through retrieval and the judge.
+        """
+        return QueryRouter.classify_fast(query) == "summary"
+
+    @staticmethod
+    def _load_stored_summaries(user_id: Optional[str], doc_ids: Optional[List[str]]) -> Optional[List[Dict[str, str]]]:
+        """Precomputed summaries for every document in scope, or None to fall back to retrieval."""
+        if not settings.ENABLE_DOCUMENT_SUMMARIES or not user_id:
+            return None
+        try:
+            summaries = Document.get_summaries(user_id, doc_ids)
+        except Exception as exc:
+            logger.warning(f"Failed to load stored summaries: {exc}")
+            return None
+        if not summaries or any(not item["summary"] for item in summaries):
+            return None
+        if doc_ids and len(summaries) < len(set(doc_ids)):
+            return None
+        return summaries
+
+    @staticmethod
+    def _stored_summary_payload(
+        summaries: List[Dict[str, str]],
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Contexts, sources and source_map built from stored document summaries."""
+        contexts: List[str] = []
+        sources: List[Dict[str, Any]] = []
+        source_map: List[Dict[str, Any]] = []
+        for index, item in enumerate(summaries, start=1):
+            contexts.append(f"[{index}] {item['filename']}\n{item['summary']}")
+            sources.append({"doc_id": item["doc_id"], "filename": item["filename"], "type": "document_summary"})
+            snippet = item["summary"][:settings.CONTEXT_SNIPPET_LENGTH]
+            if len(item["summary"]) > settings.CONTEXT_SNIPPET_LENGTH:
+                snippet += "..."
+            source_map.append({"index": index, "doc_name": item["filename"], "page": "summary", "text": snippet})
+        return contexts, sources, source_map
+
+    async def _summary_from_stored(
+        self,
+        query: str,
+        user_id: Optional[str],
+        summaries: List[Dict[str, str]],
+        chat_history: Optional[List] = None,
+    ) -> Dict[str, Any]:
+        """Answer a summary request from stored summaries: direct for one document, one reduce call for several."""
+        logger.info(f"Summary: using {len(summaries)} stored document summaries")
+        contexts, sources, source_map = self._stored_summary_payload(summaries)
+        if len(summaries) == 1:
+            answer = summaries[0]["summary"]
+        else:
+            doc_names = {item["doc_id"]: item["filename"] for item in summaries}
+            summary_prompt = self._build_summary_prompt([item["doc_id"] for item in summaries], doc_names)
+            answer = await profiling.to_thread(self.generator.generate, summary_prompt, contexts, chat_history)
+        entities = await self._entities_within_deadline(query, answer, user_id)
+        return {
+            "answer": answer,
+            "contexts": contexts,
+            "sources": sources,
+            "source_map": source_map,
+            "entities": entities,
+            "reflection": None,
+        }
+
+    async def _summary_from_stored_stream(
+        self,
+        query: str,
+        user_id: Optional[str],
+        summaries: List[Dict[str, str]],
+        chat_history: Optional[List],
+        store: Callable[[Dict[str, Any]], None],
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Stream a summary built from stored document summaries."""
+        logger.info(f"Summary: streaming from {len(summaries)} stored document summaries")
+        contexts, sources, source_map = self._stored_summary_payload(summaries)
+        yield ("sources", {"sources": sources, "contexts": contexts, "source_map": source_map})
+        yield ("status", {"stage": "generating"})
+        if len(summaries) == 1:
+            answer = summaries[0]["summary"]
+            yield ("token", {"content": answer})
+        else:
+            doc_names = {item["doc_id"]: item["filename"] for item in summaries}
+            summary_prompt = self._build_summary_prompt([item["doc_id"] for item in summaries], doc_names)
+            answer = ""
+            async for token in self.generator.generate_stream(summary_prompt, contexts, chat_history=chat_history):
+                answer += token
+                yield ("token", {"content": token})
+
+        entities = await self._entities_within_deadline(query, answer, user_id)
+        if entities:
+            yield ("entities", {"entities": entities})
+
+        store({
+            "answer": answer,
+            "contexts": contexts,
+            "sources": sources,
+            "source_map": source_map,
+            "entities": entities,
+            "reflection": None,
+        })
         yield ("done", {})
 
-    def _extract_entities(self, query: str, answer: str) -> List[str]:
+    def _start_reflection(
+        self,
+        response: Dict[str, Any],
+        user_id: Optional[str],
+        judge_query: str,
+        entity_query: str,
+        generation_query: str,
+        chat_history: Optional[List] = None,
+        retrieval_scores: Optional[List[float]] = None,
+        score_relevance: bool = True,
+        store: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> str:
+        """Judge an already-delivered answer in a background task.
+
+        Returns the reflection id used to poll for (or stream) the verdict.
+        """
+        reflection_id = uuid.uuid4().hex
+        if deadline.degraded_stages():
+            store = None  # don't cache answers built under a degraded pipeline
+        AdvancedRAGService._reflections.set(reflection_id, {
+            "reflection_id": reflection_id,
+            "user_id": user_id or "",
+            "status": "pending",
+            "reflection": None,
+            "entities": [],
+            "revised_answer": None,
+            "session_message": None,
+        })
+        task = asyncio.create_task(self._run_reflection(
+            reflection_id, response, user_id, judge_query, entity_query, generation_query,
+            chat_history, retrieval_scores, score_relevance, store,
+        ))
+        AdvancedRAGService._reflection_tasks[reflection_id] = task
+        task.add_done_callback(lambda _: AdvancedRAGService._reflection_tasks.pop(reflection_id, None))
+        return reflection_id
+
+    async def _run_reflection(
+        self,
+        reflection_id: str,
+        response: Dict[str, Any],
+        user_id: Optional[str],
+        judge_query: str,
+        entity_query: str,
+        generation_query: str,
+        chat_history: Optional[List],
+        retrieval_scores: Optional[List[float]],
+        score_relevance: bool,
+        store: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> None:
+        # Runs after the response is sent, so the request deadline, trace and profile do not
+        # apply; its LLM usage is recorded separately once judging finishes
+        deadline.clear()
+        tracing.clear()
+        profiling.clear()
+        usage.start()
+        contexts = response["contexts"]
+        answer = response["answer"]
+        try:
+            verdict, entities = await asyncio.gather(
+                asyncio.to_thread(
+                    self.answer_judge.evaluate, judge_query, contexts, answer,
+                    retrieval_scores, score_relevance=score_relevance,
+                ),
+                asyncio.to_thread(self._extract_entities, entity_query, answer, user_id),
+            )
+            revised_answer = None
+            if verdict.verdict == "fail" and settings.JUDGE_ASYNC_REGENERATE and settings.JUDGE_MAX_RETRIES > 0:
+                logger.info(f"Judge failed answer (overall={verdict.overall:.2f}), regenerating in background...")
+                revised_answer = await profiling.to_thread(
+                    self.generator.generate_with_feedback,
+                    generation_query, contexts, verdict.feedback, chat_history=chat_history,
+                )
+                verdict = await profiling.to_thread(
+                    self.answer_judge.evaluate, judge_query, contexts, revised_answer,
+                    retrieval_scores, score_relevance=score_relevance,
+                )
+                verdict.was_regenerated = True
+                entities = await profiling.to_thread(self._extract_entities, entity_query, revised_answer, user_id)
+                answer = revised_answer
+            reflection = verdict.to_dict()
+            self._update_reflection(
+                reflection_id,
+                status="complete",
+                reflection=reflection,
+                entities=entities,
+                revised_answer=revised_answer,
+            )
+            self._revise_session_message(reflection_id)
+            if store:
+                store({**response, "answer": answer, "entities": entities, "reflection": reflection})
+        except Exception as exc:
+            logger.warning(f"Background judging failed for {reflection_id}: {exc}")
+            self._update_reflection(reflection_id, status="failed")
+        finally:
+            spent = usage.finish()
+            if user_id and spent:
+                LLMUsage.record(user_id, "reflection", spent)
+
+    @classmethod
+    def _update_reflection(cls, reflection_id: str, **fields: Any) -> None:
+        record = cls._reflections.get(reflection_id)
+        if record is not None:
+            cls._reflections.set(reflection_id, {**record, **fields})
+
+    @classmethod
+    def link_session_message(cls, reflection_id: str, session_id: str, message_id: int) -> None:
+        """Have a background revision replace the answer stored in a chat session."""
+        cls._update_reflection(reflection_id, session_message=(session_id, message_id))
+        cls._revise_session_message(reflection_id)  # judging may already have finished
+
+    @classmethod
+    def _revise_session_message(cls, reflection_id: str) -> None:
+        record = cls._reflections.get(reflection_id)
+        if not record or not record.get("revised_answer") or not record.get("session_message"):
+            return
+        session_id, message_id = record["session_message"]
+        try:
+            ChatSession.update_message(session_id, message_id, record["revised_answer"])
+        except Exception as exc:
+            logger.warning(f"Failed to store revised answer for {reflection_id}: {exc}")
+
+    @classmethod
+    def get_reflection(cls, reflection_id: str, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return a background verdict owned by the user, or None if unknown/expired."""
+        record = cls._reflections.get(reflection_id)
+        if record is None or record["user_id"] != (user_id or ""):
+            return None
+        return {k: v for k, v in record.items() if k not in ("user_id", "session_message")}
+
+    @classmethod
+    async def wait_for_reflection(cls, reflection_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait (up to timeout seconds) for a background verdict to finish."""
+        task = cls._reflection_tasks.get(reflection_id)
+        if task is not None:
+            try:
+                # Shield so a disconnecting client doesn't cancel the judging itself
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                logger.info(f"Background verdict {reflection_id} not ready after {timeout}s")
+        record = cls._reflections.get(reflection_id)
+        return copy.deepcopy(record) if record else None
+
+    async def _deferred_reflection_events(self, reflection_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Follow-up SSE events sent after "done" once background judging finishes."""
+        record = await self.wait_for_reflection(reflection_id, settings.JUDGE_ASYNC_STREAM_WAIT_SECONDS)
+        if not record or record["status"] != "complete":
+            return
+        if record["revised_answer"]:
+            yield ("token", {"content": "", "replace": True})
+            yield ("token", {"content": record["revised_answer"]})
+        yield ("reflection", {**record["reflection"], "reflection_id": reflection_id})
+        if record["entities"]:
+            yield ("entities", {"entities": record["entities"]})
+
+    def _extract_entities(self, query: str, answer: str, user_id: Optional[str] = None) -> List[str]:
         """Extract entities from query and answer for graph visualization."""
         combined_text = f"{query}\n{answer}"
+        if settings.ENTITY_EXTRACTION_MODE == "local":
+            return self.local_entity_extractor.extract_entities(combined_text, user_id=user_id)
         return self.entity_extractor.extract_entities(combined_text)
@@ -2,14 +2,19 @@
 
 import json
 import logging
+import random
+import re
+import statistics
 import time
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 
 from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +39,37 @@ Respond ONLY with a JSON object (no markdown, no extra text):
   "feedback": "<brief explanation of any weaknesses>"
 }"""
 
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CITATION_RE = re.compile(r"\[(\d+)\]")
+_STOPWORDS = frozenset(
+    "a an the and or but if then of to in on at by for with from as is are was were be been "
+    "being it its this that these those there here what which who whom whose when where why how "
+    "do does did can could should would will shall may might must not no yes i you he she we they "
+    "me him her us them my your our their about into over under than so such also very".split()
+)
+
+# Weights of the local signals in the heuristic confidence score
+HEURISTIC_WEIGHTS = {"faithfulness": 0.5, "relevance": 0.2, "citations": 0.15, "retrieval": 0.15}
+
+
+def _content_tokens(text: str) -> List[str]:
+    # Crude plural folding so "refund" matches "refunds"
+    return [
+        t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t
+        for t in _TOKEN_RE.findall((text or "").lower())
+        if t not in _STOPWORDS
+    ]
+
+
+def _ngrams(tokens: List[str], n: int) -> set:
+    return set(zip(*(tokens[i:] for i in range(n))))
+
+
+def _support(answer_grams: set, context_grams: set) -> Optional[float]:
+    if not answer_grams:
+        return None
+    return len(answer_grams & context_grams) / len(answer_grams)
+
 
 @dataclass
 class JudgeVerdict:
@@ -48,6 +84,8 @@ class JudgeVerdict:
     verdict: str = "pass"
     feedback: str = ""
     was_regenerated: bool = False
+    # "llm" or "heuristic"; internal, not part of the API payload
+    source: str = "llm"
 
     def to_dict(self) -> dict:
         return {
@@ -71,6 +109,7 @@ class AnswerJudge:
             model=settings.JUDGE_MODEL,
             temperature=settings.JUDGE_TEMPERATURE,
             openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("answer_judge")],
         )
         self.threshold = settings.JUDGE_THRESHOLD
 
@@ -86,9 +125,119 @@ class AnswerJudge:
             for w, dim in zip(weights, dimensions)
         )
 
-    def evaluate(self, query: str, contexts: List[str], answer: str) -> JudgeVerdict:
+    @staticmethod
+    def heuristic_signals(
+        query: str,
+        contexts: List[str],
+        answer: str,
+        retrieval_scores: Optional[List[float]] = None,
+        score_relevance: bool = True,
+    ) -> Dict[str, Optional[float]]:
+        """Cheap local quality signals in [0, 1] (None when not applicable).
+
+        - faithfulness: share of the answer's content unigrams and bigrams found in the contexts
+        - relevance: share of the query's content terms addressed by the answer
+          (skipped with score_relevance=False, e.g. for instruction-style summary prompts)
+        - citations: share of [n] citations that point at an existing context
+        - retrieval: top retrieval score and its spread over the median
+        """
+        answer_text = _CITATION_RE.sub(" ", answer or "")
+        answer_tokens = _content_tokens(answer_text)
+        context_tokens = _content_tokens(" ".join(contexts))
+
+        unigram = _support(set(answer_tokens), set(context_tokens))
+        bigram = _support(_ngrams(answer_tokens, 2), _ngrams(context_tokens, 2))
+        parts = [v for v in (unigram, bigram) if v is not None]
+        faithfulness = sum(parts) / len(parts) if parts else None
+
+        query_terms = set(_content_tokens(query))
+        relevance = None
+        if score_relevance and query_terms:
+            relevance = len(query_terms & set(answer_tokens)) / len(query_terms)
+
+        cited = [int(n) for n in _CITATION_RE.findall(answer or "")]
+        citations = sum(1 for n in cited if 1 <= n <= len(contexts)) / len(cited) if cited else None
+
+        retrieval = None
+        scores = [s for s in retrieval_scores or [] if isinstance(s, (int, float))]
+        if scores:
+            top = max(scores)
+            spread = top - statistics.median(scores)
+            retrieval = (
+                0.7 * min(1.0, top / settings.JUDGE_RETRIEVAL_SCORE_TARGET)
+                + 0.3 * min(1.0, spread / settings.JUDGE_RETRIEVAL_SPREAD_TARGET)
+            )
+
+        return {
+            "faithfulness": faithfulness,
+            "relevance": relevance,
+            "citations": citations,
+            "retrieval": retrieval,
+        }
+
+    @staticmethod
+    def heuristic_confidence(signals: Dict[str, Optional[float]]) -> Optional[float]:
+        """Weighted mean of the available signals, or None without faithfulness."""
+        if signals.get("faithfulness") is None:
+            return None
+        available = {k: v for k, v in signals.items() if v is not None}
+        total = sum(HEURISTIC_WEIGHTS[k] for k in available)
+        return sum(HEURISTIC_WEIGHTS[k] * v for k, v in available.items()) / total
+
+    def _heuristic_verdict(self, signals: Dict[str, Optional[float]], confidence: float) -> JudgeVerdict:
+        """Pass verdict settled by local signals (heuristics never fail an answer on their own)."""
+        relevance = signals.get("relevance")
+        return JudgeVerdict(
+            faithfulness=round(signals["faithfulness"], 3),
+            relevance=round(relevance if relevance is not None else confidence, 3),
+            completeness=round(confidence, 3),
+            overall=round(confidence, 3),
+            verdict="pass",
+            source="heuristic",
+        )
+
+    def evaluate(
+        self,
+        query: str,
+        contexts: List[str],
+        answer: str,
+        retrieval_scores: Optional[List[float]] = None,
+        score_relevance: bool = True,
+    ) -> JudgeVerdict:
         """Evaluate an answer against the query and contexts.
 
+        In "tiered" JUDGE_MODE, local signals settle clear passes only. Likely
+        failures (below JUDGE_HEURISTIC_FAIL_BELOW) are confirmed by the LLM
+        judge before they can trigger a regeneration; uncertain answers go to
+        the LLM for a JUDGE_UNCERTAIN_SAMPLE_RATE share and clear passes for a
+        JUDGE_LLM_SAMPLE_RATE sample.
+        """
+        if settings.JUDGE_MODE != "tiered" or not contexts:
+            return self._evaluate_llm(query, contexts, answer)
+
+        signals = self.heuristic_signals(query, contexts, answer, retrieval_scores, score_relevance)
+        confidence = self.heuristic_confidence(signals)
+        if confidence is None:
+            return self._evaluate_llm(query, contexts, answer)
+
+        if confidence < settings.JUDGE_HEURISTIC_FAIL_BELOW:
+            logger.info(f"Judge: heuristic confidence {confidence:.2f} (likely fail), confirming with LLM")
+            return self._evaluate_llm(query, contexts, answer)
+
+        uncertain = confidence < settings.JUDGE_HEURISTIC_PASS_ABOVE
+        sample_rate = settings.JUDGE_UNCERTAIN_SAMPLE_RATE if uncertain else settings.JUDGE_LLM_SAMPLE_RATE
+        if random.random() < sample_rate:
+            logger.info(f"Judge: heuristic confidence {confidence:.2f} ({'uncertain' if uncertain else 'sampled'}), using LLM")
+            return self._evaluate_llm(query, contexts, answer)
+
+        # Uncertain answers that weren't sampled for the LLM pass, so they never trigger a regeneration
+        verdict = self._heuristic_verdict(signals, confidence)
+        logger.info(f"Judge verdict (heuristic): {verdict.verdict} (confidence={confidence:.2f})")
+        return verdict
+
+    def _evaluate_llm(self, query: str, contexts: List[str], answer: str) -> JudgeVerdict:
+        """Evaluate an answer with the LLM judge.
+
         Returns a JudgeVerdict with dimension scores, overall score, verdict, and feedback.
         On LLM failure, returns a neutral pass verdict.
         """
@@ -106,7 +255,7 @@ class AnswerJudge:
                 HumanMessage(content=user_prompt),
             ]
 
-            response = self.client.invoke(messages)
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, messages)
             raw = response.content.strip()
 
             # Strip markdown code fences if present
@@ -11,6 +11,11 @@ K = TypeVar("K")
 V = TypeVar("V")
 
 
+def normalize_cache_text(text: Optional[str]) -> str:
+    """Normalize free text for use in cache keys (case and whitespace insensitive)."""
+    return " ".join((text or "").lower().split())
+
+
 class TTLCache(Generic[K, V]):
     """Thread-safe in-memory cache with TTL and LRU eviction."""
 
@@ -1,26 +1,79 @@
 """Context assembly for RAG responses."""
 
-from typing import List, Dict, Any, Optional, Tuple
+import logging
+import re
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\w+")
+
+
+def default_token_counter() -> TokenCounter:
+    """Return a local tokenizer; tiktoken when installed, else a ~4 chars/token estimate."""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding(settings.CONTEXT_TOKENIZER_ENCODING)
+        return lambda text: len(encoding.encode(text, disallowed_special=()))
+    except Exception as exc:
+        logger.warning(f"tiktoken unavailable, estimating tokens from length: {exc}")
+        return lambda text: (len(text) + 3) // 4
+
 
 class ContextAssembler:
     """Assemble final context from retrieved chunks."""
 
-    def _process_doc(self, doc: Dict[str, Any], doc_names: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
-        """Extract text and metadata from a single doc chunk. Returns None if empty/duplicate."""
+    def __init__(self, token_counter: TokenCounter | None = None):
+        # Created lazily so constructing the service doesn't load the encoding
+        self._token_counter = token_counter
+
+    @property
+    def token_counter(self) -> TokenCounter:
+        if self._token_counter is None:
+            self._token_counter = default_token_counter()
+        return self._token_counter
+
+    @staticmethod
+    def _highlight_excerpts(parent_text: str, child_texts: List[str]) -> str:
+        """Mark each matching child inside its parent, appending any not found verbatim."""
+        combined = parent_text
+        appended = []
+        for child_text in child_texts:
+            child = child_text.strip()
+            if not child or child == parent_text.strip() or len(parent_text) <= len(child) * 2:
+                continue
+            if child in combined:
+                combined = combined.replace(child, f">>> {child} <<<", 1)
+            else:
+                appended.append(child)
+        for child in appended:
+            combined += f"\n\n[Relevant excerpt]\n{child}"
+        return combined
+
+    def _process_doc(
+        self,
+        doc: Dict[str, Any],
+        doc_names: Optional[Dict[str, str]] = None,
+        children: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Extract text and metadata from a single doc chunk. Returns None if empty/duplicate.
+
+        children lists every ranked chunk sharing this doc's parent (default:
+        just the doc); each child is highlighted once inside the parent text.
+        """
         parent_text = doc.get("parent_text") or ""
         child_text = doc.get("text") or ""
         text = parent_text or child_text
         if not text.strip():
             return None
 
-        if (parent_text and child_text
-                and child_text.strip() != parent_text.strip()
-                and len(parent_text) > len(child_text) * 2):
-            combined = f"{parent_text}\n\n[Relevant excerpt]\n{child_text}"
-        else:
-            combined = text
+        children = children or [doc]
+        child_texts = [c.get("text") or "" for c in children]
+        combined = self._highlight_excerpts(parent_text, child_texts) if parent_text else text
 
         metadata = doc.get("metadata", {})
         doc_id = metadata.get("doc_id", "")
@@ -40,10 +93,142 @@ class ContextAssembler:
             "text": text,
             "combined": combined,
             "label": label,
+            "doc_id": doc_id,
             "doc_name": doc_name,
             "page": page,
+            "child_text": " ".join(child_texts),
+            "excerpts": [
+                {
+                    "chunk_id": c.get("id", ""),
+                    "page": c.get("metadata", {}).get("page", ""),
+                    "text": (c.get("text") or "")[:settings.CONTEXT_SNIPPET_LENGTH],
+                }
+                for c in children
+            ],
         }
 
+    def _trim_to_window(self, text: str, child_text: str, max_tokens: int) -> str:
+        """Cut text down to the sentences around the matching child chunk, within max_tokens."""
+        sentences = [s for s in _SENTENCE_SPLIT.split(text.strip()) if s]
+        if not sentences:
+            return ""
+
+        # Anchor on the sentences that overlap the child excerpt most
+        child_words = set(_WORD.findall(child_text.lower()))
+        overlaps = [len(child_words & set(_WORD.findall(s.lower()))) for s in sentences]
+        best = max(overlaps)
+        hits = [i for i, overlap in enumerate(overlaps) if overlap == best] if best else [0]
+        lo, hi = hits[0], hits[-1]
+
+        window = settings.CONTEXT_TRIM_WINDOW_SENTENCES
+        lo, hi = max(0, lo - window), min(len(sentences) - 1, hi + window)
+
+        def render(start: int, end: int) -> str:
+            body = " ".join(sentences[start:end + 1])
+            prefix = "... " if start > 0 else ""
+            suffix = " ..." if end < len(sentences) - 1 else ""
+            return f"{prefix}{body}{suffix}"
+
+        # Shrink the window from its edges until it fits
+        trimmed = render(lo, hi)
+        while self.token_counter(trimmed) > max_tokens and hi > lo:
+            if hi - hits[-1] >= hits[0] - lo and hi > hits[-1]:
+                hi -= 1
+            elif lo < hits[0]:
+                lo += 1
+            else:
+                hi -= 1
+            trimmed = render(lo, hi)
+
+        if self.token_counter(trimmed) > max_tokens:
+            # A single sentence that is still too long: cut by characters
+            ratio = max_tokens / max(self.token_counter(trimmed), 1)
+            trimmed = trimmed[:int(len(trimmed) * ratio)].rstrip() + " ..."
+        return trimmed
+
+    def _pack(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Select items within CONTEXT_TOKEN_BUDGET by maximal marginal relevance.
+
+        Items arrive in rank order; relevance decays with rank and is traded off
+        against word overlap with already selected items. Items that do not fit
+        in full are trimmed to a sentence window around their matching child.
+        """
+        budget = settings.CONTEXT_TOKEN_BUDGET
+        if budget <= 0 or not items:
+            return items
+
+        lam = settings.CONTEXT_MMR_LAMBDA
+        count = len(items)
+        relevance = [1.0 - i / count for i in range(count)]
+        words = [set(_WORD.findall(item["combined"].lower())) for item in items]
+
+        remaining = list(range(count))
+        selected: List[int] = []
+        packed: List[Dict[str, Any]] = []
+        used = 0
+
+        while remaining and used < budget:
+            def mmr(i: int) -> float:
+                redundancy = max(
+                    (len(words[i] & words[j]) / max(len(words[i] | words[j]), 1) for j in selected),
+                    default=0.0,
+                )
+                return lam * relevance[i] - (1 - lam) * redundancy
+
+            best = max(remaining, key=mmr)
+            remaining.remove(best)
+            item = items[best]
+
+            label_tokens = self.token_counter(item["label"]) + 4 if item["label"] else 4
+            available = budget - used - label_tokens
+            tokens = self.token_counter(item["combined"])
+            if tokens <= available:
+                packed.append(item)
+                used += tokens + label_tokens
+                selected.append(best)
+                continue
+
+            # Too big in full: keep only the sentences around the matching child
+            if available < 32:
+                continue
+            trimmed = self._trim_to_window(item["text"], item["child_text"] or item["text"], available)
+            if not trimmed:
+                continue
+            packed.append({**item, "combined": trimmed})
+            used += self.token_counter(trimmed) + label_tokens
+            selected.append(best)
+
+        if len(packed) < count:
+            logger.info(f"Context packing: kept {len(packed)}/{count} chunks in {used}/{budget} tokens")
+        return packed
+
+    @staticmethod
+    def _group_by_parent(docs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Group ranked chunks that share a parent, ordered by each group's best chunk."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in docs:
+            metadata = doc.get("metadata", {})
+            parent_id = metadata.get("parent_id")
+            key = (
+                f"{metadata.get('doc_id', '')}:{parent_id}" if parent_id
+                else doc.get("parent_text") or doc.get("text") or ""
+            )
+            group = groups.setdefault(key, [])
+            if all((c.get("text") or "") != (doc.get("text") or "") for c in group):
+                group.append(doc)
+        return list(groups.values())
+
+    def _select(self, docs: List[Dict[str, Any]], doc_names: Optional[Dict[str, str]]) -> List[Dict[str, Any]]:
+        items = []
+        seen = set()
+        for children in self._group_by_parent(docs[:settings.RERANK_TOP_K]):
+            processed = self._process_doc(children[0], doc_names, children=children)
+            if not processed or processed["text"] in seen:
+                continue
+            seen.add(processed["text"])
+            items.append(processed)
+        return self._pack(items)
+
     def assemble(self, docs: List[Dict[str, Any]], doc_names: Optional[Dict[str, str]] = None) -> List[str]:
         """Return a list of context strings with document source labels.
 
@@ -52,13 +237,7 @@ class ContextAssembler:
             doc_names: Optional mapping of doc_id -> filename for labeling
         """
         contexts = []
-        seen = set()
-        for doc in docs[:settings.RERANK_TOP_K]:
-            processed = self._process_doc(doc, doc_names)
-            if not processed or processed["text"] in seen:
-                continue
-            seen.add(processed["text"])
-
+        for processed in self._select(docs, doc_names):
             if processed["label"]:
                 contexts.append(f"{processed['label']}\n{processed['combined']}")
             else:
@@ -70,24 +249,18 @@ class ContextAssembler:
     ) -> Tuple[List[str], List[Dict[str, Any]]]:
         """Return numbered contexts and a source map for citation linking.
 
-        Each context is prefixed with [1], [2], etc.
-        source_map[i] = {"index": i+1, "doc_name": ..., "page": ..., "text": snippet}
+        Each context is prefixed with [1], [2], etc. Chunks sharing a parent are
+        emitted as one context, so source_map[i]["excerpts"] lists every child
+        chunk cited by index i+1.
+        source_map[i] = {"index": i+1, "doc_id": ..., "doc_name": ..., "page": ..., "text": snippet, "excerpts": [...]}
 
         Returns:
             Tuple of (contexts, source_map)
         """
         contexts = []
         source_map: List[Dict[str, Any]] = []
-        seen = set()
-        index = 0
-
-        for doc in docs[:settings.RERANK_TOP_K]:
-            processed = self._process_doc(doc, doc_names)
-            if not processed or processed["text"] in seen:
-                continue
-            seen.add(processed["text"])
-            index += 1
 
+        for index, processed in enumerate(self._select(docs, doc_names), start=1):
             if processed["label"]:
                 contexts.append(f"[{index}] {processed['label']}\n{processed['combined']}")
             else:
@@ -100,9 +273,11 @@ class ContextAssembler:
 
             source_map.append({
                 "index": index,
+                "doc_id": processed["doc_id"],
                 "doc_name": processed["doc_name"],
                 "page": processed["page"],
                 "text": snippet,
+                "excerpts": processed["excerpts"],
             })
 
         return contexts, source_map
@@ -0,0 +1,151 @@
+"""Sentence-level compression of parent chunks before context assembly."""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Set
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+from app.core.config import settings
+from app.core.circuit_breaker import OPENAI_EMBEDDINGS, get_breaker
+from app.core import usage
+from app.services.cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n{2,}")
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ContextCompressor:
+    """Keep only the sentences of each parent chunk that match the query.
+
+    Sentences are embedded in one batch per request and cached by content
+    hash, so re-ranking the same parents for later queries costs only the
+    query embedding. Chunk metadata is left untouched, so citations still
+    point at the original document and page.
+    """
+    _sentence_cache: TTLCache[str, np.ndarray] = TTLCache(
+        max_size=settings.CONTEXT_COMPRESSION_CACHE_MAX_SIZE,
+        ttl_seconds=settings.CONTEXT_COMPRESSION_CACHE_TTL_SECONDS,
+    )
+
+    def __init__(self, embeddings: OpenAIEmbeddings | None = None):
+        # Created lazily so constructing the service doesn't need an API client
+        self._embeddings = embeddings
+
+    @property
+    def embeddings(self) -> OpenAIEmbeddings:
+        if self._embeddings is None:
+            self._embeddings = OpenAIEmbeddings(
+                model=settings.EMBEDDING_MODEL,
+                openai_api_key=settings.OPENAI_API_KEY
+            )
+        return self._embeddings
+
+    @staticmethod
+    def _split_sentences(text: str) -> List[str]:
+        return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+    async def _embed(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """Return unit-normalized vectors keyed by content hash, embedding only cache misses."""
+        vectors: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for text in texts:
+            key = _content_hash(text)
+            cached = ContextCompressor._sentence_cache.get(key)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                missing[key] = text
+
+        if missing:
+            embedded = await asyncio.to_thread(
+                get_breaker(OPENAI_EMBEDDINGS).call, self.embeddings.embed_documents, list(missing.values())
+            )
+            usage.record_embedding("context_compression", usage.count_tokens(missing.values()))
+            matrix = np.asarray(embedded, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = matrix / np.where(norms == 0, 1, norms)
+            for key, vector in zip(missing.keys(), matrix):
+                ContextCompressor._sentence_cache.set(key, vector)
+                vectors[key] = vector
+        return vectors
+
+    @staticmethod
+    def _select_sentences(scores: np.ndarray, pinned: Set[int]) -> List[int]:
+        """Indices of the top-scoring sentences plus their neighbours, in document order."""
+        top_n = settings.CONTEXT_COMPRESSION_TOP_SENTENCES
+        neighbors = settings.CONTEXT_COMPRESSION_NEIGHBORS
+        anchors = set(np.argsort(-scores)[:top_n].tolist()) | pinned
+        keep: Set[int] = set()
+        for index in anchors:
+            keep.update(range(max(0, index - neighbors), min(len(scores), index + neighbors + 1)))
+        return sorted(keep)
+
+    async def compress(self, query: str, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return docs with long parent texts cut down to their query-relevant sentences.
+
+        Sentences contained in a ranked child chunk are always kept. Returns
+        the input unchanged when disabled or on failure.
+        """
+        if not settings.CONTEXT_COMPRESSION_ENABLED or not docs or not query.strip():
+            return docs
+
+        # Compress each distinct parent once, pinning every ranked child's sentences
+        parents: Dict[str, List[str]] = {}
+        children: Dict[str, List[str]] = {}
+        for doc in docs:
+            parent_text = doc.get("parent_text") or ""
+            if len(parent_text) < settings.CONTEXT_COMPRESSION_MIN_CHARS or parent_text in parents:
+                children.setdefault(parent_text, []).append(doc.get("text") or "")
+                continue
+            sentences = self._split_sentences(parent_text)
+            if len(sentences) > settings.CONTEXT_COMPRESSION_TOP_SENTENCES:
+                parents[parent_text] = sentences
+            children.setdefault(parent_text, []).append(doc.get("text") or "")
+        if not parents:
+            return docs
+
+        try:
+            unique_sentences = list({s: None for sentences in parents.values() for s in sentences})
+            vectors = await self._embed([query] + unique_sentences)
+        except Exception as exc:
+            logger.warning(f"Context compression skipped: {exc}")
+            return docs
+
+        query_vector = vectors[_content_hash(query)]
+        compressed: Dict[str, str] = {}
+        for parent_text, sentences in parents.items():
+            matrix = np.stack([vectors[_content_hash(s)] for s in sentences])
+            scores = matrix @ query_vector
+            pinned = {
+                i for i, sentence in enumerate(sentences)
+                if any(sentence in child for child in children.get(parent_text, []))
+            }
+            keep = self._select_sentences(scores, pinned)
+
+            parts: List[str] = []
+            previous = -1
+            for index in keep:
+                if index != previous + 1:
+                    parts.append("...")
+                parts.append(sentences[index])
+                previous = index
+            if previous < len(sentences) - 1:
+                parts.append("...")
+            compressed[parent_text] = " ".join(parts)
+
+        before = sum(len(p) for p in compressed)
+        after = sum(len(c) for c in compressed.values())
+        logger.info(f"Context compression: {len(compressed)} parents, {before} -> {after} chars")
+
+        return [
+            {**doc, "parent_text": compressed[doc["parent_text"]]}
+            if doc.get("parent_text") in compressed else doc
+            for doc in docs
+        ]
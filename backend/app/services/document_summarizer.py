@@ -0,0 +1,99 @@
+"""Per-document summaries generated once at ingest time."""
+
+import asyncio
+import logging
+from typing import List, Optional
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+MAP_PROMPT = (
+    "Summarize this section of a document in 3-5 sentences. "
+    "Keep names, figures and conclusions; skip boilerplate. No preamble."
+)
+
+REDUCE_PROMPT = (
+    "Combine these section summaries into one overview of the whole document. "
+    "Write 1-2 short paragraphs covering its purpose, main topics and key conclusions. "
+    "No preamble, no headings."
+)
+
+
+class DocumentSummarizer:
+    """Map-reduce summarization over a document's parent chunks."""
+
+    def __init__(self):
+        self.client = ChatOpenAI(
+            model=settings.DOCUMENT_SUMMARY_MODEL,
+            temperature=0,
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("document_summary")],
+        )
+
+    @staticmethod
+    def _group_sections(texts: List[str]) -> List[str]:
+        """Pack consecutive chunks into sections, sampling evenly for long documents."""
+        max_chars = settings.DOCUMENT_SUMMARY_SECTION_MAX_CHARS
+        sections: List[str] = []
+        current = ""
+        for text in texts:
+            text = text.strip()
+            if not text:
+                continue
+            if current and len(current) + len(text) > max_chars:
+                sections.append(current)
+                current = ""
+            current = f"{current}\n\n{text}" if current else text[:max_chars]
+        if current:
+            sections.append(current)
+
+        max_sections = settings.DOCUMENT_SUMMARY_MAX_SECTIONS
+        if len(sections) > max_sections:
+            step = len(sections) / max_sections
+            sections = [sections[int(i * step)] for i in range(max_sections)]
+        return sections
+
+    async def _summarize_section(self, section: str, semaphore: asyncio.Semaphore) -> str:
+        async with semaphore:
+            response = await self.client.ainvoke([
+                SystemMessage(content=MAP_PROMPT),
+                HumanMessage(content=section)
+            ])
+            return (response.content or "").strip()
+
+    async def summarize(self, texts: List[str], filename: Optional[str] = None) -> str:
+        """Summarize a document from its parent chunk texts.
+
+        Sections are summarized concurrently (map), then combined (reduce).
+        Returns an empty string on failure so ingestion never fails on it.
+        """
+        if not settings.ENABLE_DOCUMENT_SUMMARIES:
+            return ""
+        sections = self._group_sections(texts)
+        if not sections:
+            return ""
+
+        semaphore = asyncio.Semaphore(settings.DOCUMENT_SUMMARY_CONCURRENCY)
+        try:
+            partials = await asyncio.gather(
+                *(self._summarize_section(section, semaphore) for section in sections)
+            )
+            partials = [p for p in partials if p]
+            if len(partials) <= 1:
+                summary = partials[0] if partials else ""
+            else:
+                title = f"Document: {filename}\n\n" if filename else ""
+                joined = "\n\n".join(f"Section {i}: {p}" for i, p in enumerate(partials, start=1))
+                response = await self.client.ainvoke([
+                    SystemMessage(content=REDUCE_PROMPT),
+                    HumanMessage(content=f"{title}{joined}")
+                ])
+                summary = (response.content or "").strip()
+            logger.info(f"Summarized {filename or 'document'}: {len(sections)} sections -> {len(summary)} chars")
+            return summary
+        except Exception as exc:
+            logger.warning(f"Document summarization failed: {exc}")
+            return ""
@@ -6,6 +6,8 @@ import json
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,8 @@ class EntityExtractor:
         self.client = ChatOpenAI(
             model=settings.LLM_MODEL,
             temperature=0,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("entity_extraction")],
         )
 
     def extract_entities(self, text: str) -> List[str]:
@@ -32,7 +35,7 @@ class EntityExtractor:
         )
 
         try:
-            response = self.client.invoke([
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, [
                 SystemMessage(content="You are a precise entity extractor."),
                 HumanMessage(content=f"{prompt}\n\nText:\n{text}")
             ])
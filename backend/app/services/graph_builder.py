@@ -3,6 +3,7 @@
 import logging
 from typing import List, Optional
 from app.core.config import settings
+from app.core.circuit_breaker import NEO4J, CircuitOpenError, get_breaker
 from app.models.graph_store import GraphStore
 from app.services.entity_extractor import EntityExtractor
 
@@ -30,9 +31,10 @@ class GraphBuilder:
         """Extract entities and build co-occurrence relationships.
 
         Concatenates consecutive chunks into batches to reduce LLM calls.
-        Skips silently if Neo4j is not available.
+        Skips silently if Neo4j is not available or its circuit is open.
         """
-        if not self.available:
+        breaker = get_breaker(NEO4J)
+        if not self.available or breaker.is_open:
             return
 
         MAX_BATCH_CHARS = settings.GRAPH_BUILDER_MAX_BATCH_CHARS
@@ -48,14 +50,19 @@ class GraphBuilder:
         if current_batch:
             batches.append(current_batch)
 
-        for batch_text in batches:
-            entities = self.entity_extractor.extract_entities(batch_text)
-            if not entities:
-                continue
-            self.graph_store.upsert_entities(entities, doc_id, user_id=user_id)
-            for i, source in enumerate(entities):
-                for target in entities[i + 1:]:
-                    self.graph_store.create_relationship(source, target, "RELATED_TO", doc_id, user_id=user_id)
+        try:
+            for batch_text in batches:
+                entities = self.entity_extractor.extract_entities(batch_text)
+                if not entities:
+                    continue
+                breaker.call(self.graph_store.upsert_entities, entities, doc_id, user_id=user_id)
+                for i, source in enumerate(entities):
+                    for target in entities[i + 1:]:
+                        breaker.call(
+                            self.graph_store.create_relationship, source, target, "RELATED_TO", doc_id, user_id=user_id
+                        )
+        except CircuitOpenError:
+            logger.warning("Neo4j circuit opened during graph build for doc %s, skipping the rest", doc_id)
 
     def close(self):
         """Close underlying resources."""
@@ -1,13 +1,27 @@
 """Hybrid retrieval combining Pinecone semantic and Neo4j graph."""
 
+import logging
 import math
 from typing import List, Dict, Any, Optional
 from app.core.config import settings
+from app.core import deadline, metrics, profiling
+from app.core.circuit_breaker import NEO4J, OPENAI_CHAT, OPENAI_EMBEDDINGS, PINECONE, get_breaker
 from app.models.pinecone_store import PineconeStore
 from app.models.graph_store import GraphStore
 from app.services.query_expander import QueryExpander
 from app.services.entity_extractor import EntityExtractor
 
+logger = logging.getLogger(__name__)
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm_a = math.sqrt(sum(x * x for x in a))
+    norm_b = math.sqrt(sum(y * y for y in b))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
 
 class HybridRetrieval:
     """Retrieve candidate contexts from vector and graph stores."""
@@ -24,73 +38,182 @@ class HybridRetrieval:
         self.query_expander = query_expander or QueryExpander()
         self.entity_extractor = entity_extractor or EntityExtractor()
 
-    async def retrieve(self, query: str, user_id: Optional[str] = None, doc_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _add_matches(matches: List[Dict[str, Any]], results: List[Dict[str, Any]], seen_ids: set) -> None:
+        for match in matches:
+            if match["id"] in seen_ids:
+                continue
+            seen_ids.add(match["id"])
+            metadata = match.get("metadata", {})
+            results.append({
+                "id": match["id"],
+                "score": match["score"],
+                "text": metadata.get("text", ""),
+                "parent_text": metadata.get("parent_text", ""),
+                "metadata": metadata,
+            })
+
+    @staticmethod
+    def _is_confident(matches: List[Dict[str, Any]]) -> bool:
+        """Whether first-pass scores show a strong match that stands out.
+
+        Requires the top score to clear ADAPTIVE_EXPANSION_MIN_TOP_SCORE and to
+        lead the k-th score (ADAPTIVE_EXPANSION_MARGIN_RANK) by at least
+        ADAPTIVE_EXPANSION_MIN_MARGIN.
+        """
+        scores = sorted((m.get("score") or 0.0 for m in matches), reverse=True)
+        if not scores:
+            return False
+        top = scores[0]
+        # A lone match has nothing to stand out from; compare it against zero
+        kth = scores[min(settings.ADAPTIVE_EXPANSION_MARGIN_RANK, len(scores)) - 1] if len(scores) > 1 else 0.0
+        return (
+            top >= settings.ADAPTIVE_EXPANSION_MIN_TOP_SCORE
+            and top - kth >= settings.ADAPTIVE_EXPANSION_MIN_MARGIN
+        )
+
+    async def _dedupe_expansions(self, query_vector: List[float], expansions: List[str]) -> List[str]:
+        """Drop expansions whose embedding is near-identical to the query or an earlier expansion.
+
+        Reuses the query embedding from the first pass and embeds only the
+        expansions. The embeddings land in the store's embedding cache, so the
+        follow-up query_by_text calls for the kept expansions don't re-embed.
+        """
+        if not expansions:
+            return []
+        try:
+            vectors = await self.pinecone_store.get_embeddings_batch(expansions)
+            kept_vectors = [query_vector]
+            kept: List[str] = []
+            for text, vector in zip(expansions, vectors):
+                if any(_cosine(vector, other) >= settings.EXPANSION_DEDUP_SIMILARITY for other in kept_vectors):
+                    logger.info(f"Dropping near-duplicate expansion: '{text[:60]}'")
+                    continue
+                kept.append(text)
+                kept_vectors.append(vector)
+            return kept
+        except Exception as exc:
+            logger.warning(f"Expansion dedup failed, using all expansions: {exc}")
+            return expansions
+
+    async def _expand(self, query: str) -> List[str]:
+        """Expand the query, falling back to the original alone when time runs low."""
+        if get_breaker(OPENAI_CHAT).is_open:
+            return [query]
+        return await deadline.run_stage(
+            "expansion",
+            lambda: profiling.to_thread(self.query_expander.expand, query),
+            settings.DEADLINE_EXPANSION_SECONDS,
+            fallback=[query],
+            reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS,
+        )
+
+    async def retrieve(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        doc_ids: Optional[List[str]] = None,
+        expanded_queries: Optional[List[str]] = None,
+        query_entities: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
         """Retrieve candidate chunks.
 
         When multiple doc_ids are selected, retrieves from each document
-        separately to ensure balanced coverage across all documents.
+        separately to ensure balanced coverage across all documents. With
+        ADAPTIVE_EXPANSION_ENABLED the original query runs first and the
+        expansions only run for documents whose first-pass scores look weak.
 
         Args:
             query: User's query
             user_id: User ID for multi-tenant isolation
             doc_ids: List of document IDs to filter by (empty/None = all documents)
+            expanded_queries: Precomputed query expansions (e.g. from the query
+                planner); the expander is called when None
+            query_entities: Precomputed query entities for the graph lookup;
+                the entity extractor is called when None
         """
-        expanded_queries = self.query_expander.expand(query)
+        with metrics.time_stage("retrieval"):
+            return await self._retrieve(query, user_id, doc_ids, expanded_queries, query_entities)
+
+    async def _retrieve(
+        self,
+        query: str,
+        user_id: Optional[str],
+        doc_ids: Optional[List[str]],
+        expanded_queries: Optional[List[str]],
+        query_entities: Optional[List[str]],
+    ) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
         seen_ids = set()
 
         # Multi-document: query each document separately for balanced results
         if doc_ids and len(doc_ids) > 1:
-            per_doc_k = max(settings.HYBRID_MIN_PER_DOC, math.ceil(settings.SEMANTIC_TOP_K / len(doc_ids)))
-            for q in expanded_queries:
-                for doc_id in doc_ids:
-                    matches = await self.pinecone_store.query_by_text(
-                        q,
-                        top_k=per_doc_k,
-                        user_id=user_id,
-                        doc_ids=[doc_id]
-                    )
-                    for match in matches:
-                        if match["id"] in seen_ids:
-                            continue
-                        seen_ids.add(match["id"])
-                        metadata = match.get("metadata", {})
-                        results.append({
-                            "id": match["id"],
-                            "score": match["score"],
-                            "text": metadata.get("text", ""),
-                            "parent_text": metadata.get("parent_text", ""),
-                            "metadata": metadata,
-                        })
+            scopes = [[doc_id] for doc_id in doc_ids]
+            top_k = max(settings.HYBRID_MIN_PER_DOC, math.ceil(settings.SEMANTIC_TOP_K / len(doc_ids)))
         else:
             # Single document or all documents: query normally
-            for q in expanded_queries:
+            scopes = [doc_ids]
+            top_k = settings.SEMANTIC_TOP_K
+
+        if get_breaker(PINECONE).is_open or get_breaker(OPENAI_EMBEDDINGS).is_open:
+            # Open circuit: skip at once instead of waiting on a dead dependency
+            logger.warning("Vector search skipped: Pinecone or embeddings circuit open, using graph results only")
+        elif settings.ADAPTIVE_EXPANSION_ENABLED:
+            # First pass with the original query; expand only where recall looks weak
+            query_vector = await self.pinecone_store.get_embedding(query)
+            weak_scopes = []
+            for scope in scopes:
                 matches = await self.pinecone_store.query_by_text(
-                    q,
-                    top_k=settings.SEMANTIC_TOP_K,
-                    user_id=user_id,
-                    doc_ids=doc_ids
+                    query, top_k=top_k, user_id=user_id, doc_ids=scope, query_vector=query_vector
                 )
-                for match in matches:
-                    if match["id"] in seen_ids:
-                        continue
-                    seen_ids.add(match["id"])
-                    metadata = match.get("metadata", {})
-                    results.append({
-                        "id": match["id"],
-                        "score": match["score"],
-                        "text": metadata.get("text", ""),
-                        "parent_text": metadata.get("parent_text", ""),
-                        "metadata": metadata,
-                    })
-
-        entities = self.entity_extractor.extract_entities(query)
-        graph_nodes = self.graph_store.query_related_entities(
-            entities,
-            max_depth=settings.GRAPH_MAX_DEPTH,
-            limit=settings.GRAPH_MAX_DEPTH * 5,
-            user_id=user_id,
-            doc_ids=doc_ids
+                self._add_matches(matches, results, seen_ids)
+                if not self._is_confident(matches):
+                    weak_scopes.append(scope)
+
+            if not weak_scopes:
+                logger.info("Adaptive expansion: first pass confident, skipping expansion")
+            else:
+                if expanded_queries is None:
+                    expanded_queries = await self._expand(query)
+                extra_queries = await self._dedupe_expansions(
+                    query_vector, [q for q in expanded_queries if q != query]
+                )
+                logger.info(
+                    f"Adaptive expansion: {len(weak_scopes)}/{len(scopes)} weak scope(s), "
+                    f"{len(extra_queries)} expansion(s)"
+                )
+                for q in extra_queries:
+                    for scope in weak_scopes:
+                        matches = await self.pinecone_store.query_by_text(q, top_k=top_k, user_id=user_id, doc_ids=scope)
+                        self._add_matches(matches, results, seen_ids)
+        else:
+            if expanded_queries is None:
+                expanded_queries = await self._expand(query)
+            for q in expanded_queries:
+                for scope in scopes:
+                    matches = await self.pinecone_store.query_by_text(q, top_k=top_k, user_id=user_id, doc_ids=scope)
+                    self._add_matches(matches, results, seen_ids)
+
+        def graph_lookup() -> List[Dict[str, Any]]:
+            entities = query_entities if query_entities is not None else self.entity_extractor.extract_entities(query)
+            return self.graph_store.query_related_entities(
+                entities,
+                max_depth=settings.GRAPH_MAX_DEPTH,
+                limit=settings.GRAPH_MAX_DEPTH * 5,
+                user_id=user_id,
+                doc_ids=doc_ids
+            )
+
+        # Graph context is optional: skip it when Neo4j is down or the request deadline is close
+        if get_breaker(NEO4J).is_open:
+            logger.info("Graph lookup skipped: Neo4j circuit open")
+            return results
+        graph_nodes = await deadline.run_stage(
+            "graph",
+            lambda: profiling.to_thread(graph_lookup),
+            settings.DEADLINE_GRAPH_SECONDS,
+            fallback=[],
+            reserve=settings.DEADLINE_GENERATION_RESERVE_SECONDS,
         )
         for node in graph_nodes:
             results.append({
@@ -0,0 +1,158 @@
+"""Local (LLM-free) entity extraction against the user's knowledge graph."""
+
+import logging
+from collections import deque
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.document import Document
+from app.models.graph_store import GraphStore
+from app.services.cache_utils import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher (Aho–Corasick automaton) over lowercased text."""
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = patterns
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        # Breadth-first pass to set failure links and merge outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(ch, 0)
+                # Children of the root fail back to the root, not to themselves
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """Return (start, end, pattern_index) for every occurrence in text."""
+        matches: List[Tuple[int, int, int]] = []
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for index in self._out[state]:
+                length = len(self.patterns[index])
+                matches.append((pos - length + 1, pos + 1, index))
+        return matches
+
+
+class LocalEntityExtractor:
+    """Find known graph entity names in text without an LLM call.
+
+    Each user's entity names are compiled into an Aho–Corasick automaton that
+    is cached and rebuilt when the user's document set (and therefore the
+    graph) changes.
+    """
+    _automata: TTLCache[str, Tuple[str, Optional[AhoCorasick], List[str]]] = TTLCache(
+        max_size=settings.LOCAL_ENTITY_AUTOMATON_MAX_USERS,
+        ttl_seconds=settings.LOCAL_ENTITY_AUTOMATON_TTL_SECONDS,
+    )
+    _build_lock = Lock()
+
+    def __init__(self, graph_store: GraphStore | None = None):
+        # Created lazily so constructing the service doesn't open a Neo4j driver
+        self._graph_store = graph_store
+
+    @property
+    def graph_store(self) -> GraphStore:
+        if self._graph_store is None:
+            self._graph_store = GraphStore()
+        return self._graph_store
+
+    @staticmethod
+    def _graph_version(user_id: str) -> str:
+        try:
+            return Document.get_corpus_version(user_id)
+        except Exception as exc:
+            logger.warning(f"Failed to compute corpus version: {exc}")
+            return ""
+
+    def _get_automaton(self, user_id: str) -> Tuple[Optional[AhoCorasick], List[str]]:
+        version = self._graph_version(user_id)
+        cached = LocalEntityExtractor._automata.get(user_id)
+        if cached and cached[0] == version:
+            return cached[1], cached[2]
+
+        with LocalEntityExtractor._build_lock:
+            cached = LocalEntityExtractor._automata.get(user_id)
+            if cached and cached[0] == version:
+                return cached[1], cached[2]
+
+            try:
+                names = self.graph_store.get_entity_names(
+                    user_id, limit=settings.LOCAL_ENTITY_MAX_NAMES
+                )
+            except Exception as exc:
+                logger.warning(f"Could not load graph entities for local extraction: {exc}")
+                return None, []
+
+            # Deduplicate case-insensitively, keeping the graph's spelling
+            canonical: Dict[str, str] = {}
+            for name in names:
+                key = " ".join(name.lower().split())
+                if len(key) >= settings.LOCAL_ENTITY_MIN_NAME_LENGTH and key not in canonical:
+                    canonical[key] = name
+            patterns = list(canonical.keys())
+            automaton = AhoCorasick(patterns) if patterns else None
+            display = [canonical[p] for p in patterns]
+            LocalEntityExtractor._automata.set(user_id, (version, automaton, display))
+            logger.info(f"Built entity automaton for user {user_id}: {len(patterns)} names")
+            return automaton, display
+
+    def extract_entities(self, text: str, user_id: Optional[str] = None) -> List[str]:
+        """Return the user's graph entities mentioned in text, in order of appearance."""
+        if not text.strip() or not user_id:
+            return []
+
+        automaton, display = self._get_automaton(user_id)
+        if automaton is None:
+            return []
+
+        lowered = " ".join(text.lower().split())
+        matches = automaton.find(lowered)
+
+        # Whole-word matches only, leftmost-longest without overlaps
+        matches = [
+            (start, end, index) for start, end, index in matches
+            if (start == 0 or not lowered[start - 1].isalnum())
+            and (end == len(lowered) or not lowered[end].isalnum())
+        ]
+        matches.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+        entities: List[str] = []
+        seen = set()
+        last_end = -1
+        for start, end, index in matches:
+            if start < last_end:
+                continue
+            last_end = end
+            if index not in seen:
+                seen.add(index)
+                entities.append(display[index])
+        return entities
@@ -18,8 +18,10 @@ from app.services.excel_extractor import ExcelExtractor
 from app.services.pptx_extractor import PptxExtractor
 from app.services.txt_extractor import TxtExtractor
 from app.services.graph_builder import GraphBuilder
+from app.services.document_summarizer import DocumentSummarizer
 from app.services.storage_service import StorageService
 from app.models.pinecone_store import PineconeStore
+from app.core import metrics, profiling
 
 
 class MultimodalProcessor:
@@ -38,6 +40,7 @@ class MultimodalProcessor:
         txt_extractor: Optional[TxtExtractor] = None,
         ocr_service: Optional[OCRService] = None,
         graph_builder: Optional[GraphBuilder] = None,
+        document_summarizer: Optional[DocumentSummarizer] = None,
     ):
         self.chunking_service = chunking_service or ChunkingService()
         self.pinecone_store = pinecone_store or PineconeStore()
@@ -50,6 +53,7 @@ class MultimodalProcessor:
         self.txt_extractor = txt_extractor or TxtExtractor()
         self.ocr_service = ocr_service or OCRService()
         self.graph_builder = graph_builder or GraphBuilder()
+        self.document_summarizer = document_summarizer or DocumentSummarizer()
 
     async def process_document(
         self,
@@ -84,31 +88,53 @@ class MultimodalProcessor:
             user_id=user_id
         )
 
+        try:
+            with metrics.time_stage("ingest"):
+                result = await self._process_by_type(
+                    normalized_file_type, document_id, file_path, storage_path,
+                    user_id=user_id, filename=filename,
+                )
+        except Exception:
+            metrics.DOCUMENTS_PROCESSED.inc(file_type=normalized_file_type, outcome="error")
+            raise
+        metrics.DOCUMENTS_PROCESSED.inc(file_type=normalized_file_type, outcome="ok")
+        return result
+
+    async def _process_by_type(
+        self,
+        normalized_file_type: str,
+        document_id: str,
+        file_path: str,
+        storage_path: str,
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> Dict[str, Any]:
         if normalized_file_type == "pdf":
-            return await self._process_pdf(document_id, file_path, storage_path, user_id=user_id)
+            return await self._process_pdf(document_id, file_path, storage_path, user_id=user_id, filename=filename)
         if normalized_file_type == "docx":
-            return await self._process_docx(document_id, file_path, storage_path, user_id=user_id)
+            return await self._process_docx(document_id, file_path, storage_path, user_id=user_id, filename=filename)
         if normalized_file_type == "xlsx":
-            return await self._process_xlsx(document_id, file_path, storage_path, user_id=user_id)
+            return await self._process_xlsx(document_id, file_path, storage_path, user_id=user_id, filename=filename)
         if normalized_file_type == "pptx":
-            return await self._process_pptx(document_id, file_path, storage_path, user_id=user_id)
+            return await self._process_pptx(document_id, file_path, storage_path, user_id=user_id, filename=filename)
         if normalized_file_type == "txt":
-            return await self._process_txt(document_id, file_path, storage_path, user_id=user_id)
-        return await self._process_image(document_id, file_path, storage_path, user_id=user_id)
+            return await self._process_txt(document_id, file_path, storage_path, user_id=user_id, filename=filename)
+        return await self._process_image(document_id, file_path, storage_path, user_id=user_id, filename=filename)
 
     async def _process_pdf(
         self,
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Extracting PDF text from pages...")
-        pages = await asyncio.to_thread(self._extract_text_pages, file_path)
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        pages = await profiling.to_thread(self._extract_text_pages, file_path)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         logger.info(f"[{document_id}] Extracting PDF tables...")
-        table_entries = await asyncio.to_thread(self.table_extractor.extract_tables, file_path)
+        table_entries = await profiling.to_thread(self.table_extractor.extract_tables, file_path)
         table_upserted = await self._index_tables(table_entries, document_id, user_id=user_id)
 
         logger.info(f"[{document_id}] Extracting PDF page images...")
@@ -119,6 +145,7 @@ class MultimodalProcessor:
             "storage_path": storage_path,
             "pages": len(pages),
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": table_upserted,
             "images": len(images),
@@ -130,14 +157,15 @@ class MultimodalProcessor:
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Extracting DOCX text...")
-        pages = await asyncio.to_thread(self.docx_extractor.extract_pages, file_path)
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        pages = await profiling.to_thread(self.docx_extractor.extract_pages, file_path)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         logger.info(f"[{document_id}] Extracting DOCX tables...")
-        table_entries = await asyncio.to_thread(self.docx_extractor.extract_tables, file_path)
+        table_entries = await profiling.to_thread(self.docx_extractor.extract_tables, file_path)
         table_upserted = await self._index_tables(table_entries, document_id, user_id=user_id)
 
         return {
@@ -145,6 +173,7 @@ class MultimodalProcessor:
             "storage_path": storage_path,
             "pages": len(pages),
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": table_upserted,
             "images": 0,
@@ -156,14 +185,15 @@ class MultimodalProcessor:
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Extracting XLSX sheet content...")
-        pages = await asyncio.to_thread(self.excel_extractor.extract_sheets, file_path)
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        pages = await profiling.to_thread(self.excel_extractor.extract_sheets, file_path)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         logger.info(f"[{document_id}] Extracting XLSX table representations...")
-        table_entries = await asyncio.to_thread(self.excel_extractor.extract_tables, file_path)
+        table_entries = await profiling.to_thread(self.excel_extractor.extract_tables, file_path)
         table_upserted = await self._index_tables(table_entries, document_id, user_id=user_id)
 
         return {
@@ -171,6 +201,7 @@ class MultimodalProcessor:
             "storage_path": storage_path,
             "pages": len(pages),
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": table_upserted,
             "images": 0,
@@ -182,14 +213,15 @@ class MultimodalProcessor:
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Extracting PPTX slide text...")
-        pages = await asyncio.to_thread(self.pptx_extractor.extract_pages, file_path)
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        pages = await profiling.to_thread(self.pptx_extractor.extract_pages, file_path)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         logger.info(f"[{document_id}] Extracting PPTX tables...")
-        table_entries = await asyncio.to_thread(self.pptx_extractor.extract_tables, file_path)
+        table_entries = await profiling.to_thread(self.pptx_extractor.extract_tables, file_path)
         table_upserted = await self._index_tables(table_entries, document_id, user_id=user_id)
 
         return {
@@ -197,6 +229,7 @@ class MultimodalProcessor:
             "storage_path": storage_path,
             "pages": len(pages),
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": table_upserted,
             "images": 0,
@@ -208,17 +241,19 @@ class MultimodalProcessor:
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Extracting TXT content...")
-        pages = await asyncio.to_thread(self.txt_extractor.extract_pages, file_path)
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        pages = await profiling.to_thread(self.txt_extractor.extract_pages, file_path)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         return {
             "doc_id": document_id,
             "storage_path": storage_path,
             "pages": len(pages),
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": 0,
             "images": 0,
@@ -230,12 +265,13 @@ class MultimodalProcessor:
         document_id: str,
         file_path: str,
         storage_path: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, Any]:
         logger.info(f"[{document_id}] Running OCR for image...")
-        ocr_text = await asyncio.to_thread(self._extract_image_text, file_path)
+        ocr_text = await profiling.to_thread(self._extract_image_text, file_path)
         pages = [{"page_num": 1, "text": ocr_text}] if ocr_text.strip() else []
-        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id)
+        chunking_stats = await self._chunk_index_and_graph(pages, document_id, user_id=user_id, filename=filename)
 
         image_entries = await self._upload_original_image(file_path, document_id, user_id=user_id)
 
@@ -244,6 +280,7 @@ class MultimodalProcessor:
             "storage_path": storage_path,
             "pages": 1,
             "parent_chunks": chunking_stats["parent_chunks"],
+            "summary": chunking_stats["summary"],
             "child_chunks": chunking_stats["child_chunks"],
             "table_chunks": 0,
             "images": len(image_entries),
@@ -254,32 +291,44 @@ class MultimodalProcessor:
         self,
         pages: List[Dict[str, Any]],
         document_id: str,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        filename: Optional[str] = None,
     ) -> Dict[str, int]:
-        """Create chunks, index text vectors, and optionally build graph."""
+        """Create chunks, index text vectors, build the graph and summarize the document."""
         if not pages:
-            return {"parent_chunks": 0, "child_chunks": 0, "text_upserted": 0}
+            return {"parent_chunks": 0, "child_chunks": 0, "text_upserted": 0, "summary": ""}
 
-        parent_chunks, child_chunks = await asyncio.to_thread(
+        parent_chunks, child_chunks = await profiling.to_thread(
             self.chunking_service.process_document_pages, pages
         )
         logger.info(
             f"[{document_id}] Created {len(parent_chunks)} parent and {len(child_chunks)} child chunks"
         )
 
+        summary = ""
         if parent_chunks:
-            try:
-                logger.info(f"[{document_id}] Building knowledge graph...")
-                await asyncio.to_thread(
-                    self.graph_builder.build_from_texts,
-                    [chunk.text for chunk in parent_chunks],
-                    document_id,
-                    user_id
-                )
-            except Exception as exc:
-                logger.warning(f"[{document_id}] Graph build failed: {exc}")
-            finally:
-                self.graph_builder.close()
+            parent_texts = [chunk.text for chunk in parent_chunks]
+
+            async def build_graph() -> None:
+                try:
+                    logger.info(f"[{document_id}] Building knowledge graph...")
+                    await profiling.to_thread(
+                        self.graph_builder.build_from_texts,
+                        parent_texts,
+                        document_id,
+                        user_id
+                    )
+                except Exception as exc:
+                    logger.warning(f"[{document_id}] Graph build failed: {exc}")
+                finally:
+                    self.graph_builder.close()
+
+            # Summarize alongside graph building so ingest time barely changes
+            logger.info(f"[{document_id}] Summarizing document...")
+            _, summary = await asyncio.gather(
+                build_graph(),
+                self.document_summarizer.summarize(parent_texts, filename=filename),
+            )
 
         pinecone_payload = self.chunking_service.prepare_for_pinecone(
             parent_chunks=parent_chunks,
@@ -294,6 +343,7 @@ class MultimodalProcessor:
             "parent_chunks": len(parent_chunks),
             "child_chunks": len(child_chunks),
             "text_upserted": upserted,
+            "summary": summary,
         }
 
     def _extract_image_text(self, file_path: str) -> str:
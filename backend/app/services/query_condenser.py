@@ -0,0 +1,102 @@
+"""History-aware rewriting of follow-up questions into standalone queries."""
+
+import hashlib
+import json
+import logging
+from typing import Dict, List, Optional
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
+from app.services.cache_utils import TTLCache, normalize_cache_text
+
+logger = logging.getLogger(__name__)
+
+CONDENSER_PROMPT = """Rewrite the user's latest message into a standalone search query.
+Resolve pronouns and references ("it", "that", "the second one", "more") using the conversation.
+Keep the user's wording where possible and do not answer the question.
+If the message is already standalone, return it unchanged.
+Return only the rewritten query, no extra text."""
+
+# Per-message cap so long assistant answers don't dominate the condenser prompt
+MAX_TURN_CHARS = 600
+
+
+class QueryCondenser:
+    """Condense a follow-up question and its chat history into a standalone query."""
+    _cache: Optional[TTLCache[str, str]] = None
+
+    def __init__(self):
+        self.client = ChatOpenAI(
+            model=settings.QUERY_CONDENSER_MODEL,
+            temperature=0,
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("query_condenser")],
+        )
+        if QueryCondenser._cache is None:
+            QueryCondenser._cache = TTLCache(
+                max_size=settings.QUERY_CONDENSER_CACHE_MAX_SIZE,
+                ttl_seconds=settings.QUERY_CONDENSER_CACHE_TTL_SECONDS,
+            )
+
+    @staticmethod
+    def _recent_turns(chat_history: Optional[List]) -> List[Dict[str, str]]:
+        """Return the last user/assistant turns as plain dicts."""
+        turns: List[Dict[str, str]] = []
+        for item in chat_history or []:
+            role = getattr(item, "role", None)
+            content = getattr(item, "content", None)
+            if role is None and isinstance(item, dict):
+                role = item.get("role")
+                content = item.get("content")
+            if role in ("user", "assistant") and isinstance(content, str) and content.strip():
+                turns.append({"role": role, "content": content.strip()[:MAX_TURN_CHARS]})
+        return turns[-settings.QUERY_CONDENSER_MAX_TURNS:]
+
+    @staticmethod
+    def _cache_key(query: str, turns: List[Dict[str, str]]) -> str:
+        payload = {
+            "query": normalize_cache_text(query),
+            "history": [[t["role"], normalize_cache_text(t["content"])] for t in turns],
+        }
+        encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def condense(self, query: str, chat_history: Optional[List] = None) -> Optional[str]:
+        """Rewrite a follow-up question into a standalone query.
+
+        Returns:
+            The standalone query, or None when no rewrite was made (empty
+            history, condensation disabled, or the LLM call failed). Callers
+            should fall back to the original query in that case.
+        """
+        if not settings.ENABLE_QUERY_CONDENSATION or not query.strip():
+            return None
+
+        turns = self._recent_turns(chat_history)
+        if not turns:
+            return None
+
+        cache_key = self._cache_key(query, turns)
+        cached = QueryCondenser._cache.get(cache_key) if QueryCondenser._cache else None
+        if cached is not None:
+            logger.info(f"Query condenser cache hit: '{query[:50]}' -> '{cached[:80]}'")
+            return cached
+
+        conversation = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+        try:
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, [
+                SystemMessage(content=CONDENSER_PROMPT),
+                HumanMessage(content=f"Conversation:\n{conversation}\n\nLatest message:\n{query}")
+            ])
+            standalone = (response.content or "").strip().strip('"').strip()
+            if not standalone:
+                return None
+            logger.info(f"Query condenser: '{query[:50]}' -> '{standalone[:80]}'")
+            if QueryCondenser._cache:
+                QueryCondenser._cache.set(cache_key, standalone)
+            return standalone
+        except Exception as exc:
+            logger.warning(f"Query condensation failed, using original query: {exc}")
+            return None
@@ -1,30 +1,45 @@
 """Query expansion using LLM."""
 
 import logging
-from typing import List
+from typing import List, Optional
 import json
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
+from app.services.cache_utils import TTLCache, normalize_cache_text
 
 logger = logging.getLogger(__name__)
 
 
 class QueryExpander:
     """Generate query expansions to improve recall."""
+    _cache: Optional[TTLCache[str, List[str]]] = None
 
     def __init__(self):
         self.client = ChatOpenAI(
             model=settings.LLM_MODEL,
             temperature=0,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("query_expansion")],
         )
+        if QueryExpander._cache is None:
+            QueryExpander._cache = TTLCache(
+                max_size=settings.QUERY_EXPANSION_CACHE_MAX_SIZE,
+                ttl_seconds=settings.QUERY_EXPANSION_CACHE_TTL_SECONDS,
+            )
 
     def expand(self, query: str, max_expansions: int = 3) -> List[str]:
         """Return expanded queries including the original."""
         if not query.strip():
             return []
 
+        cache_key = f"{max_expansions}:{normalize_cache_text(query)}"
+        cached = QueryExpander._cache.get(cache_key) if QueryExpander._cache else None
+        if cached is not None:
+            return [query] + [q for q in cached if q != query]
+
         prompt = (
             "Generate concise search query variations for the user question. "
             "Return JSON with key 'queries' as an array of strings. "
@@ -32,7 +47,7 @@ class QueryExpander:
         )
 
         try:
-            response = self.client.invoke([
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, [
                 SystemMessage(content="You generate search queries."),
                 HumanMessage(content=f"{prompt}\n\nQuestion:\n{query}")
             ])
@@ -40,6 +55,8 @@ class QueryExpander:
             data = json.loads(content)
             queries = data.get("queries", [])
             cleaned = [q.strip() for q in queries if isinstance(q, str) and q.strip()]
+            if QueryExpander._cache:
+                QueryExpander._cache.set(cache_key, cleaned)
             return [query] + [q for q in cleaned if q != query]
         except Exception as exc:
             logger.error("Query expansion failed: %s", exc)
@@ -0,0 +1,117 @@
+"""Single-call query planner: intent, expansions and query entities."""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
+from app.services.cache_utils import TTLCache, normalize_cache_text
+from app.services.query_router import INTENT_DEFINITIONS, VALID_INTENTS, QueryRouter
+
+logger = logging.getLogger(__name__)
+
+PLANNER_PROMPT = """Plan the retrieval for the user's message. Return JSON with these keys:
+- "intent": one of
+""" + INTENT_DEFINITIONS + """
+- "queries": concise search query variations that improve recall (empty unless intent is "document_query").
+- "entities": key entities (people, organizations, products, concepts) named in the message.
+
+Only return the JSON object, no extra text.
+
+Example:
+User: "What are the side effects of aspirin?" -> {"intent": "document_query", "queries": ["aspirin adverse effects", "aspirin risks and complications"], "entities": ["aspirin"]}
+"""
+
+
+@dataclass
+class QueryPlan:
+    """Routing and retrieval inputs for one query."""
+
+    intent: str
+    expansions: List[str] = field(default_factory=list)
+    entities: List[str] = field(default_factory=list)
+
+
+class QueryPlanner:
+    """Replace separate router, expander and entity-extractor calls with one LLM call."""
+    _cache: Optional[TTLCache[str, QueryPlan]] = None
+
+    def __init__(self):
+        self.client = ChatOpenAI(
+            model=settings.QUERY_PLANNER_MODEL,
+            temperature=0,
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("query_planner")],
+        )
+        if QueryPlanner._cache is None:
+            QueryPlanner._cache = TTLCache(
+                max_size=settings.QUERY_PLANNER_CACHE_MAX_SIZE,
+                ttl_seconds=settings.QUERY_PLANNER_CACHE_TTL_SECONDS,
+            )
+
+    def plan(self, query: str) -> Optional[QueryPlan]:
+        """Return a plan for the query.
+
+        Obvious greetings, chitchat and summary requests are settled by the
+        router's rule-based fast path without an LLM call.
+
+        Returns:
+            A QueryPlan whose expansions start with the original query, or
+            None if planning failed and the caller should fall back to the
+            separate router / expander / entity extractor services.
+        """
+        if not query.strip():
+            return None
+
+        if settings.QUERY_ROUTER_FAST_PATH_ENABLED:
+            fast_intent = QueryRouter.classify_fast(query)
+            if fast_intent:
+                logger.info(f"Query planner (rules): '{query[:50]}' -> {fast_intent}")
+                return QueryPlan(intent=fast_intent)
+
+        cache_key = normalize_cache_text(query)
+        cached = QueryPlanner._cache.get(cache_key) if QueryPlanner._cache else None
+        if cached:
+            logger.info(f"Query planner cache hit: '{query[:50]}' -> {cached.intent}")
+            return QueryPlan(intent=cached.intent, expansions=list(cached.expansions), entities=list(cached.entities))
+
+        try:
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, [
+                SystemMessage(content=PLANNER_PROMPT),
+                HumanMessage(content=query)
+            ])
+            data = json.loads(response.content or "{}")
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
+
+            intent = data.get("intent", "document_query")
+            if intent not in VALID_INTENTS:
+                intent = "document_query"
+
+            queries = data.get("queries") if intent == "document_query" else None
+            raw_entities = data.get("entities")
+            cleaned = [
+                q.strip() for q in (queries if isinstance(queries, list) else [])
+                if isinstance(q, str) and q.strip()
+            ]
+            expansions = [query] + [q for q in cleaned if q != query][:settings.QUERY_PLANNER_MAX_EXPANSIONS]
+            entities = [
+                e.strip() for e in (raw_entities if isinstance(raw_entities, list) else [])
+                if isinstance(e, str) and e.strip()
+            ]
+        except Exception as exc:
+            logger.warning(f"Query planner failed, falling back to separate services: {exc}")
+            return None
+
+        plan = QueryPlan(intent=intent, expansions=expansions, entities=entities)
+        if QueryPlanner._cache:
+            QueryPlanner._cache.set(cache_key, plan)
+        logger.info(
+            f"Query planner: '{query[:50]}' -> {intent} "
+            f"({len(expansions)} queries, {len(entities)} entities)"
+        )
+        return plan
@@ -2,18 +2,27 @@
 
 import json
 import logging
-from typing import Optional
+import re
+from threading import Lock
+from typing import Dict, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core.circuit_breaker import OPENAI_CHAT, get_breaker
+from app.services.cache_utils import TTLCache, normalize_cache_text
 
 logger = logging.getLogger(__name__)
 
-ROUTER_PROMPT = """Classify the user's message intent. Return JSON with key "intent" set to one of:
-- "greeting": casual greetings, hello, hi, hey, etc.
+INTENT_DEFINITIONS = """- "greeting": casual greetings, hello, hi, hey, etc.
 - "chitchat": casual conversation, thanks, goodbye, how are you, etc.
 - "summary": broad requests about the document overview, summary, what it's about, its content, main topics.
-- "document_query": a specific question that requires searching documents for information.
+- "document_query": a specific question that requires searching documents for information."""
+
+VALID_INTENTS = {"greeting", "chitchat", "summary", "document_query"}
+
+ROUTER_PROMPT = """Classify the user's message intent. Return JSON with key "intent" set to one of:
+""" + INTENT_DEFINITIONS + """
 
 Only return the JSON object, no extra text.
 
@@ -33,32 +42,135 @@ User: "I want to know about the content" -> {"intent": "summary"}
 """
 
 
+# Deterministic patterns matched against the lowercased, punctuation-free query.
+# Anything they don't fully match is left to the LLM classifier.
+GREETING_RE = re.compile(
+    r"^(hi|hello|hey|hiya|howdy|greetings|good (morning|afternoon|evening|day))"
+    r"( there| docchat| everyone| all)?"
+    r"( how are you( doing)?( today)?)?$"
+)
+CHITCHAT_RE = re.compile(
+    r"^((thanks|thank you|thx|ty|cheers)( so much| a lot| very much)?( docchat)?"
+    r"|ok|okay|cool|great|nice|awesome|perfect|got it|sounds good"
+    r"|bye|goodbye|see you( later)?|good night"
+    r"|how are you( doing)?( today)?|who are you|what can you do)$"
+)
+SUMMARY_RE = re.compile(
+    r"^((can|could) you |please )*"
+    r"(summari[sz]e|give me (a |an )?(summary|overview)|(provide|write) (a |an )?(summary|overview)"
+    r"|tell me about|what is|what are|whats)"
+    r"( of| about)?( this| the| these| my| all)?( uploaded)?"
+    r" ?(document|documents|doc|docs|file|files|pdf|pdfs|content)?( about)?( please)?$"
+)
+SUMMARY_TOPIC_RE = re.compile(r"^what are the (main|key) (topics|points|themes)( covered)?$")
+
+# Words that only ever appear in the summary patterns together with a document
+# noun; a bare "what is" must not be treated as a summary request.
+SUMMARY_NOUNS = {"document", "documents", "doc", "docs", "file", "files", "pdf", "pdfs", "content"}
+SUMMARY_VERBS = {"summarize", "summarise", "summary", "overview"}
+
+FAST_PATH_MAX_WORDS = 12
+
+
 class QueryRouter:
     """Route queries based on intent classification."""
+    _intent_cache: Optional[TTLCache[str, str]] = None
+    _stats: Dict[str, int] = {"total": 0, "rules": 0, "cache": 0, "llm": 0}
+    _stats_lock = Lock()
 
     def __init__(self):
         self.client = ChatOpenAI(
             model=settings.QUERY_ROUTER_MODEL,
             temperature=settings.QUERY_ROUTER_TEMPERATURE,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("query_router")],
         )
+        if QueryRouter._intent_cache is None:
+            QueryRouter._intent_cache = TTLCache(
+                max_size=settings.QUERY_ROUTER_CACHE_MAX_SIZE,
+                ttl_seconds=settings.QUERY_ROUTER_CACHE_TTL_SECONDS,
+            )
+
+    @staticmethod
+    def classify_fast(query: str) -> Optional[str]:
+        """Classify obvious intents with patterns, keywords and length features.
+
+        Returns:
+            The intent, or None when the query is ambiguous and needs the LLM.
+        """
+        words = re.findall(r"[a-z]+", (query or "").lower().replace("'", ""))
+        if not words or len(words) > FAST_PATH_MAX_WORDS:
+            return None
+        text = " ".join(words)
+
+        if GREETING_RE.match(text):
+            return "greeting"
+        if CHITCHAT_RE.match(text):
+            return "chitchat"
+        # Digits point at a specific page/section ("summarize page 5") -> not a summary
+        if any(ch.isdigit() for ch in query):
+            return None
+        if SUMMARY_TOPIC_RE.match(text):
+            return "summary"
+        if SUMMARY_RE.match(text) and (SUMMARY_NOUNS & set(words) or SUMMARY_VERBS & set(words)):
+            return "summary"
+        return None
+
+    @classmethod
+    def _record(cls, source: str) -> float:
+        """Count a routing decision and return the share routed without an LLM call."""
+        with cls._stats_lock:
+            cls._stats["total"] += 1
+            cls._stats[source] += 1
+            return (cls._stats["rules"] + cls._stats["cache"]) / cls._stats["total"]
+
+    @classmethod
+    def routing_stats(cls) -> Dict[str, float]:
+        """Return routing counters and the share of queries routed without an LLM call."""
+        with cls._stats_lock:
+            stats: Dict[str, float] = dict(cls._stats)
+        total = stats["total"]
+        stats["local_ratio"] = round((stats["rules"] + stats["cache"]) / total, 4) if total else 0.0
+        return stats
 
     def classify(self, query: str) -> str:
         """Classify query intent.
 
+        Obvious greetings, chitchat and summary requests are settled locally;
+        previously classified queries are served from the intent cache; only
+        the remaining ambiguous queries reach the LLM.
+
         Returns:
-            One of: "greeting", "chitchat", "document_query"
+            One of: "greeting", "chitchat", "summary", "document_query"
         """
+        if settings.QUERY_ROUTER_FAST_PATH_ENABLED:
+            intent = self.classify_fast(query)
+            if intent:
+                local_ratio = self._record("rules")
+                logger.info(f"Query router (rules): '{query[:50]}' -> {intent} [local={local_ratio:.0%}]")
+                return intent
+
+        cache_key = normalize_cache_text(query)
+        cached = QueryRouter._intent_cache.get(cache_key) if QueryRouter._intent_cache else None
+        if cached:
+            local_ratio = self._record("cache")
+            logger.info(f"Query router (cache): '{query[:50]}' -> {cached} [local={local_ratio:.0%}]")
+            return cached
+
         try:
-            response = self.client.invoke([
+            response = get_breaker(OPENAI_CHAT).call(self.client.invoke, [
                 SystemMessage(content=ROUTER_PROMPT),
                 HumanMessage(content=query)
             ])
             data = json.loads(response.content or "{}")
             intent = data.get("intent", "document_query")
-            logger.info(f"Query router: '{query[:50]}' -> {intent}")
+            if QueryRouter._intent_cache:
+                QueryRouter._intent_cache.set(cache_key, intent)
+            local_ratio = self._record("llm")
+            logger.info(f"Query router: '{query[:50]}' -> {intent} [local={local_ratio:.0%}]")
             return intent
         except Exception as exc:
+            self._record("llm")
             logger.warning(f"Query router failed, defaulting to document_query: {exc}")
             return "document_query"
 
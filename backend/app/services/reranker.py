@@ -5,6 +5,8 @@ from typing import List, Dict, Any, Optional
 from math import sqrt, ceil
 from openai import OpenAI
 from app.core.config import settings
+from app.core.circuit_breaker import OPENAI_EMBEDDINGS, get_breaker
+from app.core import metrics, usage
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,8 @@ class Reranker:
             return self._balanced_select(docs, top_k)
 
         try:
-            return await self._rerank_with_openai(query, docs, top_k)
+            with metrics.time_stage("rerank_scoring"):
+                return await self._rerank_with_openai(query, docs, top_k)
         except Exception as exc:
             logger.error("OpenAI reranking failed: %s", exc)
             return self._balanced_select(docs, top_k)
@@ -55,10 +58,12 @@ class Reranker:
         self, query: str, docs: List[Dict[str, Any]], top_k: int
     ) -> List[Dict[str, Any]]:
         texts = [doc.get("text", "") for doc in docs]
-        response = self.openai_client.embeddings.create(
+        response = get_breaker(OPENAI_EMBEDDINGS).call(
+            self.openai_client.embeddings.create,
             model=settings.EMBEDDING_MODEL,
             input=[query] + texts,
         )
+        usage.record_embedding("rerank", response.usage.total_tokens)
         query_vec = response.data[0].embedding
         doc_vecs = [item.embedding for item in response.data[1:]]
         scores = [
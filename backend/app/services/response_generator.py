@@ -1,9 +1,13 @@
 """LLM response generation."""
 
+import time
 from typing import List, Optional, AsyncIterator
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from app.core.config import settings
+from app.core.usage import UsageCallbackHandler
+from app.core import metrics, tracing
+from app.schemas.query import SessionSummaryMessage
 
 
 class ResponseGenerator:
@@ -13,14 +17,21 @@ class ResponseGenerator:
         self.client = ChatOpenAI(
             model=settings.LLM_MODEL,
             temperature=settings.TEMPERATURE,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            callbacks=[UsageCallbackHandler("generation")],
         )
 
     def _build_messages(self, prompt: str, chat_history: Optional[List] = None) -> list:
-        """Build message list from prompt and chat history."""
+        """Build message list from prompt and chat history.
+
+        Only the server-side session summary becomes a system message; any
+        other entry claiming the system role is dropped.
+        """
         messages = [SystemMessage(content="You are DocChat, a helpful document Q&A assistant.")]
         for msg in (chat_history or []):
-            if msg.role == "user":
+            if isinstance(msg, SessionSummaryMessage):
+                messages.append(SystemMessage(content=msg.content))
+            elif msg.role == "user":
                 messages.append(HumanMessage(content=msg.content))
             elif msg.role == "assistant":
                 messages.append(AIMessage(content=msg.content))
@@ -56,7 +67,8 @@ class ResponseGenerator:
         """Generate a response using the LLM with conversation history."""
         prompt = self._build_prompt(query, contexts)
         messages = self._build_messages(prompt, chat_history)
-        response = self.client.invoke(messages)
+        with metrics.time_stage("generation"):
+            response = self.client.invoke(messages)
         return response.content or ""
 
     def generate_with_feedback(
@@ -65,16 +77,30 @@ class ResponseGenerator:
         """Regenerate a response incorporating judge feedback."""
         prompt = self._build_prompt(query, contexts, feedback=feedback)
         messages = self._build_messages(prompt, chat_history)
-        response = self.client.invoke(messages)
+        with metrics.time_stage("generation"):
+            response = self.client.invoke(messages)
         return response.content or ""
 
+    async def _timed_stream(self, messages: list) -> AsyncIterator[str]:
+        """Stream content chunks, recording time to first token and total generation time."""
+        start = time.perf_counter()
+        first = True
+        with metrics.time_stage("generation"):
+            async for chunk in self.client.astream(messages):
+                if chunk.content:
+                    if first:
+                        elapsed = time.perf_counter() - start
+                        metrics.STAGE_SECONDS.observe(elapsed, stage="generation_first_token")
+                        tracing.annotate(first_token_ms=round(elapsed * 1000, 2))
+                        first = False
+                    yield chunk.content
+
     async def generate_stream(self, query: str, contexts: List[str], chat_history: Optional[List] = None) -> AsyncIterator[str]:
         """Stream a response token-by-token using async LLM streaming."""
         prompt = self._build_prompt(query, contexts)
         messages = self._build_messages(prompt, chat_history)
-        async for chunk in self.client.astream(messages):
-            if chunk.content:
-                yield chunk.content
+        async for token in self._timed_stream(messages):
+            yield token
 
     async def generate_with_feedback_stream(
         self, query: str, contexts: List[str], feedback: str, chat_history: Optional[List] = None
@@ -82,7 +108,6 @@ class ResponseGenerator:
         """Stream a regenerated response incorporating judge feedback."""
         prompt = self._build_prompt(query, contexts, feedback=feedback)
         messages = self._build_messages(prompt, chat_history)
-        async for chunk in self.client.astream(messages):
-            if chunk.content:
-                yield chunk.content
+        async for token in self._timed_stream(messages):
+            yield token
 
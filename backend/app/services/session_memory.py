@@ -0,0 +1,131 @@
+"""Server-side conversation memory: rolling summary plus recent turns."""
+
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Union
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import SystemMessage, HumanMessage
+from app.core.config import settings
+from app.core import usage
+from app.core.usage import UsageCallbackHandler
+from app.models.chat_session import ChatSession
+from app.models.llm_usage import LLMUsage
+from app.schemas.query import ChatMessage, SessionSummaryMessage
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and a document Q&A assistant.
+Update the existing summary with the new turns. Keep the topics, documents, entities, facts and
+open questions that later follow-ups may refer to; drop pleasantries. Write at most {max_chars}
+characters of plain prose. Return only the updated summary."""
+
+
+class SessionMemory:
+    """Build chat history for a session and fold older turns into its summary.
+
+    The prompt history is the session summary (as a system message) followed
+    by the last ``SESSION_RECENT_TURNS`` turns, so its size stays bounded no
+    matter how long the conversation runs.
+    """
+    # Keep background summarization tasks referenced until they finish
+    _tasks: Set["asyncio.Task[None]"] = set()
+    # One summarization at a time per session, so overlapping turns never
+    # fold the same messages twice
+    _locks: Dict[str, asyncio.Lock] = {}
+
+    def __init__(self):
+        # Created lazily so loading history never needs an API client
+        self._client: ChatOpenAI | None = None
+
+    @property
+    def client(self) -> ChatOpenAI:
+        if self._client is None:
+            self._client = ChatOpenAI(
+                model=settings.SESSION_SUMMARY_MODEL,
+                temperature=0,
+                openai_api_key=settings.OPENAI_API_KEY,
+                callbacks=[UsageCallbackHandler("session_summary")],
+            )
+        return self._client
+
+    @staticmethod
+    def _recent_window() -> int:
+        return max(0, settings.SESSION_RECENT_TURNS) * 2
+
+    def load_history(self, session: Dict) -> List[Union[SessionSummaryMessage, ChatMessage]]:
+        """Return the prompt history for a session: summary plus recent turns."""
+        messages = ChatSession.get_messages(session["session_id"], after_id=session.get("summarized_until", 0))
+        window = self._recent_window()
+        recent = messages[-window:] if window else []
+
+        history: List[Union[SessionSummaryMessage, ChatMessage]] = []
+        if session.get("summary"):
+            history.append(SessionSummaryMessage(
+                content=f"Summary of the earlier conversation:\n{session['summary']}"
+            ))
+        history.extend(ChatMessage(role=m["role"], content=m["content"]) for m in recent)
+        return history
+
+    def record_turn(self, session: Dict, query: str, answer: str) -> Optional[int]:
+        """Store a completed turn and refresh the summary in the background.
+
+        Returns the id of the stored assistant message, or None if the answer was empty.
+        """
+        messages = [{"role": "user", "content": query}]
+        if answer:
+            messages.append({"role": "assistant", "content": answer})
+        message_ids = ChatSession.add_messages(session["session_id"], messages)
+
+        task = asyncio.create_task(self.summarize(session["session_id"], session["user_id"]))
+        SessionMemory._tasks.add(task)
+        task.add_done_callback(SessionMemory._tasks.discard)
+        return message_ids[1] if answer else None
+
+    async def summarize(self, session_id: str, user_id: str) -> None:
+        """Fold turns that have left the recent window into the rolling summary.
+
+        Runs only once a batch of turns has aged out, so the summarizer is
+        called every few turns rather than on every message. Calls for the
+        same session are serialized, and the summary is only stored if no
+        other worker summarized the session in the meantime.
+        """
+        lock = SessionMemory._locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                await self._summarize(session_id, user_id)
+        finally:
+            if not lock.locked():
+                SessionMemory._locks.pop(session_id, None)
+
+    async def _summarize(self, session_id: str, user_id: str) -> None:
+        session = ChatSession.get(session_id, user_id)
+        if session is None:
+            return
+
+        pending = ChatSession.get_messages(session_id, after_id=session["summarized_until"])
+        window = self._recent_window()
+        overflow = pending[:-window] if window else pending
+        if not overflow or len(overflow) < settings.SESSION_SUMMARY_BATCH_TURNS * 2:
+            return
+
+        turns = "\n".join(f"{m['role']}: {m['content']}" for m in overflow)
+        previous = session["summary"] or "(empty)"
+        usage.start()
+        try:
+            response = await self.client.ainvoke([
+                SystemMessage(content=SUMMARY_PROMPT.format(max_chars=settings.SESSION_SUMMARY_MAX_CHARS)),
+                HumanMessage(content=f"Existing summary:\n{previous}\n\nNew turns:\n{turns}")
+            ])
+            summary = (response.content or "").strip()[:settings.SESSION_SUMMARY_MAX_CHARS]
+        except Exception as exc:
+            # Turns stay pending and are retried after the next message
+            logger.warning(f"Session summarization failed: {exc}")
+            return
+        finally:
+            LLMUsage.record(user_id, "session_summary", usage.finish())
+        if not summary:
+            return
+        if ChatSession.update_summary(session_id, summary, overflow[-1]["message_id"], session["summarized_until"]):
+            logger.info(f"Session {session_id}: summarized {len(overflow)} messages ({len(summary)} chars)")
+        else:
+            logger.info(f"Session {session_id}: summary already advanced elsewhere, discarding")
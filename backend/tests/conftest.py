@@ -14,6 +14,8 @@ os.environ.setdefault("PINECONE_API_KEY", "test-pinecone-key")
 os.environ.setdefault("NEO4J_URI", "bolt://localhost:7687")
 os.environ.setdefault("NEO4J_PASSWORD", "test-neo4j-password")
 os.environ.setdefault("OPENAI_API_KEY", "test-openai-key")
+# No background dependency probes against the fake endpoints above
+os.environ.setdefault("HEALTH_PROBE_ENABLED", "false")
 
 # Light imports only — avoid importing app.main at module level because it
 # transitively imports heavy ML libraries (torch, transformers, etc.) which
@@ -23,6 +25,51 @@ from app.models.user import User  # noqa: E402
 from app.core.security import create_access_token  # noqa: E402
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Circuit breakers are process-wide; isolate tests from each other's failures."""
+    from app.core.circuit_breaker import reset_all
+    reset_all()
+    yield
+    reset_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_retry_budgets():
+    """Retry budgets are process-wide; start each test with full buckets."""
+    from app.core.retry_budget import reset_all
+    reset_all()
+    yield
+    reset_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_admission():
+    """Each test gets a fresh admission controller (futures are loop-bound)."""
+    from app.core import admission
+    admission.reset()
+    yield
+    admission.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_hedging():
+    """Latency histograms and the hedge budget are process-wide."""
+    from app.core.hedging import reset_all
+    reset_all()
+    yield
+    reset_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_health():
+    """Each test gets a fresh health prober (cached results, loop-bound probe futures)."""
+    from app.core import health
+    health.reset()
+    yield
+    health.reset()
+
+
 @pytest.fixture()
 def tmp_db(monkeypatch, tmp_path):
     """Redirect the database to a temporary SQLite file and initialise it."""
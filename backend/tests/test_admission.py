@@ -0,0 +1,73 @@
+"""Tests for app.core.admission — AdmissionController."""
+
+import asyncio
+
+import pytest
+
+from app.core.admission import PRIORITY_OWNER, PRIORITY_USER, AdmissionController, AdmissionRejected
+
+
+def _controller(**kwargs):
+    defaults = dict(max_in_flight=1, max_queue=4, queue_timeout=1.0, retry_after=3)
+    return AdmissionController(**{**defaults, **kwargs})
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_max_in_flight_then_queues():
+    controller = _controller()
+    slot = await controller.acquire()
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+
+    assert controller.in_flight == 1 and controller.queue_depth == 1
+    slot.release()
+    second = await waiter
+    assert controller.in_flight == 1 and controller.queue_depth == 0
+    second.release()
+    second.release()  # idempotent
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_owner_is_served_before_earlier_users():
+    controller = _controller()
+    slot = await controller.acquire()
+    order = []
+
+    async def wait(name, priority):
+        admitted = await controller.acquire(priority)
+        order.append(name)
+        admitted.release()
+
+    tasks = [asyncio.ensure_future(wait("user", PRIORITY_USER)), asyncio.ensure_future(wait("owner", PRIORITY_OWNER))]
+    await asyncio.sleep(0)
+    slot.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["owner", "user"]
+    assert controller.admitted == {"owner": 1, "user": 2}
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_queue_full():
+    controller = _controller(max_queue=0)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire()
+
+    assert exc_info.value.reason == "queue_full" and exc_info.value.retry_after == 3
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_sheds_and_leaves_queue():
+    controller = _controller(queue_timeout=0.05)
+    slot = await controller.acquire()
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        await controller.acquire()
+
+    assert exc_info.value.reason == "timeout"
+    assert controller.queue_depth == 0
+    slot.release()
+    assert controller.in_flight == 0
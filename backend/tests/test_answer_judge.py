@@ -1,5 +1,7 @@
 """Tests for app.services.answer_judge — JudgeVerdict and score computation."""
 
+from unittest.mock import MagicMock
+
 from app.services.answer_judge import AnswerJudge, JudgeVerdict
 
 
@@ -73,3 +75,95 @@ def test_judge_verdict_to_dict():
         "faithfulness", "relevance", "completeness", "coherence",
         "conciseness", "overall", "verdict", "feedback", "was_regenerated",
     }
+
+
+CONTEXTS = [
+    "[1] policy.pdf\nRefunds are accepted within 30 days of purchase with a valid receipt.",
+    "[2] policy.pdf\nDigital goods are not eligible for refunds once downloaded.",
+]
+
+
+def _tiered_judge(monkeypatch, uncertain_rate=0.0, sample_rate=0.0):
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_MODE", "tiered")
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_UNCERTAIN_SAMPLE_RATE", uncertain_rate)
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_LLM_SAMPLE_RATE", sample_rate)
+    judge = AnswerJudge.__new__(AnswerJudge)
+    judge.threshold = 0.6
+    judge._evaluate_llm = MagicMock(return_value=JudgeVerdict(overall=0.5, verdict="fail"))
+    return judge
+
+
+def test_heuristic_signals_grounded_answer():
+    signals = AnswerJudge.heuristic_signals(
+        "What is the refund window?",
+        CONTEXTS,
+        "Refunds are accepted within 30 days of purchase [1].",
+        retrieval_scores=[0.72, 0.55, 0.50],
+    )
+    assert signals["faithfulness"] == 1.0
+    assert signals["citations"] == 1.0
+    assert signals["relevance"] > 0
+    assert signals["retrieval"] == 1.0
+
+
+def test_heuristic_signals_invalid_citation_and_unsupported_text():
+    signals = AnswerJudge.heuristic_signals(
+        "What is the refund window?",
+        CONTEXTS,
+        "Shipping takes twelve weeks by carrier pigeon [7].",
+    )
+    assert signals["faithfulness"] < 0.2
+    assert signals["citations"] == 0.0
+    assert signals["retrieval"] is None
+
+
+def test_tiered_clear_pass_skips_llm(monkeypatch):
+    judge = _tiered_judge(monkeypatch)
+    verdict = judge.evaluate(
+        "What is the refund window?",
+        CONTEXTS,
+        "Refunds are accepted within 30 days of purchase with a valid receipt [1].",
+        retrieval_scores=[0.8, 0.5],
+    )
+    assert verdict.verdict == "pass"
+    assert verdict.source == "heuristic"
+    judge._evaluate_llm.assert_not_called()
+
+
+def test_tiered_clear_fail_is_confirmed_by_llm(monkeypatch):
+    """Heuristics never fail an answer alone: a likely fail goes to the LLM judge."""
+    judge = _tiered_judge(monkeypatch)
+    verdict = judge.evaluate(
+        "What is the refund window?",
+        CONTEXTS,
+        "Shipping takes twelve weeks by carrier pigeon [7].",
+        retrieval_scores=[0.2, 0.19],
+    )
+    judge._evaluate_llm.assert_called_once()
+    assert verdict.source == "llm"
+
+
+def test_tiered_uncertain_band_uses_llm(monkeypatch):
+    judge = _tiered_judge(monkeypatch, uncertain_rate=1.0)
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_HEURISTIC_PASS_ABOVE", 1.01)
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_HEURISTIC_FAIL_BELOW", 0.0)
+    verdict = judge.evaluate("What is the refund window?", CONTEXTS, "Refunds within 30 days [1].")
+    judge._evaluate_llm.assert_called_once()
+    assert verdict.source == "llm"
+
+
+def test_tiered_sampling_sends_confident_answers_to_llm(monkeypatch):
+    judge = _tiered_judge(monkeypatch, sample_rate=1.0)
+    judge.evaluate(
+        "What is the refund window?",
+        CONTEXTS,
+        "Refunds are accepted within 30 days of purchase with a valid receipt [1].",
+    )
+    judge._evaluate_llm.assert_called_once()
+
+
+def test_llm_mode_always_calls_llm(monkeypatch):
+    judge = _tiered_judge(monkeypatch)
+    monkeypatch.setattr("app.services.answer_judge.settings.JUDGE_MODE", "llm")
+    judge.evaluate("q", CONTEXTS, "Refunds are accepted within 30 days [1].")
+    judge._evaluate_llm.assert_called_once()
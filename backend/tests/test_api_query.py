@@ -14,3 +14,115 @@ def test_query_empty_body(auth_client):
     resp = auth_client.post("/api/v1/query/", json={"query": "   "})
     assert resp.status_code == 400
     assert "empty" in resp.json()["detail"].lower()
+
+
+def test_reflection_unknown_id(auth_client):
+    """Returns 404 for an unknown or expired reflection id."""
+    resp = auth_client.get("/api/v1/query/reflection/does-not-exist")
+    assert resp.status_code == 404
+
+
+def test_create_and_delete_session(auth_client):
+    """Sessions can be created and deleted by their owner."""
+    resp = auth_client.post("/api/v1/query/sessions")
+    assert resp.status_code == 201
+    session_id = resp.json()["session_id"]
+
+    assert auth_client.delete(f"/api/v1/query/sessions/{session_id}").status_code == 204
+    assert auth_client.delete(f"/api/v1/query/sessions/{session_id}").status_code == 404
+
+
+def test_query_unknown_session(auth_client):
+    """Returns 404 when the session does not exist."""
+    resp = auth_client.post("/api/v1/query/", json={"query": "What is this?", "session_id": "missing"})
+    assert resp.status_code == 404
+
+
+def test_query_shed_when_queue_full(auth_client, monkeypatch):
+    """Returns 503 with Retry-After when admission control sheds the request."""
+    from app.core.admission import AdmissionController
+    controller = AdmissionController(max_in_flight=0, max_queue=0, queue_timeout=1, retry_after=7)
+    monkeypatch.setattr("app.core.admission._controller", controller)
+
+    resp = auth_client.post("/api/v1/query/", json={"query": "What is this?"})
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "7"
+    assert controller.rejected["queue_full"] == 1
+
+
+def test_query_debug_requires_admin(auth_client):
+    """Debug timings are limited to the owner and admins."""
+    resp = auth_client.post("/api/v1/query/", json={"query": "What is this?", "debug": True})
+    assert resp.status_code == 403
+
+
+def test_query_debug_returns_timings(auth_client, monkeypatch):
+    """Owner debug requests get a span tree with stage timings and counts."""
+    from app.core import metrics, tracing
+
+    class FakeService:
+        has_cached_response = staticmethod(lambda *args, **kwargs: False)
+
+        async def answer(self, query, **kwargs):
+            with metrics.time_stage("retrieval"):
+                tracing.count("retrieved", 3)
+            return {"answer": "ok", "contexts": [], "sources": []}
+
+    monkeypatch.setattr("app.core.auth.settings.OWNER_EMAIL", "authclient@example.com")
+    monkeypatch.setattr("app.api.v1.endpoints.query.AdvancedRAGService", FakeService)
+
+    resp = auth_client.post("/api/v1/query/", json={"query": "What is this?", "debug": True})
+
+    assert resp.status_code == 200
+    timings = resp.json()["timings"]
+    assert timings["spans"]["name"] == "request"
+    assert [span["name"] for span in timings["spans"]["children"]] == ["retrieval"]
+    assert timings["counts"] == {"retrieved": 3}
+
+
+def test_stream_records_revised_answer_in_session(auth_client, monkeypatch):
+    """A revision sent after "done" replaces the answer stored in the session."""
+    from app.models.chat_session import ChatSession
+
+    class FakeService:
+        has_cached_response = staticmethod(lambda *args, **kwargs: False)
+
+        async def answer_stream(self, query, **kwargs):
+            yield ("token", {"content": "Draft answer."})
+            yield ("done", {"reflection_id": "r1"})
+            yield ("token", {"content": "", "replace": True})
+            yield ("token", {"content": "Revised answer."})
+
+    monkeypatch.setattr("app.api.v1.endpoints.query.AdvancedRAGService", FakeService)
+    session_id = auth_client.post("/api/v1/query/sessions").json()["session_id"]
+
+    resp = auth_client.post("/api/v1/query/stream", json={"query": "What is this?", "session_id": session_id})
+
+    assert resp.status_code == 200
+    messages = ChatSession.get_messages(session_id)
+    assert [m["content"] for m in messages] == ["What is this?", "Revised answer."]
+
+
+def test_stream_releases_slot_at_done(auth_client, monkeypatch):
+    """The admission slot is freed once "done" is sent, not after the deferred verdict."""
+    from app.core import admission
+
+    in_flight = []
+
+    class FakeService:
+        has_cached_response = staticmethod(lambda *args, **kwargs: False)
+
+        async def answer_stream(self, query, **kwargs):
+            yield ("token", {"content": "Answer."})
+            in_flight.append(admission.get_controller().snapshot()["in_flight"])
+            yield ("done", {"reflection_id": "r1"})
+            in_flight.append(admission.get_controller().snapshot()["in_flight"])
+            yield ("reflection", {"reflection_id": "r1"})
+
+    monkeypatch.setattr("app.api.v1.endpoints.query.AdvancedRAGService", FakeService)
+
+    resp = auth_client.post("/api/v1/query/stream", json={"query": "What is this?"})
+
+    assert resp.status_code == 200
+    assert in_flight == [1, 0]
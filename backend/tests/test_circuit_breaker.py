@@ -0,0 +1,101 @@
+"""Tests for app.core.circuit_breaker — CircuitBreaker and retry integration."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, get_breaker
+from app.core.retry import retry_sync
+
+
+def _failing():
+    raise ConnectionError("down")
+
+
+def _breaker(**kwargs):
+    defaults = dict(failure_rate_threshold=0.5, window_size=4, min_calls=4, open_seconds=60)
+    return CircuitBreaker("test", **{**defaults, **kwargs})
+
+
+def test_opens_after_failure_rate_threshold():
+    breaker = _breaker()
+    for _ in range(2):
+        breaker.call(lambda: "ok")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(_failing)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_stays_closed_below_min_calls():
+    breaker = _breaker()
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(_failing)
+    assert breaker.state == CLOSED
+
+
+def test_slow_calls_open_the_circuit():
+    breaker = _breaker(slow_call_seconds=0.0, slow_call_rate_threshold=1.0)
+    for _ in range(4):
+        breaker.call(lambda: "ok")
+    assert breaker.state == OPEN
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = _breaker(open_seconds=0.01)
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            breaker.call(_failing)
+    time.sleep(0.02)
+    assert breaker.state == HALF_OPEN
+
+    with pytest.raises(ConnectionError):
+        breaker.call(_failing)
+    assert breaker.state == OPEN
+
+    time.sleep(0.02)
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancellation_is_not_a_failure_and_frees_half_open_slot():
+    breaker = _breaker(open_seconds=0.01)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    for _ in range(4):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(breaker.call_async(slow), 0.01)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["recent_calls"] == 0
+
+    for _ in range(4):
+        with pytest.raises(ConnectionError):
+            breaker.call(_failing)
+    time.sleep(0.02)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(breaker.call_async(slow), 0.01)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()  # the cancelled trial gave its slot back
+
+
+def test_retry_does_not_retry_open_circuit(monkeypatch):
+    breaker = get_breaker("retry-test")
+    monkeypatch.setattr(breaker, "min_calls", 1)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(CircuitOpenError):
+        retry_sync(flaky, max_attempts=3, base_delay=0.01, circuit="retry-test")
+    # First attempt fails and opens the circuit; the retry is rejected without calling
+    assert len(calls) == 1
@@ -66,3 +66,79 @@ def test_snippet_length():
     assert snippet.endswith("...")
     # Snippet length = CONTEXT_SNIPPET_LENGTH + len("...")
     assert len(snippet) == settings.CONTEXT_SNIPPET_LENGTH + 3
+
+
+def _word_counter(text):
+    return len(text.split())
+
+
+def test_token_budget_limits_contexts(monkeypatch):
+    """Chunks beyond the token budget are dropped."""
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 30)
+    asm = ContextAssembler(token_counter=_word_counter)
+    docs = [_make_doc(f"topic{i} " + "word " * 15, doc_id="d1", page=i + 1) for i in range(4)]
+    contexts = asm.assemble(docs)
+    assert 0 < len(contexts) < 4
+    assert sum(_word_counter(c) for c in contexts) <= 30
+
+
+def test_token_budget_prefers_novel_chunks(monkeypatch):
+    """A near-duplicate of a selected chunk loses to a novel lower-ranked one."""
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 30)
+    monkeypatch.setattr(settings, "CONTEXT_MMR_LAMBDA", 0.5)
+    asm = ContextAssembler(token_counter=_word_counter)
+    docs = [
+        _make_doc("alpha beta gamma delta epsilon zeta eta theta"),
+        _make_doc("alpha beta gamma delta epsilon zeta eta iota"),
+        _make_doc("solar panels convert sunlight into electricity"),
+    ]
+    contexts = asm.assemble(docs)
+    assert len(contexts) == 2
+    assert "solar" in contexts[1]
+
+
+def test_token_budget_trims_parent_to_child_window(monkeypatch):
+    """A parent that does not fit is cut to sentences around its child chunk."""
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 40)
+    monkeypatch.setattr(settings, "CONTEXT_TRIM_WINDOW_SENTENCES", 1)
+    parent = " ".join(f"Filler sentence number {i} here." for i in range(20))
+    parent += " The warranty lasts five years. " + " ".join(f"Tail sentence {i}." for i in range(20))
+    docs = [_make_doc("The warranty lasts five years.", parent_text=parent)]
+    asm = ContextAssembler(token_counter=_word_counter)
+    contexts, source_map = asm.assemble_with_citations(docs)
+    assert len(contexts) == 1
+    assert "The warranty lasts five years." in contexts[0]
+    assert "Filler sentence number 0 " not in contexts[0]
+    assert contexts[0].rstrip().endswith("...")
+    assert _word_counter(contexts[0]) <= 40
+
+
+def test_token_budget_zero_disables_packing(monkeypatch):
+    monkeypatch.setattr(settings, "CONTEXT_TOKEN_BUDGET", 0)
+    asm = ContextAssembler(token_counter=_word_counter)
+    docs = [_make_doc("word " * 500 + f"unique{i}", page=i + 1) for i in range(3)]
+    assert len(asm.assemble(docs)) == 3
+
+
+def test_children_of_one_parent_share_a_context():
+    """Sibling chunks emit their parent once, with every child highlighted."""
+    parent = (
+        "Intro sentence about the policy. The warranty lasts five years. "
+        "Some unrelated middle text goes here. Refunds are issued within 30 days. Closing remarks."
+    )
+    docs = [
+        {"id": "c1", "text": "The warranty lasts five years.", "parent_text": parent,
+         "metadata": {"doc_id": "d1", "parent_id": "p1", "page": 1}},
+        {"id": "c2", "text": "Refunds are issued within 30 days.", "parent_text": parent,
+         "metadata": {"doc_id": "d1", "parent_id": "p1", "page": 1}},
+        _make_doc("Another chunk", doc_id="d2", page=2),
+    ]
+    asm = ContextAssembler()
+    contexts, source_map = asm.assemble_with_citations(docs, {"d1": "a.pdf", "d2": "b.pdf"})
+
+    assert len(contexts) == 2
+    assert contexts[0].count("Intro sentence") == 1
+    assert ">>> The warranty lasts five years. <<<" in contexts[0]
+    assert ">>> Refunds are issued within 30 days. <<<" in contexts[0]
+    assert [e["chunk_id"] for e in source_map[0]["excerpts"]] == ["c1", "c2"]
+    assert source_map[1]["index"] == 2
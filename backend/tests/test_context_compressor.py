@@ -0,0 +1,86 @@
+"""Tests for app.services.context_compressor — ContextCompressor."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.cache_utils import TTLCache
+from app.services.context_compressor import ContextCompressor
+
+VOCAB = ["warranty", "refund", "shipping", "privacy"]
+
+
+def _embed(texts):
+    """Bag-of-keywords vectors so similarity is predictable."""
+    return [[float(word in t.lower()) for word in VOCAB] + [0.1] for t in texts]
+
+
+@pytest.fixture(autouse=True)
+def compression_settings(monkeypatch):
+    monkeypatch.setattr("app.services.context_compressor.settings.CONTEXT_COMPRESSION_ENABLED", True)
+    monkeypatch.setattr("app.services.context_compressor.settings.CONTEXT_COMPRESSION_MIN_CHARS", 50)
+    monkeypatch.setattr("app.services.context_compressor.settings.CONTEXT_COMPRESSION_TOP_SENTENCES", 1)
+    monkeypatch.setattr("app.services.context_compressor.settings.CONTEXT_COMPRESSION_NEIGHBORS", 0)
+    monkeypatch.setattr(ContextCompressor, "_sentence_cache", TTLCache(max_size=100, ttl_seconds=60))
+
+
+@pytest.fixture()
+def embeddings():
+    mock = MagicMock()
+    mock.embed_documents.side_effect = _embed
+    return mock
+
+
+PARENT = (
+    "Shipping takes three days. The warranty covers parts for two years. "
+    "Our privacy policy is strict. Refunds need a receipt. Shipping is free over $50."
+)
+
+
+def _doc(text="chunk", parent_text=PARENT, page=4):
+    return {"text": text, "parent_text": parent_text, "metadata": {"doc_id": "d1", "page": page}}
+
+
+@pytest.mark.asyncio
+async def test_compress_keeps_relevant_sentences(embeddings):
+    compressor = ContextCompressor(embeddings=embeddings)
+    result = await compressor.compress("How long is the warranty?", [_doc()])
+
+    parent = result[0]["parent_text"]
+    assert "The warranty covers parts for two years." in parent
+    assert "privacy" not in parent
+    assert parent.startswith("...") and parent.endswith("...")
+    # Citations still point at the original page
+    assert result[0]["metadata"]["page"] == 4
+
+
+@pytest.mark.asyncio
+async def test_compress_pins_child_sentences(embeddings):
+    compressor = ContextCompressor(embeddings=embeddings)
+    result = await compressor.compress(
+        "How long is the warranty?", [_doc(text="Our privacy policy is strict.")]
+    )
+    parent = result[0]["parent_text"]
+    assert "warranty" in parent
+    assert "Our privacy policy is strict." in parent
+
+
+@pytest.mark.asyncio
+async def test_sentence_embeddings_are_cached(embeddings):
+    compressor = ContextCompressor(embeddings=embeddings)
+    await compressor.compress("warranty length", [_doc()])
+    await compressor.compress("refund rules", [_doc()])
+
+    second_batch = embeddings.embed_documents.call_args_list[1].args[0]
+    assert second_batch == ["refund rules"]
+
+
+@pytest.mark.asyncio
+async def test_compress_disabled_or_failing_returns_input(embeddings, monkeypatch):
+    docs = [_doc()]
+    embeddings.embed_documents.side_effect = RuntimeError("boom")
+    compressor = ContextCompressor(embeddings=embeddings)
+    assert await compressor.compress("warranty", docs) == docs
+
+    monkeypatch.setattr("app.services.context_compressor.settings.CONTEXT_COMPRESSION_ENABLED", False)
+    assert await compressor.compress("warranty", docs) is docs
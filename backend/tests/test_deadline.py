@@ -0,0 +1,64 @@
+"""Tests for app.core.deadline — per-request deadline propagation."""
+
+import asyncio
+
+import pytest
+
+from app.core import deadline
+
+
+@pytest.fixture(autouse=True)
+def reset_deadline():
+    deadline.clear()
+    yield
+    deadline.clear()
+
+
+def test_parse_timeout():
+    assert deadline.parse_timeout("2.5") == 2.5
+    assert deadline.parse_timeout(None) is None
+    assert deadline.parse_timeout("soon") is None
+    assert deadline.parse_timeout("-1") is None
+
+
+def test_start_caps_client_timeout(monkeypatch):
+    monkeypatch.setattr(deadline.settings, "REQUEST_DEADLINE_MAX_SECONDS", 5.0)
+    deadline.start(60.0)
+    assert 4.0 < deadline.remaining() <= 5.0
+
+
+@pytest.mark.asyncio
+async def test_run_stage_without_deadline_is_unbounded():
+    async def work():
+        return "done"
+
+    assert deadline.remaining() is None
+    assert await deadline.run_stage("graph", work, budget=0.0, fallback="skipped") == "done"
+
+
+@pytest.mark.asyncio
+async def test_run_stage_times_out_to_fallback():
+    deadline.start(5.0)
+
+    async def slow():
+        await asyncio.sleep(1.0)
+        return "done"
+
+    assert await deadline.run_stage("judge", slow, budget=0.05, fallback=None) is None
+    assert deadline.degraded_stages() == ["judge"]
+
+
+@pytest.mark.asyncio
+async def test_run_stage_skips_when_reserve_exhausted():
+    deadline.start(1.0)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return "done"
+
+    result = await deadline.run_stage("rerank", work, budget=1.0, fallback="skipped", reserve=5.0)
+
+    assert result == "skipped"
+    assert calls == []
+    assert deadline.degraded_stages() == ["rerank"]
@@ -57,3 +57,32 @@ def test_delete_document(tmp_db):
     assert Document.get_by_id(doc_id, user["user_id"]) is None
     # Deleting again returns False
     assert Document.delete(doc_id, user["user_id"]) is False
+
+
+def test_corpus_version_changes_with_documents(tmp_db):
+    """Corpus version changes when the user's document set changes."""
+    user = _make_user(tmp_db)
+    empty_version = Document.get_corpus_version(user["user_id"])
+    doc_id = str(uuid.uuid4())
+    Document.create(doc_id=doc_id, user_id=user["user_id"], filename="a.pdf", pages=1)
+    added_version = Document.get_corpus_version(user["user_id"])
+    assert added_version != empty_version
+    assert Document.get_corpus_version(user["user_id"]) == added_version
+
+    Document.delete(doc_id, user["user_id"])
+    assert Document.get_corpus_version(user["user_id"]) == empty_version
+
+
+def test_get_summaries(tmp_db):
+    """Stored summaries are returned per document, optionally filtered by doc_ids."""
+    user = _make_user(tmp_db)
+    doc_a, doc_b = str(uuid.uuid4()), str(uuid.uuid4())
+    Document.create(doc_id=doc_a, user_id=user["user_id"], filename="a.pdf", pages=1, summary="About A.")
+    Document.create(doc_id=doc_b, user_id=user["user_id"], filename="b.pdf", pages=1)
+
+    summaries = {s["doc_id"]: s for s in Document.get_summaries(user["user_id"])}
+    assert summaries[doc_a]["summary"] == "About A."
+    assert summaries[doc_b]["summary"] == ""
+
+    only_a = Document.get_summaries(user["user_id"], [doc_a])
+    assert [s["filename"] for s in only_a] == ["a.pdf"]
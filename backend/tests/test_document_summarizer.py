@@ -0,0 +1,81 @@
+"""Tests for app.services.document_summarizer — map-reduce with a mock LLM client."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from tests.conftest import mock_llm_response
+from app.services.document_summarizer import DocumentSummarizer
+
+
+@pytest.fixture()
+def summarizer(monkeypatch):
+    monkeypatch.setattr("app.services.document_summarizer.settings.ENABLE_DOCUMENT_SUMMARIES", True)
+    monkeypatch.setattr("app.services.document_summarizer.settings.DOCUMENT_SUMMARY_SECTION_MAX_CHARS", 100)
+    monkeypatch.setattr("app.services.document_summarizer.settings.DOCUMENT_SUMMARY_MAX_SECTIONS", 3)
+    s = DocumentSummarizer()
+    s.client = MagicMock()
+    s.client.ainvoke = AsyncMock()
+    return s
+
+
+def test_group_sections_packs_and_samples(summarizer):
+    texts = [f"chunk {i} " + "x" * 60 for i in range(10)]
+    sections = DocumentSummarizer._group_sections(texts)
+    assert len(sections) == 3
+    assert sections[0].startswith("chunk 0")
+
+
+@pytest.mark.asyncio
+async def test_single_section_skips_reduce(summarizer):
+    summarizer.client.ainvoke.return_value = mock_llm_response("Short summary.")
+    assert await summarizer.summarize(["A short document."]) == "Short summary."
+    summarizer.client.ainvoke.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_map_then_reduce(summarizer):
+    summarizer.client.ainvoke.side_effect = [
+        mock_llm_response("Part one."),
+        mock_llm_response("Part two."),
+        mock_llm_response("Whole document."),
+    ]
+    result = await summarizer.summarize(["a" * 80, "b" * 80], filename="doc.pdf")
+    assert result == "Whole document."
+    reduce_prompt = summarizer.client.ainvoke.call_args.args[0][1].content
+    assert "doc.pdf" in reduce_prompt
+    assert "Part one." in reduce_prompt and "Part two." in reduce_prompt
+
+
+@pytest.mark.asyncio
+async def test_failure_returns_empty(summarizer):
+    summarizer.client.ainvoke.side_effect = RuntimeError("API error")
+    assert await summarizer.summarize(["Some text."]) == ""
+
+
+@pytest.mark.asyncio
+async def test_ingestion_passes_filename_to_summarizer():
+    from types import SimpleNamespace
+    from app.services.multimodal_processor import MultimodalProcessor
+
+    chunking = MagicMock()
+    chunking.process_document_pages.return_value = ([SimpleNamespace(text="Revenue grew.")], [])
+    chunking.prepare_for_pinecone.return_value = {"child_data": []}
+    summarizer = MagicMock()
+    summarizer.summarize = AsyncMock(return_value="Summary.")
+    processor = MultimodalProcessor(
+        **{name: MagicMock() for name in (
+            "pinecone_store", "storage_service", "image_extractor", "table_extractor", "docx_extractor",
+            "excel_extractor", "pptx_extractor", "txt_extractor", "ocr_service", "graph_builder",
+        )},
+        chunking_service=chunking,
+        document_summarizer=summarizer,
+    )
+    processor._index_text_chunks = AsyncMock(return_value=0)
+
+    stats = await processor._chunk_index_and_graph(
+        [{"page_num": 1, "text": "Revenue grew."}], "doc-1", user_id="u1", filename="report.pdf"
+    )
+
+    summarizer.summarize.assert_awaited_once_with(["Revenue grew."], filename="report.pdf")
+    assert stats["summary"] == "Summary."
@@ -0,0 +1,117 @@
+"""Tests for app.core.health — cached background probes, /health, /livez and /readyz."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core import health, metrics
+from app.core.health import HealthProber
+
+
+def _probes(**outcomes):
+    """Probes returning details or raising, counting their calls."""
+    calls = {name: 0 for name in outcomes}
+
+    def make(name, outcome):
+        def probe():
+            calls[name] += 1
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return probe
+
+    return {name: make(name, outcome) for name, outcome in outcomes.items()}, calls
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_cached_between_refreshes():
+    probes, calls = _probes(pinecone={"total_vectors": 7}, openai=None)
+    prober = HealthProber(probes, interval=60, timeout=1)
+
+    first = await prober.snapshot()
+    await prober.snapshot()
+
+    assert calls == {"pinecone": 1, "openai": 1}
+    assert first["dependencies"]["pinecone"]["status"] == "ok"
+    assert first["dependencies"]["pinecone"]["total_vectors"] == 7
+    assert "latency_ms" in first["dependencies"]["openai"]
+    assert first["checked_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_background_task_refreshes_and_snapshot_never_probes():
+    probes, calls = _probes(openai=None)
+    prober = HealthProber(probes, interval=0.02, timeout=1)
+    prober.start()
+    try:
+        await asyncio.sleep(0.1)
+        seen = calls["openai"]
+        await prober.snapshot()
+        assert calls["openai"] == seen
+        assert seen >= 2
+    finally:
+        await prober.stop()
+
+
+@pytest.mark.asyncio
+async def test_failures_and_timeouts_are_reported_and_counted():
+    release = threading.Event()
+    probes, _ = _probes(neo4j=RuntimeError("connection refused"))
+    hung_calls = []
+
+    def hung():
+        hung_calls.append(1)
+        release.wait(2)
+
+    probes["pinecone"] = hung
+    prober = HealthProber(probes, interval=60, timeout=0.05)
+    failures = metrics.HEALTH_PROBE_FAILURES.value(dependency="neo4j")
+
+    try:
+        await prober.refresh()
+        await prober.refresh()  # the hung probe is awaited again, not restarted
+        dependencies = (await prober.snapshot())["dependencies"]
+    finally:
+        release.set()
+
+    assert (dependencies["neo4j"]["status"], dependencies["neo4j"]["detail"]) == ("error", "connection refused")
+    assert "timed out" in dependencies["pinecone"]["detail"]
+    assert len(hung_calls) == 1
+    assert metrics.HEALTH_PROBE_FAILURES.value(dependency="neo4j") == failures + 2
+    assert metrics.HEALTH_PROBE_SECONDS.count(dependency="pinecone") >= 2
+    assert prober.up() == {"neo4j": False, "pinecone": False}
+
+
+@pytest.mark.asyncio
+async def test_readiness_requires_fresh_healthy_required_dependencies():
+    probes, _ = _probes(pinecone=None, neo4j=RuntimeError("down"))
+    prober = HealthProber(probes, interval=60, timeout=1)
+
+    assert prober.readiness(["pinecone"], stale_after=60) == (False, ["dependencies not probed yet"])
+    await prober.refresh()
+    assert prober.readiness(["pinecone"], stale_after=60) == (True, [])
+    assert prober.readiness(["pinecone", "neo4j"], stale_after=60) == (False, ["neo4j: down"])
+    ready, reasons = prober.readiness(["pinecone"], stale_after=-1)
+    assert not ready and "stale" in reasons[0]
+
+
+def test_livez_readyz_and_health(client, monkeypatch):
+    probes, calls = _probes(pinecone={"total_vectors": 3}, neo4j=RuntimeError("down"), openai=None)
+    monkeypatch.setattr(health, "PROBES", probes)
+    monkeypatch.setattr("app.core.health.settings.HEALTH_REQUIRED_DEPENDENCIES", ["pinecone", "openai"])
+
+    assert client.get("/livez").json() == {"status": "ok"}
+    assert calls == {"pinecone": 0, "neo4j": 0, "openai": 0}
+
+    assert client.get("/readyz").json() == {"status": "ready"}
+    body = client.get("/health").json()
+    assert body["status"] == "degraded"
+    assert body["dependencies"]["pinecone"]["total_vectors"] == 3
+    assert calls == {"pinecone": 1, "neo4j": 1, "openai": 1}
+    assert 'docchat_dependency_up{dependency="neo4j"} 0' in client.get("/metrics").text
+
+    monkeypatch.setattr("app.core.health.settings.HEALTH_REQUIRED_DEPENDENCIES", ["neo4j"])
+    resp = client.get("/readyz")
+    assert resp.status_code == 503
+    assert resp.json()["reasons"] == ["neo4j: down"]
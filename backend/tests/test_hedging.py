@@ -0,0 +1,118 @@
+"""Tests for app.core.hedging — hedged reads, latency histograms and the hedge budget."""
+
+import asyncio
+
+import pytest
+
+from app.core import hedging
+from app.core.hedging import HedgeBudget, get_tracker, hedged
+
+
+@pytest.fixture()
+def hedging_on(monkeypatch):
+    monkeypatch.setattr("app.core.hedging.settings.HEDGING_ENABLED", True)
+    monkeypatch.setattr("app.core.hedging.settings.HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr("app.core.hedging.settings.HEDGE_MIN_DELAY_SECONDS", 0.0)
+
+
+def _warm(operation, seconds=0.01, count=3):
+    tracker = get_tracker(operation)
+    for _ in range(count):
+        tracker.observe(seconds)
+
+
+def _calls(*delays):
+    """make_call returning each delay's index, sleeping that long."""
+    started = []
+
+    async def make_call():
+        index = len(started)
+        started.append(index)
+        await asyncio.sleep(delays[index])
+        return index
+
+    return make_call, started
+
+
+@pytest.mark.asyncio
+async def test_disabled_makes_single_call_and_records_latency():
+    make_call, started = _calls(0.0)
+
+    assert await hedged("op", make_call) == 0
+    assert started == [0]
+    assert hedging.snapshot_all()["op"]["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_hedge_wins(hedging_on):
+    _warm("op")
+    make_call, started = _calls(1.0, 0.0)
+
+    assert await hedged("op", make_call) == 1
+    assert started == [0, 1]
+    stats = hedging.snapshot_all()["op"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(hedging_on):
+    _warm("op", seconds=0.5)
+    make_call, started = _calls(0.0, 0.0)
+
+    assert await hedged("op", make_call) == 0
+    assert started == [0]
+
+
+@pytest.mark.asyncio
+async def test_no_hedge_before_min_samples(hedging_on):
+    make_call, started = _calls(0.05, 0.0)
+
+    assert await hedged("op", make_call) == 0
+    assert started == [0]
+
+
+@pytest.mark.asyncio
+async def test_failed_hedge_falls_back_to_primary(hedging_on):
+    _warm("op")
+    calls = []
+
+    async def make_call():
+        calls.append(None)
+        if len(calls) == 2:
+            raise ConnectionError("hedge failed")
+        await asyncio.sleep(0.05)
+        return "primary"
+
+    assert await hedged("op", make_call) == "primary"
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_skips_hedge(hedging_on, monkeypatch):
+    monkeypatch.setattr("app.core.hedging._budget", HedgeBudget(ratio=0.0, burst=0.0))
+    _warm("op")
+    make_call, started = _calls(0.05, 0.0)
+
+    assert await hedged("op", make_call) == 0
+    assert started == [0]
+
+
+def test_budget_caps_hedges_at_ratio():
+    budget = HedgeBudget(ratio=0.25, burst=1.0)
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+
+    for _ in range(4):
+        budget.deposit()
+    assert budget.try_spend() is True
+
+
+def test_histogram_buckets_and_percentile(monkeypatch):
+    monkeypatch.setattr("app.core.hedging.settings.HEDGE_MIN_SAMPLES", 1)
+    tracker = get_tracker("op")
+    for seconds in [0.005, 0.2, 0.3, 20.0]:
+        tracker.observe(seconds)
+
+    buckets = tracker.snapshot()["buckets"]
+    assert buckets["0.01"] == 1 and buckets["0.25"] == 1 and buckets["0.5"] == 1 and buckets["+Inf"] == 1
+    assert tracker.percentile(0.5) == 0.3
@@ -1,12 +1,16 @@
 """Integration tests for AdvancedRAGService — inject all dependencies."""
 
+import asyncio
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from tests.conftest import mock_retrieval_results
+from app.models.chat_session import ChatSession
 from app.services.advanced_rag import AdvancedRAGService
+from app.services.cache_utils import TTLCache
+from app.services.query_planner import QueryPlan
 
 
 @pytest.fixture(autouse=True)
@@ -14,7 +18,9 @@ def disable_caches(monkeypatch):
     """Disable all caching so tests are deterministic."""
     monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_QUERY_RESPONSE_CACHE", False)
     monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_SEMANTIC_QUERY_CACHE", False)
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_RETRIEVAL_CACHE", False)
     monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ENABLED", False)
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENTITY_EXTRACTION_MODE", "llm")
 
 
 @pytest.fixture()
@@ -41,7 +47,14 @@ def mock_deps():
 
 
 @pytest.fixture()
-def service(mock_deps):
+def query_condenser():
+    condenser = MagicMock()
+    condenser.condense.return_value = None  # no rewrite by default
+    return condenser
+
+
+@pytest.fixture()
+def service(mock_deps, query_condenser):
     ret, rer, asm, gen, ee, qr = mock_deps
     return AdvancedRAGService(
         retrieval=ret,
@@ -50,6 +63,7 @@ def service(mock_deps):
         generator=gen,
         entity_extractor=ee,
         query_router=qr,
+        query_condenser=query_condenser,
     )
 
 
@@ -125,6 +139,238 @@ async def test_answer_with_judge_fail_regenerates(service, mock_deps, monkeypatc
     assert result["reflection"]["was_regenerated"] is True
 
 
+def _judge_returning(*verdicts):
+    judge = MagicMock()
+    judge.evaluate.side_effect = list(verdicts)
+    return judge
+
+
+def _verdict(verdict, overall, was_regenerated=False):
+    v = MagicMock()
+    v.verdict = verdict
+    v.overall = overall
+    v.feedback = "Not detailed enough"
+    v.to_dict.side_effect = lambda: {
+        "faithfulness": overall, "relevance": overall, "completeness": overall,
+        "coherence": overall, "conciseness": overall, "overall": overall,
+        "verdict": verdict, "feedback": "", "was_regenerated": v.was_regenerated,
+    }
+    v.was_regenerated = was_regenerated
+    return v
+
+
+@pytest.mark.asyncio
+async def test_async_judge_returns_before_verdict(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC", True)
+    service.answer_judge = _judge_returning(_verdict("pass", 0.9))
+
+    result = await service.answer("What is X?", user_id="u1")
+    assert result["reflection"] is None
+    assert result["entities"] == []
+    reflection_id = result["reflection_id"]
+
+    record = await AdvancedRAGService.wait_for_reflection(reflection_id, timeout=5)
+    assert record["status"] == "complete"
+    assert record["reflection"]["verdict"] == "pass"
+    assert record["entities"] == ["Entity1"]
+    assert AdvancedRAGService.get_reflection(reflection_id, "u1")["status"] == "complete"
+    assert AdvancedRAGService.get_reflection(reflection_id, "someone-else") is None
+
+
+@pytest.mark.asyncio
+async def test_async_judge_regeneration_is_opt_in(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_MAX_RETRIES", 1)
+    ret, rer, asm, gen, ee, qr = mock_deps
+    gen.generate_with_feedback.return_value = "Improved answer."
+
+    service.answer_judge = _judge_returning(_verdict("fail", 0.3))
+    result = await service.answer("What is X?", user_id="u1")
+    record = await AdvancedRAGService.wait_for_reflection(result["reflection_id"], timeout=5)
+    assert record["revised_answer"] is None
+    gen.generate_with_feedback.assert_not_called()
+
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC_REGENERATE", True)
+    service.answer_judge = _judge_returning(_verdict("fail", 0.3), _verdict("pass", 0.9))
+    result = await service.answer("What is Y?", user_id="u1")
+    record = await AdvancedRAGService.wait_for_reflection(result["reflection_id"], timeout=5)
+    assert record["revised_answer"] == "Improved answer."
+    assert record["reflection"]["was_regenerated"] is True
+
+
+@pytest.mark.asyncio
+async def test_async_regeneration_updates_session_message(service, mock_deps, monkeypatch, test_user):
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC_REGENERATE", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_MAX_RETRIES", 1)
+    ret, rer, asm, gen, ee, qr = mock_deps
+    gen.generate_with_feedback.return_value = "Improved answer."
+    service.answer_judge = _judge_returning(_verdict("fail", 0.3), _verdict("pass", 0.9))
+    session = ChatSession.create(test_user["user_id"])
+
+    result = await service.answer("What is X?", user_id="u1")
+    _, message_id = ChatSession.add_messages(session["session_id"], [
+        {"role": "user", "content": "What is X?"},
+        {"role": "assistant", "content": result["answer"]},
+    ])
+    AdvancedRAGService.link_session_message(result["reflection_id"], session["session_id"], message_id)
+    await AdvancedRAGService.wait_for_reflection(result["reflection_id"], timeout=5)
+
+    assert ChatSession.get_messages(session["session_id"])[-1]["content"] == "Improved answer."
+    assert "session_message" not in AdvancedRAGService.get_reflection(result["reflection_id"], "u1")
+
+
+@pytest.mark.asyncio
+async def test_async_judge_stream_sends_verdict_after_done(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ASYNC", True)
+    ret, rer, asm, gen, ee, qr = mock_deps
+
+    async def fake_stream(*args, **kwargs):
+        yield "Streamed answer."
+
+    gen.generate_stream = fake_stream
+    service.answer_judge = _judge_returning(_verdict("pass", 0.9))
+
+    events = [event async for event in service.answer_stream("What is X?", user_id="u1")]
+    names = [name for name, _ in events]
+    done_at = names.index("done")
+    assert "reflection_id" in events[done_at][1]
+    assert names.index("reflection") > done_at
+    assert names.index("entities") > done_at
+
+
+@pytest.mark.asyncio
+async def test_retrieval_cache_reused_across_chat_history(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_RETRIEVAL_CACHE", True)
+    monkeypatch.setattr(AdvancedRAGService, "_retrieval_cache", TTLCache(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr(AdvancedRAGService, "_corpus_version", staticmethod(lambda user_id: "v1"))
+    ret, rer, asm, gen, ee, qr = mock_deps
+
+    await service.answer("What is X?", user_id="u1")
+    history = [{"role": "user", "content": "Earlier question"}]
+    result = await service.answer("what is  x?", user_id="u1", chat_history=history)
+
+    assert result["answer"] == "Generated answer from RAG pipeline."
+    ret.retrieve.assert_called_once()
+    rer.rerank.assert_called_once()
+    assert gen.generate.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_retrieval_cache_invalidated_by_corpus_version(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_RETRIEVAL_CACHE", True)
+    monkeypatch.setattr(AdvancedRAGService, "_retrieval_cache", TTLCache(max_size=10, ttl_seconds=60))
+    versions = iter(["v1", "v2"])
+    monkeypatch.setattr(AdvancedRAGService, "_corpus_version", staticmethod(lambda user_id: next(versions)))
+    ret, rer, asm, gen, ee, qr = mock_deps
+
+    await service.answer("What is X?", user_id="u1")
+    await service.answer("What is X?", user_id="u1")
+
+    assert ret.retrieve.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_follow_up_retrieves_with_standalone_query(service, mock_deps, query_condenser):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    query_condenser.condense.return_value = "What are the side effects of aspirin?"
+    history = [
+        {"role": "user", "content": "What is aspirin?"},
+        {"role": "assistant", "content": "Aspirin is a pain reliever."},
+    ]
+
+    await service.answer("What about its side effects?", user_id="u1", chat_history=history)
+
+    assert ret.retrieve.call_args.args[0] == "What are the side effects of aspirin?"
+    assert rer.rerank.call_args.args[0] == "What are the side effects of aspirin?"
+    # Generation still sees the user's own words plus the conversation
+    assert gen.generate.call_args.args[0] == "What about its side effects?"
+    assert gen.generate.call_args.kwargs["chat_history"] == history
+
+
+@pytest.mark.asyncio
+async def test_query_planner_replaces_router_and_expander(mock_deps, query_condenser):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    planner = MagicMock()
+    planner.plan.return_value = QueryPlan(
+        intent="document_query",
+        expansions=["What is X?", "X definition"],
+        entities=["X"],
+    )
+    service = AdvancedRAGService(
+        retrieval=ret, reranker=rer, assembler=asm, generator=gen,
+        entity_extractor=ee, query_router=qr, query_condenser=query_condenser,
+        query_planner=planner,
+    )
+
+    await service.answer("What is X?", user_id="u1")
+
+    qr.classify.assert_not_called()
+    assert ret.retrieve.call_args.kwargs["expanded_queries"] == ["What is X?", "X definition"]
+    assert ret.retrieve.call_args.kwargs["query_entities"] == ["X"]
+
+
+@pytest.mark.asyncio
+async def test_follow_up_is_condensed_then_planned_once(mock_deps, query_condenser):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    query_condenser.condense.return_value = "What are the side effects of aspirin?"
+    planner = MagicMock()
+    planner.plan.return_value = QueryPlan(intent="document_query", expansions=["aspirin adverse effects"], entities=[])
+    service = AdvancedRAGService(
+        retrieval=ret, reranker=rer, assembler=asm, generator=gen,
+        entity_extractor=ee, query_router=qr, query_condenser=query_condenser,
+        query_planner=planner,
+    )
+    history = [{"role": "user", "content": "What is aspirin?"}]
+
+    await service.answer("What about its side effects?", user_id="u1", chat_history=history)
+
+    query_condenser.condense.assert_called_once()
+    planner.plan.assert_called_once_with("What are the side effects of aspirin?")
+    assert ret.retrieve.call_args.args[0] == "What are the side effects of aspirin?"
+    assert ret.retrieve.call_args.kwargs["expanded_queries"] == ["aspirin adverse effects"]
+
+
+@pytest.mark.asyncio
+async def test_query_planner_failure_falls_back_to_router(mock_deps, query_condenser):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    planner = MagicMock()
+    planner.plan.return_value = None
+    service = AdvancedRAGService(
+        retrieval=ret, reranker=rer, assembler=asm, generator=gen,
+        entity_extractor=ee, query_router=qr, query_condenser=query_condenser,
+        query_planner=planner,
+    )
+
+    await service.answer("What is X?", user_id="u1")
+
+    qr.classify.assert_called_once_with("What is X?")
+    assert "expanded_queries" not in ret.retrieve.call_args.kwargs
+
+
+def test_semantic_cache_allowed_only_without_history(monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_SEMANTIC_QUERY_CACHE", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.SEMANTIC_CACHE_REQUIRE_EMPTY_HISTORY", True)
+    history = [{"role": "user", "content": "What is aspirin?"}]
+    assert AdvancedRAGService._semantic_cache_allowed(history) is False
+    assert AdvancedRAGService._semantic_cache_allowed([]) is True
+
+
+@pytest.mark.asyncio
+async def test_condensed_follow_up_skips_semantic_cache(service, mock_deps, query_condenser, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_SEMANTIC_QUERY_CACHE", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.SEMANTIC_CACHE_REQUIRE_EMPTY_HISTORY", True)
+    query_condenser.condense.return_value = "What are the side effects of aspirin?"
+    ret.pinecone_store = MagicMock()
+    ret.pinecone_store.get_embedding = AsyncMock(return_value=[1.0, 0.0])
+
+    history = [{"role": "user", "content": "What is aspirin?"}]
+    await service.answer("What about its side effects?", user_id="u1", chat_history=history)
+
+    ret.pinecone_store.get_embedding.assert_not_called()
+
+
 def test_normalize_doc_ids():
     assert AdvancedRAGService._normalize_doc_ids(None) is None
     assert AdvancedRAGService._normalize_doc_ids([]) is None
@@ -171,6 +417,15 @@ def test_diversify_by_doc():
     assert AdvancedRAGService._diversify_by_doc([], top_k=5) == []
 
 
+def test_retrieval_scores_skip_graph_entities():
+    docs = [
+        {"score": 0.8, "metadata": {"doc_id": "d1"}},
+        {"score": 0.0, "metadata": {"type": "graph_entity"}},
+        {"score": 0.6, "metadata": {"doc_id": "d2"}},
+    ]
+    assert AdvancedRAGService._retrieval_scores(docs) == [0.8, 0.6]
+
+
 def test_build_doc_names():
     with patch("app.services.advanced_rag.Document") as MockDoc:
         MockDoc.get_by_user.return_value = [
@@ -182,3 +437,215 @@ def test_build_doc_names():
 
     # No user_id
     assert AdvancedRAGService._build_doc_names(None) == {}
+
+
+@pytest.mark.asyncio
+async def test_local_entity_extraction_skips_llm(service, mock_deps, monkeypatch):
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENTITY_EXTRACTION_MODE", "local")
+    ret, rer, asm, gen, ee, qr = mock_deps
+    service.local_entity_extractor = MagicMock()
+    service.local_entity_extractor.extract_entities.return_value = ["Aspirin"]
+
+    result = await service.answer("What is X?", user_id="u1")
+
+    assert result["entities"] == ["Aspirin"]
+    ee.extract_entities.assert_not_called()
+    assert service.local_entity_extractor.extract_entities.call_args.kwargs["user_id"] == "u1"
+
+
+@pytest.mark.asyncio
+async def test_summary_uses_stored_summary_without_retrieval(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", True)
+    monkeypatch.setattr(
+        "app.services.advanced_rag.Document.get_summaries",
+        lambda user_id, doc_ids=None: [{"doc_id": "d1", "filename": "a.pdf", "summary": "A is about X."}],
+    )
+
+    result = await service.answer("Summarize the document", user_id="u1", doc_ids=["d1"])
+
+    assert result["answer"] == "A is about X."
+    assert result["sources"][0]["doc_id"] == "d1"
+    ret.retrieve.assert_not_called()
+    gen.generate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summary_reduces_multiple_stored_summaries(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", True)
+    monkeypatch.setattr(
+        "app.services.advanced_rag.Document.get_summaries",
+        lambda user_id, doc_ids=None: [
+            {"doc_id": "d1", "filename": "a.pdf", "summary": "A is about X."},
+            {"doc_id": "d2", "filename": "b.pdf", "summary": "B is about Y."},
+        ],
+    )
+
+    result = await service.answer("Summarize the documents", user_id="u1", doc_ids=["d1", "d2"])
+
+    ret.retrieve.assert_not_called()
+    gen.generate.assert_called_once()
+    assert len(result["contexts"]) == 2
+    assert result["answer"] == "Generated answer from RAG pipeline."
+
+
+@pytest.mark.asyncio
+async def test_focused_summary_does_not_use_stored_summary(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", True)
+    monkeypatch.setattr("app.services.advanced_rag.settings.SUMMARY_MAP_REDUCE_ENABLED", False)
+    get_summaries = MagicMock(return_value=[{"doc_id": "d1", "filename": "a.pdf", "summary": "A is about X."}])
+    monkeypatch.setattr("app.services.advanced_rag.Document.get_summaries", get_summaries)
+    monkeypatch.setattr(AdvancedRAGService, "_build_doc_names", lambda self, user_id: {})
+
+    result = await service.answer("Summarize the pricing risks in the contract", user_id="u1", doc_ids=["d1"])
+
+    get_summaries.assert_not_called()
+    ret.retrieve.assert_called_once()
+    assert result["answer"] == "Generated answer from RAG pipeline."
+
+
+@pytest.mark.asyncio
+async def test_summary_falls_back_to_retrieval_without_stored_summary(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", True)
+    monkeypatch.setattr(
+        "app.services.advanced_rag.Document.get_summaries",
+        lambda user_id, doc_ids=None: [{"doc_id": "d1", "filename": "a.pdf", "summary": ""}],
+    )
+    monkeypatch.setattr(AdvancedRAGService, "_build_doc_names", lambda self, user_id: {})
+
+    await service.answer("Summarize the document", user_id="u1", doc_ids=["d1"])
+
+    ret.retrieve.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_multi_document_summary_maps_each_document(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", False)
+    monkeypatch.setattr(AdvancedRAGService, "_build_doc_names", lambda self, user_id: {})
+    asm.assemble_with_citations.return_value = (
+        ["[1] Alpha text", "[2] Beta text", "[3] More alpha"],
+        [
+            {"index": 1, "doc_id": "doc-1", "doc_name": "a.pdf", "page": 1, "text": "Alpha text"},
+            {"index": 2, "doc_id": "doc-2", "doc_name": "b.pdf", "page": 1, "text": "Beta text"},
+            {"index": 3, "doc_id": "doc-1", "doc_name": "a.pdf", "page": 2, "text": "More alpha"},
+        ],
+    )
+    gen.generate.side_effect = lambda prompt, contexts, chat_history=None: f"{len(contexts)} contexts."
+    reduce_calls = []
+
+    async def reduce_stream(prompt, contexts, chat_history=None):
+        reduce_calls.append(chat_history)
+        yield "### Connections\n\nShared theme."
+
+    gen.generate_stream = reduce_stream
+    history = [{"role": "user", "content": "Answer in French."}]
+
+    result = await service.answer("Summarize my documents", user_id="u1", chat_history=history, doc_ids=["d1", "d2"])
+
+    # One map call per document, each seeing only its own contexts and the history
+    assert gen.generate.call_count == 2
+    assert sorted(len(call.args[1]) for call in gen.generate.call_args_list) == [1, 2]
+    assert all(call.args[2] for call in gen.generate.call_args_list)
+    assert reduce_calls and reduce_calls[0]
+    assert "### a.pdf\n\n2 contexts." in result["answer"]
+    assert "### b.pdf\n\n1 contexts." in result["answer"]
+    assert result["answer"].endswith("### Connections\n\nShared theme.")
+
+
+@pytest.mark.asyncio
+async def test_map_reduce_summary_groups_by_doc_id_in_document_order(service, mock_deps):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    release_first = asyncio.Event()
+
+    def generate(prompt, contexts, chat_history=None):
+        if "First" in contexts[0]:
+            asyncio.run_coroutine_threadsafe(release_first.wait(), loop).result(2)
+        return contexts[0].split()[1]
+
+    async def reduce_stream(prompt, contexts, chat_history=None):
+        yield "### Connections"
+
+    gen.generate.side_effect = generate
+    gen.generate_stream = reduce_stream
+    loop = asyncio.get_running_loop()
+    source_map = [
+        {"doc_id": "d1", "doc_name": "notes.pdf"},
+        {"doc_id": "d2", "doc_name": "notes.pdf"},
+    ]
+
+    pieces = service._map_reduce_summary(["[1] First", "[2] Second"], source_map, ["d1", "d2"], {})
+    received = []
+    collector = asyncio.create_task(_collect(pieces, received))
+    await asyncio.sleep(0.1)
+    assert received == []  # d2 finished first but waits for d1
+    release_first.set()
+    await collector
+
+    assert received == ["### notes.pdf\n\nFirst\n\n", "### notes.pdf\n\nSecond\n\n", "### Connections"]
+
+
+async def _collect(pieces, received):
+    async for piece in pieces:
+        received.append(piece)
+
+
+@pytest.mark.asyncio
+async def test_multi_document_summary_can_be_disabled(service, mock_deps, monkeypatch):
+    ret, rer, asm, gen, ee, qr = mock_deps
+    qr.classify.return_value = "summary"
+    monkeypatch.setattr("app.services.advanced_rag.settings.ENABLE_DOCUMENT_SUMMARIES", False)
+    monkeypatch.setattr("app.services.advanced_rag.settings.SUMMARY_MAP_REDUCE_ENABLED", False)
+    monkeypatch.setattr(AdvancedRAGService, "_build_doc_names", lambda self, user_id: {})
+    asm.assemble_with_citations.return_value = (
+        ["[1] Alpha text", "[2] Beta text"],
+        [
+            {"index": 1, "doc_name": "a.pdf", "page": 1, "text": "Alpha text"},
+            {"index": 2, "doc_name": "b.pdf", "page": 1, "text": "Beta text"},
+        ],
+    )
+
+    result = await service.answer("Summarize my documents", user_id="u1", doc_ids=["d1", "d2"])
+
+    gen.generate.assert_called_once()
+    assert result["answer"] == "Generated answer from RAG pipeline."
+
+
+@pytest.mark.asyncio
+async def test_deadline_degrades_slow_optional_stages(service, mock_deps, monkeypatch):
+    from app.core import deadline
+
+    ret, rer, asm, gen, ee, qr = mock_deps
+    monkeypatch.setattr("app.services.advanced_rag.settings.DEADLINE_GENERATION_RESERVE_SECONDS", 0.0)
+    monkeypatch.setattr("app.services.advanced_rag.settings.DEADLINE_RERANK_SECONDS", 0.05)
+    monkeypatch.setattr("app.services.advanced_rag.settings.JUDGE_ENABLED", True)
+
+    async def slow_rerank(query, docs, top_k):
+        await asyncio.sleep(1.0)
+        return docs
+
+    rer.rerank.side_effect = slow_rerank
+    judge = MagicMock()
+    service.answer_judge = judge
+    # No time left for judging once reranking has been cut short
+    monkeypatch.setattr("app.services.advanced_rag.settings.DEADLINE_JUDGE_SECONDS", 0.0)
+
+    deadline.start(5.0)
+    try:
+        result = await service.answer("What is X?", user_id="u1")
+        assert result["answer"] == "Generated answer from RAG pipeline."
+        assert result["reflection"] is None
+        judge.evaluate.assert_not_called()
+        assert deadline.degraded_stages() == ["rerank", "judge"]
+        # Reranking fell back to retrieval order
+        assert asm.assemble_with_citations.call_args.args[0][0]["id"] == "chunk-0"
+    finally:
+        deadline.clear()
@@ -8,6 +8,21 @@ from tests.conftest import mock_pinecone_matches
 from app.services.hybrid_retrieval import HybridRetrieval
 
 
+@pytest.fixture(autouse=True)
+def disable_adaptive_expansion(monkeypatch):
+    """Always run every expansion unless a test opts into adaptive mode."""
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.ADAPTIVE_EXPANSION_ENABLED", False)
+
+
+@pytest.fixture()
+def adaptive(monkeypatch):
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.ADAPTIVE_EXPANSION_ENABLED", True)
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.ADAPTIVE_EXPANSION_MIN_TOP_SCORE", 0.5)
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.ADAPTIVE_EXPANSION_MIN_MARGIN", 0.05)
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.ADAPTIVE_EXPANSION_MARGIN_RANK", 5)
+    monkeypatch.setattr("app.services.hybrid_retrieval.settings.EXPANSION_DEDUP_SIMILARITY", 0.95)
+
+
 @pytest.fixture()
 def mock_deps():
     pinecone_store = AsyncMock()
@@ -101,3 +116,144 @@ async def test_retrieve_empty_results(retrieval, mock_deps):
     ps.query_by_text.return_value = []
     results = await retrieval.retrieve("nothing relevant")
     assert results == []
+
+
+@pytest.mark.asyncio
+async def test_retrieve_uses_precomputed_plan(retrieval, mock_deps):
+    ps, gs, qe, ee = mock_deps
+    ps.query_by_text.return_value = []
+    gs.query_related_entities.return_value = [{"label": "Python"}]
+
+    await retrieval.retrieve(
+        "tell me about Python",
+        expanded_queries=["tell me about Python", "Python overview"],
+        query_entities=["Python"],
+    )
+    qe.expand.assert_not_called()
+    ee.extract_entities.assert_not_called()
+    assert ps.query_by_text.call_count == 2
+    gs.query_related_entities.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_skips_expansion_when_confident(retrieval, mock_deps, adaptive):
+    ps, gs, qe, ee = mock_deps
+    ps.query_by_text.return_value = mock_pinecone_matches([
+        {"id": "c1", "score": 0.82, "text": "strong match"},
+        {"id": "c2", "score": 0.41, "text": "weak match"},
+    ])
+
+    results = await retrieval.retrieve("test query")
+    assert [r["id"] for r in results] == ["c1", "c2"]
+    qe.expand.assert_not_called()
+    ps.query_by_text.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_adaptive_expands_when_scores_flat(retrieval, mock_deps, adaptive):
+    ps, gs, qe, ee = mock_deps
+    qe.expand.return_value = ["test query", "variation one", "variation two"]
+    ps.query_by_text.return_value = mock_pinecone_matches([
+        {"id": "c1", "score": 0.45, "text": "weak match one"},
+        {"id": "c2", "score": 0.44, "text": "weak match two"},
+    ])
+    ps.get_embedding.return_value = [1.0, 0.0]
+    ps.get_embeddings_batch.return_value = [[0.0, 1.0], [0.6, 0.8]]
+
+    await retrieval.retrieve("test query")
+    qe.expand.assert_called_once()
+    queried = [c.args[0] for c in ps.query_by_text.call_args_list]
+    assert queried == ["test query", "variation one", "variation two"]
+
+
+@pytest.mark.asyncio
+async def test_adaptive_drops_near_duplicate_expansions(retrieval, mock_deps, adaptive):
+    ps, gs, qe, ee = mock_deps
+    qe.expand.return_value = ["test query", "the test query", "different angle"]
+    ps.query_by_text.return_value = []
+    ps.get_embedding.return_value = [1.0, 0.0]
+    ps.get_embeddings_batch.return_value = [[0.99, 0.01], [0.0, 1.0]]
+
+    await retrieval.retrieve("test query")
+    queried = [c.args[0] for c in ps.query_by_text.call_args_list]
+    assert queried == ["test query", "different angle"]
+    # The query is embedded once and reused; only the expansions are batch-embedded
+    ps.get_embedding.assert_awaited_once_with("test query")
+    ps.get_embeddings_batch.assert_awaited_once_with(["the test query", "different angle"])
+    assert ps.query_by_text.call_args_list[0].kwargs["query_vector"] == [1.0, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_adaptive_expands_only_weak_documents(retrieval, mock_deps, adaptive):
+    ps, gs, qe, ee = mock_deps
+    qe.expand.return_value = ["test query", "variation"]
+    ps.get_embedding.return_value = [1.0, 0.0]
+    ps.get_embeddings_batch.return_value = [[0.0, 1.0]]
+
+    async def per_doc_query(q, top_k, user_id=None, doc_ids=None, query_vector=None):
+        score = 0.9 if doc_ids == ["doc-A"] else 0.2
+        return mock_pinecone_matches([
+            {"id": f"{doc_ids[0]}-{q}", "score": score, "text": "content", "doc_id": doc_ids[0]}
+        ])
+
+    ps.query_by_text.side_effect = per_doc_query
+
+    await retrieval.retrieve("test query", doc_ids=["doc-A", "doc-B"])
+    calls = [(c.args[0], c.kwargs["doc_ids"]) for c in ps.query_by_text.call_args_list]
+    assert ("variation", ["doc-B"]) in calls
+    assert ("variation", ["doc-A"]) not in calls
+
+
+@pytest.mark.asyncio
+async def test_open_circuits_skip_vector_and_graph(retrieval, mock_deps):
+    from app.core.circuit_breaker import NEO4J, PINECONE, get_breaker
+
+    ps, gs, qe, ee = mock_deps
+    get_breaker(PINECONE)._open()
+    get_breaker(NEO4J)._open()
+
+    results = await retrieval.retrieve("test query", user_id="u1")
+
+    assert results == []
+    ps.query_by_text.assert_not_called()
+    gs.query_related_entities.assert_not_called()
+    ee.extract_entities.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_open_chat_circuit_skips_expansion_but_not_vector_search(retrieval, mock_deps):
+    from app.core.circuit_breaker import OPENAI_CHAT, OPENAI_EMBEDDINGS, get_breaker
+
+    ps, gs, qe, ee = mock_deps
+    get_breaker(OPENAI_CHAT)._open()
+
+    await retrieval.retrieve("test query", user_id="u1")
+
+    ps.query_by_text.assert_called()
+    qe.expand.assert_not_called()
+
+    ps.query_by_text.reset_mock()
+    get_breaker(OPENAI_EMBEDDINGS)._open()
+    await retrieval.retrieve("another query", user_id="u1")
+    ps.query_by_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_embeddings_run_off_the_event_loop(monkeypatch):
+    import threading
+
+    from app.models.pinecone_store import PineconeStore
+
+    monkeypatch.setattr("app.models.pinecone_store.settings.ENABLE_EMBEDDING_CACHE", False)
+    threads = []
+
+    def embed_documents(texts):
+        threads.append(threading.get_ident())
+        return [[1.0, 0.0] for _ in texts]
+
+    store = PineconeStore.__new__(PineconeStore)
+    store.embeddings = MagicMock()
+    store.embeddings.embed_documents.side_effect = embed_documents
+
+    assert await store.get_embeddings_batch(["a", "b"]) == [[1.0, 0.0], [1.0, 0.0]]
+    assert threads and threads[0] != threading.get_ident()
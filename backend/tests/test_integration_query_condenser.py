@@ -0,0 +1,56 @@
+"""Integration tests for QueryCondenser — mock LLM client."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.conftest import mock_llm_response
+from app.services.cache_utils import TTLCache
+from app.services.query_condenser import QueryCondenser
+
+
+HISTORY = [
+    {"role": "user", "content": "What is the refund policy?"},
+    {"role": "assistant", "content": "Refunds are accepted within 30 days."},
+]
+
+
+@pytest.fixture()
+def condenser(monkeypatch):
+    monkeypatch.setattr(QueryCondenser, "_cache", TTLCache(max_size=10, ttl_seconds=60))
+    c = QueryCondenser()
+    c.client = MagicMock()
+    return c
+
+
+def test_condense_skips_llm_without_history(condenser):
+    assert condenser.condense("What is the refund policy?") is None
+    assert condenser.condense("What is the refund policy?", chat_history=[]) is None
+    condenser.client.invoke.assert_not_called()
+
+
+def test_condense_rewrites_follow_up(condenser):
+    condenser.client.invoke.return_value = mock_llm_response('"Does the refund policy cover digital goods?"')
+    result = condenser.condense("Does that cover digital goods?", chat_history=HISTORY)
+    assert result == "Does the refund policy cover digital goods?"
+    condenser.client.invoke.assert_called_once()
+
+
+def test_condense_uses_cache(condenser):
+    condenser.client.invoke.return_value = mock_llm_response("Does the refund policy cover digital goods?")
+    condenser.condense("Does that cover digital goods?", chat_history=HISTORY)
+    # Same follow-up with different casing/spacing hits the cache
+    result = condenser.condense("does that cover  digital goods?", chat_history=HISTORY)
+    assert result == "Does the refund policy cover digital goods?"
+    condenser.client.invoke.assert_called_once()
+
+
+def test_condense_returns_none_on_error(condenser):
+    condenser.client.invoke.side_effect = RuntimeError("LLM unavailable")
+    assert condenser.condense("Tell me more", chat_history=HISTORY) is None
+
+
+def test_condense_disabled(condenser, monkeypatch):
+    monkeypatch.setattr("app.services.query_condenser.settings.ENABLE_QUERY_CONDENSATION", False)
+    assert condenser.condense("Tell me more", chat_history=HISTORY) is None
+    condenser.client.invoke.assert_not_called()
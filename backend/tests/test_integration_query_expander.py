@@ -6,11 +6,13 @@ from unittest.mock import MagicMock
 import pytest
 
 from tests.conftest import mock_llm_response
+from app.services.cache_utils import TTLCache
 from app.services.query_expander import QueryExpander
 
 
 @pytest.fixture()
-def expander():
+def expander(monkeypatch):
+    monkeypatch.setattr(QueryExpander, "_cache", TTLCache(max_size=10, ttl_seconds=60))
     e = QueryExpander()
     e.client = MagicMock()
     return e
@@ -43,3 +45,20 @@ def test_expand_malformed_json(expander):
     expander.client.invoke.return_value = mock_llm_response("broken {json")
     result = expander.expand("my query")
     assert result == ["my query"]
+
+
+def test_expand_cached_per_normalized_query(expander):
+    expander.client.invoke.return_value = mock_llm_response(
+        json.dumps({"queries": ["AI definition"]})
+    )
+    first = expander.expand("What is AI")
+    second = expander.expand("  what is   ai ")
+    assert first == ["What is AI", "AI definition"]
+    assert second == ["  what is   ai ", "AI definition"]
+    expander.client.invoke.assert_called_once()
+
+
+def test_expand_failure_not_cached(expander):
+    expander.client.invoke.side_effect = [RuntimeError("timeout"), mock_llm_response(json.dumps({"queries": ["v1"]}))]
+    assert expander.expand("my query") == ["my query"]
+    assert expander.expand("my query") == ["my query", "v1"]
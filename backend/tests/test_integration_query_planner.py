@@ -0,0 +1,94 @@
+"""Integration tests for QueryPlanner — mock LLM client."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.conftest import mock_llm_response
+from app.services.cache_utils import TTLCache
+from app.services.query_planner import QueryPlanner
+
+
+@pytest.fixture()
+def planner(monkeypatch):
+    monkeypatch.setattr(QueryPlanner, "_cache", TTLCache(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr("app.services.query_planner.settings.QUERY_ROUTER_FAST_PATH_ENABLED", True)
+    p = QueryPlanner()
+    p.client = MagicMock()
+    return p
+
+
+def test_plan_document_query(planner):
+    planner.client.invoke.return_value = mock_llm_response(json.dumps({
+        "intent": "document_query",
+        "queries": ["aspirin adverse effects", "aspirin risks"],
+        "entities": ["aspirin"],
+    }))
+    plan = planner.plan("What are the side effects of aspirin?")
+    assert plan.intent == "document_query"
+    assert plan.expansions == [
+        "What are the side effects of aspirin?",
+        "aspirin adverse effects",
+        "aspirin risks",
+    ]
+    assert plan.entities == ["aspirin"]
+
+
+def test_plan_caps_expansions(planner, monkeypatch):
+    monkeypatch.setattr("app.services.query_planner.settings.QUERY_PLANNER_MAX_EXPANSIONS", 1)
+    planner.client.invoke.return_value = mock_llm_response(json.dumps({
+        "intent": "document_query", "queries": ["a", "b", "c"], "entities": [],
+    }))
+    plan = planner.plan("Explain the pricing model")
+    assert plan.expansions == ["Explain the pricing model", "a"]
+
+
+def test_plan_invalid_intent_defaults_to_document_query(planner):
+    planner.client.invoke.return_value = mock_llm_response(json.dumps({"intent": "weather"}))
+    plan = planner.plan("Tell me about the forecast section")
+    assert plan.intent == "document_query"
+    assert plan.expansions == ["Tell me about the forecast section"]
+
+
+def test_plan_fast_path_skips_llm(planner):
+    plan = planner.plan("Hello!")
+    assert plan.intent == "greeting"
+    assert plan.expansions == []
+    planner.client.invoke.assert_not_called()
+
+
+def test_plan_uses_cache(planner):
+    planner.client.invoke.return_value = mock_llm_response(json.dumps({
+        "intent": "document_query", "queries": ["x"], "entities": ["Y"],
+    }))
+    first = planner.plan("What does Y do?")
+    second = planner.plan("what does   y do?")
+    assert second.intent == first.intent
+    assert second.entities == ["Y"]
+    planner.client.invoke.assert_called_once()
+
+
+def test_plan_failure_returns_none(planner):
+    planner.client.invoke.side_effect = Exception("API error")
+    assert planner.plan("What is the budget?") is None
+
+
+def test_plan_malformed_json_returns_none(planner):
+    planner.client.invoke.return_value = mock_llm_response("not json")
+    assert planner.plan("What is the budget?") is None
+
+
+def test_plan_non_object_response_returns_none(planner):
+    planner.client.invoke.return_value = mock_llm_response(json.dumps(["x"]))
+    assert planner.plan("What about aspirin?") is None
+    assert QueryPlanner._cache.get("what about aspirin?") is None
+
+
+def test_plan_ignores_wrong_typed_fields(planner):
+    planner.client.invoke.return_value = mock_llm_response(json.dumps({
+        "intent": "document_query", "queries": "aspirin risks", "entities": None,
+    }))
+    plan = planner.plan("What about aspirin?")
+    assert plan.expansions == ["What about aspirin?"]
+    assert plan.entities == []
@@ -6,11 +6,29 @@ from unittest.mock import MagicMock
 import pytest
 
 from tests.conftest import mock_llm_response
+from app.services.cache_utils import TTLCache
 from app.services.query_router import QueryRouter
 
 
+@pytest.fixture(autouse=True)
+def fresh_router_state(monkeypatch):
+    """Isolate the class-level intent cache and routing counters per test."""
+    monkeypatch.setattr(QueryRouter, "_intent_cache", TTLCache(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr(QueryRouter, "_stats", {"total": 0, "rules": 0, "cache": 0, "llm": 0})
+
+
+@pytest.fixture()
+def router(monkeypatch):
+    """Router with the rule-based fast path disabled, so every query hits the LLM."""
+    monkeypatch.setattr("app.services.query_router.settings.QUERY_ROUTER_FAST_PATH_ENABLED", False)
+    r = QueryRouter()
+    r.client = MagicMock()
+    return r
+
+
 @pytest.fixture()
-def router():
+def fast_router(monkeypatch):
+    monkeypatch.setattr("app.services.query_router.settings.QUERY_ROUTER_FAST_PATH_ENABLED", True)
     r = QueryRouter()
     r.client = MagicMock()
     return r
@@ -42,3 +60,49 @@ def test_generate_casual_response(router):
     result = router.generate_casual_response("Hi there")
     assert result == "Hello! How can I help you today?"
     router.client.invoke.assert_called_once()
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("Hi", "greeting"),
+    ("Hello, how are you?", "greeting"),
+    ("Thanks!", "chitchat"),
+    ("Summarize the document", "summary"),
+    ("What is this document about?", "summary"),
+    ("What are the main topics?", "summary"),
+])
+def test_fast_path_settles_obvious_intents_locally(fast_router, query, intent):
+    assert fast_router.classify(query) == intent
+    fast_router.client.invoke.assert_not_called()
+
+
+@pytest.mark.parametrize("query", [
+    "What are the side effects?",
+    "Summarize page 5",
+    "Tell me about aspirin",
+])
+def test_fast_path_defers_ambiguous_queries_to_llm(fast_router, query):
+    fast_router.client.invoke.return_value = mock_llm_response(json.dumps({"intent": "document_query"}))
+    assert fast_router.classify(query) == "document_query"
+    fast_router.client.invoke.assert_called_once()
+
+
+def test_intent_cache_avoids_repeat_llm_calls(router):
+    router.client.invoke.return_value = mock_llm_response(json.dumps({"intent": "document_query"}))
+    router.classify("What are the side effects?")
+    assert router.classify("what are the  side effects?") == "document_query"
+    router.client.invoke.assert_called_once()
+
+
+def test_routing_stats_report_local_share(fast_router):
+    fast_router.client.invoke.return_value = mock_llm_response(json.dumps({"intent": "document_query"}))
+    fast_router.classify("Hi")
+    fast_router.classify("What are the side effects?")
+    fast_router.classify("What are the side effects?")
+    fast_router.classify("Thanks")
+
+    stats = QueryRouter.routing_stats()
+    assert stats["total"] == 4
+    assert stats["rules"] == 2
+    assert stats["cache"] == 1
+    assert stats["llm"] == 1
+    assert stats["local_ratio"] == 0.75
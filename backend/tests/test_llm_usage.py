@@ -0,0 +1,147 @@
+"""Tests for LLM usage accounting (app.core.usage) and the usage ledger (LLMUsage)."""
+
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+from app.core import metrics, usage
+from app.core.usage import RequestUsage, UsageCallbackHandler
+from app.models.database import get_db
+from app.models.llm_usage import LLMUsage
+
+
+def _result(text, token_usage=None):
+    return LLMResult(
+        generations=[[ChatGeneration(message=AIMessage(content=text))]],
+        llm_output={"token_usage": token_usage} if token_usage else None,
+    )
+
+
+def _complete(handler, prompt, result):
+    run_id = uuid4()
+    handler.on_chat_model_start({}, [[HumanMessage(content=prompt)]], run_id=run_id)
+    handler.on_llm_end(result, run_id=run_id)
+
+
+# ---------------------------------------------------------------------------
+# Request accounting
+# ---------------------------------------------------------------------------
+
+
+def test_callback_uses_reported_token_usage():
+    handler = UsageCallbackHandler("generation")
+    request = usage.start()
+
+    _complete(handler, "question", _result("answer", {"prompt_tokens": 120, "completion_tokens": 30}))
+
+    assert usage.finish() is request
+    data = request.to_dict()
+    assert (data["llm_calls"], data["prompt_tokens"], data["completion_tokens"]) == (1, 120, 30)
+    assert data["operations"]["generation"]["prompt_tokens"] == 120
+
+
+def test_callback_counts_tokens_when_usage_missing():
+    """Streamed completions report no usage, so tokens are counted from the text."""
+    handler = UsageCallbackHandler("generation")
+    request = usage.start()
+
+    _complete(handler, "what is in the report " * 10, _result("the report covers revenue"))
+
+    usage.finish()
+    assert request.totals["prompt_tokens"] > 0
+    assert request.totals["completion_tokens"] > 0
+
+
+def test_usage_is_split_by_operation_and_ignored_outside_requests():
+    before = metrics.LLM_CALLS.value(operation="rerank")
+    usage.record_embedding("rerank", 50)  # no request started: metrics only
+
+    request = usage.start()
+    usage.record_llm("query_router", 40, 5)
+    usage.record_embedding("embed_query", 8)
+    usage.record_embedding("embed_query", 12)
+    usage.finish()
+
+    data = request.to_dict()
+    assert data["total_tokens"] == 65
+    assert data["operations"]["embed_query"] == {
+        "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "embedding_calls": 2, "embedding_tokens": 20,
+    }
+    assert metrics.LLM_CALLS.value(operation="rerank") == before + 1
+
+
+# ---------------------------------------------------------------------------
+# Ledger
+# ---------------------------------------------------------------------------
+
+
+def _usage(prompt=100, completion=20, embedding=10):
+    request = RequestUsage()
+    request.add("generation", llm_calls=1, prompt_tokens=prompt, completion_tokens=completion)
+    request.add("embed_query", embedding_calls=1, embedding_tokens=embedding)
+    return request
+
+
+def test_ledger_aggregates_daily_totals_incrementally(tmp_db):
+    LLMUsage.record("user-1", "query", _usage())
+    LLMUsage.record("user-1", "reflection", _usage(prompt=50, completion=10, embedding=0))
+    LLMUsage.record("user-2", "query", _usage())
+    LLMUsage.record("user-1", "query", RequestUsage())  # cache hit: nothing recorded
+
+    assert LLMUsage.tokens_today("user-1") == 190
+    [today] = LLMUsage.get_daily("user-1")
+    assert (today["requests"], today["llm_calls"], today["total_tokens"]) == (2, 2, 190)
+
+    requests = LLMUsage.get_requests("user-1")
+    assert [r["kind"] for r in requests] == ["reflection", "query"]
+    assert requests[1]["operations"]["embed_query"]["embedding_tokens"] == 10
+
+    totals = LLMUsage.get_totals()
+    assert [t["user_id"] for t in totals] == ["user-1", "user-2"]
+    conn = get_db()
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM llm_usage_daily").fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def test_tokens_today_is_zero_without_usage(tmp_db):
+    assert LLMUsage.tokens_today("nobody") == 0
+
+
+# ---------------------------------------------------------------------------
+# API
+# ---------------------------------------------------------------------------
+
+
+def test_query_blocked_at_daily_token_budget(auth_client, monkeypatch):
+    from app.core import config as config_mod
+
+    monkeypatch.setattr(config_mod.settings, "MAX_TOKENS_PER_DAY", 100)
+    monkeypatch.setattr(config_mod.settings, "OWNER_EMAIL", "")
+    LLMUsage.record(auth_client._test_user["user_id"], "query", _usage())
+
+    resp = auth_client.post("/api/v1/query/", json={"query": "test question"})
+    assert resp.status_code == 429
+    assert "Daily token budget" in resp.json()["detail"]
+
+
+def test_usage_endpoints(auth_client):
+    user_id = auth_client._test_user["user_id"]
+    LLMUsage.record(user_id, "query", _usage())
+
+    mine = auth_client.get("/api/v1/usage/me")
+    assert mine.status_code == 200
+    assert mine.json()[0]["total_tokens"] == 130
+    assert auth_client.get("/api/v1/usage/").status_code == 403
+
+    conn = get_db()
+    conn.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", (user_id,))
+    conn.commit()
+    conn.close()
+
+    totals = auth_client.get("/api/v1/usage/")
+    assert totals.json()[0]["user_id"] == user_id
+    detail = auth_client.get(f"/api/v1/usage/{user_id}").json()
+    assert detail["requests"][0]["kind"] == "query"
@@ -0,0 +1,58 @@
+"""Tests for app.services.local_entity_extractor — automaton and per-user rebuilds."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.cache_utils import TTLCache
+from app.services.local_entity_extractor import AhoCorasick, LocalEntityExtractor
+
+
+@pytest.fixture()
+def graph_store():
+    store = MagicMock()
+    store.get_entity_names.return_value = ["OpenAI", "GPT", "New York", "New York City", "Aspirin"]
+    return store
+
+
+@pytest.fixture()
+def extractor(graph_store, monkeypatch):
+    monkeypatch.setattr(LocalEntityExtractor, "_automata", TTLCache(max_size=10, ttl_seconds=60))
+    monkeypatch.setattr(LocalEntityExtractor, "_graph_version", staticmethod(lambda user_id: "v1"))
+    return LocalEntityExtractor(graph_store=graph_store)
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    found = {(start, end, automaton.patterns[i]) for start, end, i in automaton.find("ushers")}
+    assert found == {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")}
+
+
+def test_extract_matches_known_entities_in_order(extractor):
+    text = "Aspirin was studied in new york city with tools from OpenAI."
+    assert extractor.extract_entities(text, user_id="u1") == ["Aspirin", "New York City", "OpenAI"]
+
+
+def test_extract_requires_whole_words(extractor):
+    assert extractor.extract_entities("The GPTs and openairways are unrelated.", user_id="u1") == []
+
+
+def test_extract_without_user_returns_empty(extractor, graph_store):
+    assert extractor.extract_entities("OpenAI", user_id=None) == []
+    graph_store.get_entity_names.assert_not_called()
+
+
+def test_automaton_cached_until_graph_changes(extractor, graph_store, monkeypatch):
+    extractor.extract_entities("OpenAI", user_id="u1")
+    extractor.extract_entities("GPT", user_id="u1")
+    graph_store.get_entity_names.assert_called_once()
+
+    graph_store.get_entity_names.return_value = ["Anthropic"]
+    monkeypatch.setattr(LocalEntityExtractor, "_graph_version", staticmethod(lambda user_id: "v2"))
+    assert extractor.extract_entities("OpenAI and Anthropic", user_id="u1") == ["Anthropic"]
+    assert graph_store.get_entity_names.call_count == 2
+
+
+def test_graph_unavailable_returns_empty(extractor, graph_store):
+    graph_store.get_entity_names.side_effect = RuntimeError("neo4j down")
+    assert extractor.extract_entities("OpenAI", user_id="u1") == []
@@ -0,0 +1,108 @@
+"""Tests for app.core.loop_monitor — loop lag and blocking-call detection."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core import loop_monitor, metrics
+from app.core.loop_monitor import LoopMonitor
+
+
+def blocking_call(seconds):
+    time.sleep(seconds)
+
+
+async def _run(monitor, blocks=()):
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        for seconds in blocks:
+            blocking_call(seconds)
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+    return monitor.report(stacks=True)
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_records_no_stalls():
+    report = await _run(LoopMonitor(interval=0.01, threshold=0.1, max_sites=10))
+
+    assert report["stalls"] == 0
+    assert report["offenders"] == []
+    assert report["lag_seconds"] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_stacks_are_only_reported_on_request():
+    monitor = LoopMonitor(interval=0.01, threshold=0.03, max_sites=10)
+    await _run(monitor, blocks=[0.2])
+
+    [public] = monitor.report()["offenders"]
+    assert set(public) == {"site", "count", "total_seconds", "max_seconds"}
+    [detailed] = monitor.report(stacks=True)["offenders"]
+    assert any("blocking_call" in line for line in detailed["stack"])
+
+
+def test_event_loop_endpoint_is_admin_only(auth_client):
+    from app.models.database import get_db
+
+    assert auth_client.get("/api/v1/profiles/event-loop").status_code == 403
+
+    conn = get_db()
+    conn.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", (auth_client._test_user["user_id"],))
+    conn.commit()
+    conn.close()
+    resp = auth_client.get("/api/v1/profiles/event-loop")
+    assert resp.status_code == 200
+    assert "offenders" in resp.json()
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_captured_with_call_site_and_stack():
+    before = metrics.LOOP_STALLS.value()
+
+    report = await _run(LoopMonitor(interval=0.01, threshold=0.03, max_sites=10), blocks=[0.2, 0.2])
+
+    assert report["stalls"] == 2
+    assert report["max_lag_seconds"] >= 0.1
+    [offender] = report["offenders"]
+    assert "test_loop_monitor.py" in offender["site"]
+    assert offender["site"].endswith("in blocking_call")
+    assert offender["count"] == 2
+    assert offender["total_seconds"] >= 0.2
+    assert any("blocking_call" in line for line in offender["stack"])
+    assert metrics.LOOP_STALLS.value() == before + 2
+
+
+@pytest.mark.asyncio
+async def test_offender_table_is_bounded():
+    monitor = LoopMonitor(interval=0.01, threshold=0.03, max_sites=1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blocking_call(0.1)
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # different call site, costlier
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    [offender] = monitor.report()["offenders"]
+    assert "test_offender_table_is_bounded" in offender["site"]
+
+
+@pytest.mark.asyncio
+async def test_module_start_respects_setting(monkeypatch):
+    monkeypatch.setattr("app.core.loop_monitor.settings.LOOP_MONITOR_ENABLED", False)
+    assert loop_monitor.start() is None
+    assert loop_monitor.report() is None
+
+    monkeypatch.setattr("app.core.loop_monitor.settings.LOOP_MONITOR_ENABLED", True)
+    try:
+        assert loop_monitor.start() is not None
+        assert loop_monitor.report()["stalls"] == 0
+    finally:
+        await loop_monitor.stop()
+    assert loop_monitor.report() is None
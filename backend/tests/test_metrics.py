@@ -0,0 +1,70 @@
+"""Tests for app.core.metrics — metric types, Prometheus rendering and /metrics."""
+
+import pytest
+
+from app.core import metrics
+from app.core.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_renders_cumulative_buckets():
+    metrics.STAGE_SECONDS.observe(0.02, stage="rerank")
+    metrics.STAGE_SECONDS.observe(3.0, stage="rerank")
+
+    text = metrics.render()
+
+    assert "# TYPE docchat_stage_duration_seconds histogram" in text
+    assert 'docchat_stage_duration_seconds_bucket{stage="rerank",le="0.01"} 0' in text
+    assert 'docchat_stage_duration_seconds_bucket{stage="rerank",le="0.025"} 1' in text
+    assert 'docchat_stage_duration_seconds_bucket{stage="rerank",le="+Inf"} 2' in text
+    assert 'docchat_stage_duration_seconds_count{stage="rerank"} 2' in text
+    assert 'docchat_stage_duration_seconds_sum{stage="rerank"} 3.02' in text
+
+
+def test_cache_counter_and_label_escaping():
+    metrics.record_cache("response", True)
+    metrics.record_cache("response", False)
+    metrics.record_cache('we"ird', True)
+
+    assert metrics.CACHE_REQUESTS.value(cache="response", result="hit") == 1
+    assert 'docchat_cache_requests_total{cache="response",result="miss"} 1' in metrics.render()
+    assert 'cache="we\\"ird"' in metrics.render()
+
+
+def test_time_stage_records_duration():
+    with metrics.time_stage("assembly"):
+        pass
+
+    assert metrics.STAGE_SECONDS.count(stage="assembly") == 1
+
+
+def test_circuit_breaker_counts_external_calls():
+    breaker = CircuitBreaker("test")
+
+    def query():
+        return "ok"
+
+    breaker.call(query)
+    with pytest.raises(ValueError):
+        breaker.call(lambda: (_ for _ in ()).throw(ValueError("bad")))
+
+    assert metrics.EXTERNAL_CALLS.value(dependency="test", operation="query", outcome="ok") == 1
+    assert metrics.EXTERNAL_CALLS.value(dependency="test", operation="<lambda>", outcome="error") == 1
+    assert metrics.EXTERNAL_CALL_SECONDS.count(dependency="test", operation="query") == 1
+
+
+def test_metrics_endpoint(client):
+    metrics.record_cache("retrieval", True)
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'docchat_cache_requests_total{cache="retrieval",result="hit"} 1' in resp.text
+    assert 'docchat_admission{state="in_flight"} 0' in resp.text
@@ -0,0 +1,73 @@
+"""Tests for app.core.profiling and the /profiles endpoints."""
+
+import pstats
+
+import pytest
+
+from app.core import profiling
+from app.models.database import get_db
+
+
+@pytest.fixture(autouse=True)
+def profile_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.core.profiling.settings.PROFILE_DIR", str(tmp_path / "profiles"))
+    profiling.clear()
+    yield tmp_path / "profiles"
+    profiling.clear()
+
+
+def _busy_work(n):
+    return sum(i * i for i in range(n))
+
+
+@pytest.mark.asyncio
+async def test_profile_covers_worker_thread_calls(profile_dir):
+    profile = profiling.start("query")
+    assert await profiling.to_thread(_busy_work, 1000) == sum(i * i for i in range(1000))
+    profile_id = profiling.finish(profile)
+
+    stats = pstats.Stats(str(profile_dir / f"{profile_id}.prof"))
+    assert any(func[2] == "_busy_work" for func in stats.stats)
+    assert [p["profile_id"] for p in profiling.list_profiles()] == [profile_id]
+
+
+def test_only_one_request_profiled_at_a_time():
+    first = profiling.start("query")
+    assert profiling.start("query") is None
+    profiling.finish(first)
+
+    second = profiling.start("query")
+    assert second is not None
+    profiling.finish(second)
+
+
+def test_old_profiles_are_pruned(monkeypatch, profile_dir):
+    monkeypatch.setattr("app.core.profiling.settings.PROFILE_MAX_FILES", 2)
+    for _ in range(3):
+        profile = profiling.start("upload")
+        _busy_work(10)
+        profiling.finish(profile)
+
+    assert len(list(profile_dir.glob("*.prof"))) == 2
+
+
+def test_profile_path_rejects_malformed_ids():
+    assert profiling.profile_path("../users") is None
+    assert profiling.profile_path("query-000000000000") is None
+
+
+def test_profiles_endpoints_are_admin_only(auth_client):
+    assert auth_client.get("/api/v1/profiles/").status_code == 403
+
+    conn = get_db()
+    conn.execute("UPDATE users SET is_admin = 1 WHERE user_id = ?", (auth_client._test_user["user_id"],))
+    conn.commit()
+    conn.close()
+    profile_id = profiling.finish(profiling.start("query"))
+
+    listed = auth_client.get("/api/v1/profiles/")
+    assert listed.status_code == 200
+    assert [p["profile_id"] for p in listed.json()] == [profile_id]
+    download = auth_client.get(f"/api/v1/profiles/{profile_id}")
+    assert download.status_code == 200 and download.content
+    assert auth_client.get("/api/v1/profiles/query-ffffffffffff").status_code == 404
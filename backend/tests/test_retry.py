@@ -1,8 +1,10 @@
-"""Tests for app.core.retry — is_retryable, retry_sync."""
+"""Tests for app.core.retry — is_retryable, retry_sync, retry budgets."""
 
 import pytest
 
-from app.core.retry import is_retryable, retry_sync
+from app.core import retry_budget
+from app.core.retry import is_retryable, retry_async, retry_sync
+from app.core.retry_budget import RetryBudget, get_budget
 
 
 def test_is_retryable_connection_error():
@@ -49,3 +51,64 @@ def test_retry_sync_non_retryable_raises_immediately():
         retry_sync(bad, max_attempts=3, base_delay=0.01, operation_name="test")
 
     assert call_count == 1
+
+
+def test_retry_sync_denied_when_budget_exhausted(monkeypatch):
+    """An empty retry budget fails fast and counts the denial."""
+    monkeypatch.setattr("app.core.retry_budget.settings.RETRY_BUDGET_MAX_TOKENS", 1.0)
+    monkeypatch.setattr("app.core.retry_budget.settings.RETRY_BUDGET_MIN_PER_SECOND", 0.0)
+    call_count = 0
+
+    def down():
+        nonlocal call_count
+        call_count += 1
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        retry_sync(down, max_attempts=5, base_delay=0.01, operation_name="dep call", dependency="dep")
+
+    assert call_count == 2
+    assert get_budget("dep").snapshot() == {"tokens": 0.0, "retries": 1, "denied": 1}
+
+
+async def test_doc_deletes_share_one_storage_budget():
+    """Budgets are keyed on the dependency, not the per-call operation name."""
+    attempts = {}
+
+    async def flaky(doc_id):
+        attempts[doc_id] = attempts.get(doc_id, 0) + 1
+        if attempts[doc_id] == 1:
+            raise ConnectionError("transient")
+
+    for doc_id in ("doc-1", "doc-2"):
+        await retry_async(
+            flaky, doc_id, base_delay=0.01,
+            operation_name=f"Storage delete (doc={doc_id})", dependency="storage",
+        )
+
+    assert list(retry_budget.snapshot_all()) == ["storage"]
+    assert get_budget("storage").snapshot()["retries"] == 2
+
+
+def test_retry_without_dependency_creates_no_budget():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("transient")
+        return "ok"
+
+    assert retry_sync(flaky, base_delay=0.01, operation_name="Storage delete (doc=doc-3)") == "ok"
+    assert retry_budget.snapshot_all() == {}
+
+
+def test_retry_budget_refills_from_successes():
+    """Each success earns a fraction of a retry."""
+    budget = RetryBudget("dep", ratio=0.5, min_per_second=0.0, max_tokens=1.0)
+    assert budget.try_retry() is True
+    assert budget.try_retry() is False
+
+    budget.record_success()
+    budget.record_success()
+    assert budget.try_retry() is True
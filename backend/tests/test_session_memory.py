@@ -0,0 +1,101 @@
+"""Tests for app.services.session_memory — SessionMemory (uses temporary SQLite)."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from tests.conftest import mock_llm_response
+from app.models.chat_session import ChatSession
+from app.services.session_memory import SessionMemory
+
+
+@pytest.fixture(autouse=True)
+def session_settings(monkeypatch):
+    monkeypatch.setattr("app.services.session_memory.settings.SESSION_RECENT_TURNS", 1)
+    monkeypatch.setattr("app.services.session_memory.settings.SESSION_SUMMARY_BATCH_TURNS", 1)
+
+
+@pytest.fixture()
+def memory():
+    mem = SessionMemory()
+    mem._client = AsyncMock()
+    mem._client.ainvoke.return_value = mock_llm_response("User asked about refunds.")
+    return mem
+
+
+def _add_turns(session_id, count):
+    for i in range(count):
+        ChatSession.add_messages(session_id, [
+            {"role": "user", "content": f"question {i}"},
+            {"role": "assistant", "content": f"answer {i}"},
+        ])
+
+
+def test_session_is_scoped_to_user(test_user):
+    session = ChatSession.create(test_user["user_id"])
+    assert ChatSession.get(session["session_id"], test_user["user_id"])["summary"] == ""
+    assert ChatSession.get(session["session_id"], "someone-else") is None
+    assert ChatSession.delete(session["session_id"], "someone-else") is False
+    assert ChatSession.delete(session["session_id"], test_user["user_id"]) is True
+
+
+def test_load_history_returns_only_recent_turns(test_user, memory):
+    session = ChatSession.create(test_user["user_id"])
+    _add_turns(session["session_id"], 3)
+
+    history = memory.load_history(ChatSession.get(session["session_id"], test_user["user_id"]))
+
+    assert [(m.role, m.content) for m in history] == [("user", "question 2"), ("assistant", "answer 2")]
+
+
+@pytest.mark.asyncio
+async def test_summarize_folds_old_turns_into_summary(test_user, memory):
+    session = ChatSession.create(test_user["user_id"])
+    _add_turns(session["session_id"], 3)
+
+    await memory.summarize(session["session_id"], test_user["user_id"])
+
+    stored = ChatSession.get(session["session_id"], test_user["user_id"])
+    assert stored["summary"] == "User asked about refunds."
+    prompt = memory._client.ainvoke.call_args.args[0][1].content
+    assert "question 0" in prompt and "question 1" in prompt and "question 2" not in prompt
+
+    history = memory.load_history(stored)
+    assert history[0].role == "system"
+    assert "User asked about refunds." in history[0].content
+    assert [m.content for m in history[1:]] == ["question 2", "answer 2"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_waits_for_a_full_batch(test_user, memory):
+    session = ChatSession.create(test_user["user_id"])
+    _add_turns(session["session_id"], 1)
+
+    await memory.summarize(session["session_id"], test_user["user_id"])
+
+    memory._client.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_summarize_folds_turns_once(test_user, memory):
+    session = ChatSession.create(test_user["user_id"])
+    _add_turns(session["session_id"], 3)
+
+    async def slow_summary(messages):
+        await asyncio.sleep(0.01)  # let the other calls start while this one is in flight
+        return mock_llm_response("User asked about refunds.")
+
+    memory._client.ainvoke.side_effect = slow_summary
+    await asyncio.gather(*(memory.summarize(session["session_id"], test_user["user_id"]) for _ in range(3)))
+
+    memory._client.ainvoke.assert_called_once()
+    assert SessionMemory._locks == {}
+
+
+def test_update_summary_is_compare_and_set(test_user):
+    session = ChatSession.create(test_user["user_id"])
+
+    assert ChatSession.update_summary(session["session_id"], "first", 4, expected_until=0) is True
+    assert ChatSession.update_summary(session["session_id"], "stale", 4, expected_until=0) is False
+    assert ChatSession.get(session["session_id"], test_user["user_id"])["summary"] == "first"
@@ -0,0 +1,75 @@
+"""Tests for app.core.tracing — per-request span trees."""
+
+import asyncio
+
+import pytest
+
+from app.core import metrics, tracing
+from app.core.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def clear_trace():
+    tracing.clear()
+    yield
+    tracing.clear()
+
+
+def test_no_trace_records_nothing():
+    with metrics.time_stage("rerank"):
+        tracing.count("reranked", 4)
+
+    assert tracing.active() is False
+    assert tracing.finish() is None
+
+
+def test_stage_timers_nest_as_spans():
+    tracing.start()
+    with metrics.time_stage("retrieval"):
+        with metrics.time_stage("vector_search"):
+            tracing.annotate(top_k=10)
+    with metrics.time_stage("generation"):
+        pass
+
+    spans = tracing.finish()["spans"]
+
+    assert [child["name"] for child in spans["children"]] == ["retrieval", "generation"]
+    vector_search = spans["children"][0]["children"][0]
+    assert vector_search["name"] == "vector_search"
+    assert vector_search["attributes"] == {"top_k": 10}
+    assert vector_search["start_ms"] <= vector_search["end_ms"] <= spans["end_ms"]
+
+
+@pytest.mark.asyncio
+async def test_parallel_stages_are_siblings():
+    tracing.start()
+
+    async def stage(name):
+        with metrics.time_stage(name):
+            await asyncio.sleep(0)
+
+    await asyncio.gather(stage("judge"), stage("entities"))
+
+    spans = tracing.finish()["spans"]
+    assert sorted(child["name"] for child in spans["children"]) == ["entities", "judge"]
+    assert all("children" not in child for child in spans["children"])
+
+
+def test_counts_caches_and_external_calls():
+    tracing.start()
+    tracing.count("retrieved", 12)
+    tracing.count("filtered", 9)
+    metrics.record_cache("response", False)
+    breaker = CircuitBreaker("pinecone")
+
+    def query():
+        return []
+
+    breaker.call(query)
+    breaker.call(query)
+
+    trace = tracing.finish()
+
+    assert trace["counts"] == {"retrieved": 12, "filtered": 9}
+    assert trace["caches"] == [{"cache": "response", "result": "miss"}]
+    assert trace["external_calls"] == {"pinecone.query": 2}
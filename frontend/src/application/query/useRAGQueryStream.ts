@@ -52,7 +52,9 @@ export const useRAGQueryStream = () => {
               ));
               break;
             case 'done':
+              // The answer is complete; a background verdict may still follow
               store.dispatch(setStreamingStage(null));
+              store.dispatch(setLoading(false));
               break;
           }
         },